@@ -0,0 +1,120 @@
+import asyncio
+import logging
+import random
+import time
+from typing import Any, Dict, Optional
+from aiogram import Bot
+from aiogram.client.session.aiohttp import AiohttpSession
+from aiogram.client.telegram import TelegramAPIServer
+from aiogram.exceptions import TelegramNetworkError, TelegramServerError
+from aiogram.methods import TelegramMethod
+from aiogram.methods.base import TelegramType
+from config import config
+
+logger = logging.getLogger(__name__)
+
+# Методы, повтор которых не приведет к дублям у пользователя
+IDEMPOTENT_PREFIXES = ("get", "edit", "answer", "set", "delete")
+# Ошибки, при которых запрос точно не ушел: соединение не установлено
+# или закрытое сервером keep-alive соединение не приняло тело запроса
+NOT_SENT_ERRORS = ("ClientConnectorError", "ClientOSError: [Errno None] Can not write request body")
+
+
+class TunedAiohttpSession(AiohttpSession):
+    """Сессия Bot API с настроенным пулом соединений, замером времени и повторами.
+
+    Соединения к api.telegram.org переиспользуются (keep-alive), их число
+    ограничено limit_per_host. Сетевые ошибки и 5xx повторяются с
+    экспоненциальной задержкой и случайным разбросом. Методы с побочным
+    эффектом (sendMessage и т.п.) повторяются, только если запрос точно
+    не был отправлен: иначе запрос мог дойти и сообщение придет дважды.
+    """
+
+    def __init__(self, limit: int = 100, limit_per_host: int = 50, keepalive_timeout: float = 60,
+                 retries: int = 2, retry_delay: float = 0.5, **kwargs: Any):
+        super().__init__(**kwargs)
+        self._connector_init.update(
+            limit=limit,
+            limit_per_host=limit_per_host,
+            keepalive_timeout=keepalive_timeout,
+            ttl_dns_cache=300,
+        )
+        self.retries = retries
+        self.retry_delay = retry_delay
+        # метод -> [число запросов, суммарное время, максимум, ошибки]
+        self._stats: Dict[str, list] = {}
+        self.retried = 0
+
+    @staticmethod
+    def _can_retry(api_method: str, error: Exception) -> bool:
+        if api_method.startswith(IDEMPOTENT_PREFIXES):
+            return True
+        return isinstance(error, TelegramNetworkError) and error.message.startswith(NOT_SENT_ERRORS)
+
+    def _record(self, api_method: str, elapsed: float, failed: bool):
+        stats = self._stats.get(api_method)
+        if stats is None:
+            stats = self._stats[api_method] = [0, 0.0, 0.0, 0]
+        stats[0] += 1
+        stats[1] += elapsed
+        stats[2] = max(stats[2], elapsed)
+        stats[3] += failed
+
+    async def make_request(
+        self, bot: Bot, method: TelegramMethod[TelegramType], timeout: Optional[int] = None
+    ) -> TelegramType:
+        api_method = method.__api_method__
+        started = time.perf_counter()
+        failed = True
+        attempt = 0
+        try:
+            while True:
+                try:
+                    result = await super().make_request(bot, method, timeout)
+                    failed = False
+                    return result
+                except (TelegramNetworkError, TelegramServerError) as error:
+                    if attempt >= self.retries or not self._can_retry(api_method, error):
+                        raise
+                    attempt += 1
+                    self.retried += 1
+                    delay = self.retry_delay * 2 ** (attempt - 1) * random.uniform(0.5, 1.5)
+                    logger.warning("%s: %s, повтор %s через %.2f с", api_method, error.message, attempt, delay)
+                    await asyncio.sleep(delay)
+        finally:
+            self._record(api_method, time.perf_counter() - started, failed)
+
+    def metrics(self) -> Dict[str, Any]:
+        """Сводка по исходящим запросам: всего, среднее и максимальное время по методам"""
+        methods = {
+            name: {
+                "count": count,
+                "avg_ms": round(total / count * 1000, 1),
+                "max_ms": round(longest * 1000, 1),
+                "errors": errors,
+            }
+            for name, (count, total, longest, errors) in self._stats.items()
+        }
+        requests = sum(stats[0] for stats in self._stats.values())
+        total_time = sum(stats[1] for stats in self._stats.values())
+        return {
+            "requests": requests,
+            "avg_ms": round(total_time / requests * 1000, 1) if requests else 0.0,
+            "retried": self.retried,
+            "methods": methods,
+        }
+
+
+def create_bot_session() -> TunedAiohttpSession:
+    """Сессия по настройкам из Config; BOT_API_URL позволяет работать с локальным или тестовым сервером"""
+    kwargs = {}
+    if config.BOT_API_URL:
+        kwargs["api"] = TelegramAPIServer.from_base(config.BOT_API_URL)
+    return TunedAiohttpSession(
+        limit=config.BOT_API_POOL_SIZE,
+        limit_per_host=config.BOT_API_POOL_PER_HOST,
+        keepalive_timeout=config.BOT_API_KEEPALIVE,
+        retries=config.BOT_API_RETRIES,
+        timeout=config.BOT_API_TIMEOUT,
+        **kwargs
+    )
@@ -5,7 +5,76 @@ load_dotenv()
 
 class Config:
     BOT_TOKEN: str = os.getenv('BOT_TOKEN')
-    ADMINS: set[int] = set(map(int, os.getenv('ADMINS', '').split(',')))
+    ADMINS: set[int] = {int(x) for x in os.getenv('ADMINS', '').split(',') if x.strip()}
     SQLALCHEMY_URL: str = os.getenv('SQLALCHEMY_URL')
+    DATABASE_URL: str = os.getenv('DATABASE_URL')
+    # Реплика только для чтения, по умолчанию читаем с основной базы
+    DATABASE_REPLICA_URL: str = os.getenv('DATABASE_REPLICA_URL', '')
+    # Сколько секунд после записи читать с основной базы, пока реплика догоняет
+    REPLICA_STICKY_SECONDS: int = int(os.getenv('REPLICA_STICKY_SECONDS', '10'))
+    # Параметры движка и пула соединений
+    DB_ECHO: bool = os.getenv('DB_ECHO', '').lower() in ('1', 'true', 'yes')
+    DB_POOL_SIZE: int = int(os.getenv('DB_POOL_SIZE', '10'))
+    DB_MAX_OVERFLOW: int = int(os.getenv('DB_MAX_OVERFLOW', '10'))
+    DB_POOL_TIMEOUT: int = int(os.getenv('DB_POOL_TIMEOUT', '30'))
+    DB_POOL_RECYCLE: int = int(os.getenv('DB_POOL_RECYCLE', '1800'))
+    DB_POOL_PRE_PING: bool = os.getenv('DB_POOL_PRE_PING', 'true').lower() in ('1', 'true', 'yes')
+    # Таймаут запроса в миллисекундах, 0 - без ограничения
+    DB_STATEMENT_TIMEOUT: int = int(os.getenv('DB_STATEMENT_TIMEOUT', '10000'))
+    # Интервал обновления снимка статистики в секундах
+    STATS_REFRESH_INTERVAL: int = int(os.getenv('STATS_REFRESH_INTERVAL', '60'))
+    # Кэш готовых страниц публичных разделов
+    LISTING_CACHE_TTL: int = int(os.getenv('LISTING_CACHE_TTL', '300'))
+    LISTING_CACHE_SIZE: int = int(os.getenv('LISTING_CACHE_SIZE', '512'))
+    # Сколько секунд Telegram кэширует ответ на inline-запрос
+    INLINE_CACHE_TIME: int = int(os.getenv('INLINE_CACHE_TIME', '60'))
+    # Сколько сообщений помнить, чтобы не редактировать их тем же содержимым
+    RENDERED_MESSAGES_SIZE: int = int(os.getenv('RENDERED_MESSAGES_SIZE', '20000'))
+    # Пользователи, которых /start уже зарегистрировал (в памяти процесса)
+    KNOWN_USERS_CACHE_SIZE: int = int(os.getenv('KNOWN_USERS_CACHE_SIZE', '50000'))
+    KNOWN_USERS_CACHE_TTL: int = int(os.getenv('KNOWN_USERS_CACHE_TTL', '86400'))
+    # Запись активности пользователей: раз в N секунд или после M обновлений
+    ACTIVITY_FLUSH_INTERVAL: int = int(os.getenv('ACTIVITY_FLUSH_INTERVAL', '30'))
+    ACTIVITY_FLUSH_BATCH: int = int(os.getenv('ACTIVITY_FLUSH_BATCH', '1000'))
+    # memory - один процесс, redis - общий кэш и FSM для нескольких реплик
+    CACHE_BACKEND: str = os.getenv('CACHE_BACKEND', 'memory')
+    REDIS_URL: str = os.getenv('REDIS_URL', 'redis://localhost:6379/0')
+    # postgres - состояния мастеров в базе, иначе хранилище бэкенда кэша
+    FSM_STORAGE: str = os.getenv('FSM_STORAGE', '')
+    FSM_STATE_TTL: int = int(os.getenv('FSM_STATE_TTL', '86400'))
+    # За сколько часов до мероприятия напоминать подписчикам
+    EVENT_REMINDER_HOURS: int = int(os.getenv('EVENT_REMINDER_HOURS', '24'))
+    # Как часто дочитывать отложенные задачи, поставленные другими репликами, секунды
+    SCHEDULER_POLL_INTERVAL: int = int(os.getenv('SCHEDULER_POLL_INTERVAL', '30'))
+    # Рассылки: общий лимит Telegram (сообщений в секунду) и размер пачки получателей
+    BROADCAST_RATE: float = float(os.getenv('BROADCAST_RATE', '30'))
+    BROADCAST_BATCH_SIZE: int = int(os.getenv('BROADCAST_BATCH_SIZE', '200'))
+    # Аренда рассылки репликой, секунды: после падения реплики другая подхватит ее через это время
+    BROADCAST_LEASE: int = int(os.getenv('BROADCAST_LEASE', '120'))
+    # Защита от флуда: обновлений в секунду на пользователя, запас подряд,
+    # пауза между одинаковыми нажатиями кнопок просмотра и время хранения состояния
+    THROTTLE_RATE: float = float(os.getenv('THROTTLE_RATE', '3'))
+    THROTTLE_BURST: float = float(os.getenv('THROTTLE_BURST', '10'))
+    CALLBACK_COOLDOWN: float = float(os.getenv('CALLBACK_COOLDOWN', '3'))
+    THROTTLE_IDLE_TTL: int = int(os.getenv('THROTTLE_IDLE_TTL', '600'))
+    # Сколько обновлений обрабатывается одновременно
+    UPDATE_WORKERS: int = int(os.getenv('UPDATE_WORKERS', '32'))
+    # Исходящие запросы к Bot API: адрес сервера (пусто - api.telegram.org),
+    # пул соединений, keep-alive в секундах, таймаут и число повторов
+    BOT_API_URL: str = os.getenv('BOT_API_URL', '')
+    BOT_API_POOL_SIZE: int = int(os.getenv('BOT_API_POOL_SIZE', '100'))
+    BOT_API_POOL_PER_HOST: int = int(os.getenv('BOT_API_POOL_PER_HOST', '50'))
+    BOT_API_KEEPALIVE: float = float(os.getenv('BOT_API_KEEPALIVE', '60'))
+    BOT_API_TIMEOUT: float = float(os.getenv('BOT_API_TIMEOUT', '30'))
+    BOT_API_RETRIES: int = int(os.getenv('BOT_API_RETRIES', '2'))
+    # Режим вебхука включается, если задан публичный адрес
+    WEBHOOK_URL: str = os.getenv('WEBHOOK_URL', '')
+    WEBHOOK_PATH: str = os.getenv('WEBHOOK_PATH', '/webhook')
+    WEBHOOK_HOST: str = os.getenv('WEBHOOK_HOST', '0.0.0.0')
+    WEBHOOK_PORT: int = int(os.getenv('WEBHOOK_PORT', '8080'))
+    # Обязателен в режиме вебхука, общий для всех реплик (A-Z, a-z, 0-9, _ и -)
+    WEBHOOK_SECRET: str | None = os.getenv('WEBHOOK_SECRET') or None
+    WEBHOOK_MAX_CONCURRENCY: int = int(os.getenv('WEBHOOK_MAX_CONCURRENCY', '100'))
+    WEBHOOK_DRAIN_TIMEOUT: int = int(os.getenv('WEBHOOK_DRAIN_TIMEOUT', '30'))
 
 config = Config()
\ No newline at end of file
@@ -1,26 +1,165 @@
 import asyncio
+import os
+import time
+from alembic.config import Config as AlembicConfig
+from alembic.runtime.migration import MigrationContext
+from alembic.script import ScriptDirectory
+from sqlalchemy import inspect
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession, async_sessionmaker
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.pool import AsyncAdaptedQueuePool
 from .models import Base
-import os
-from dotenv import load_dotenv
+from config import config
+
+
+def normalize_url(url: str | None) -> str | None:
+    if url and url.startswith("postgresql://"):
+        return url.replace("postgresql://", "postgresql+asyncpg://", 1)
+    return url
+
+
+class MeteredPool(AsyncAdaptedQueuePool):
+    """Пул соединений, который замеряет время ожидания свободного соединения"""
+
+    # Сглаживание среднего времени ожидания
+    WAIT_ALPHA = 0.1
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.checkouts = 0
+        self.avg_wait = 0.0
+        self.max_wait = 0.0
+
+    def _do_get(self):
+        started = time.monotonic()
+        try:
+            return super()._do_get()
+        finally:
+            wait = time.monotonic() - started
+            self.checkouts += 1
+            self.avg_wait += (wait - self.avg_wait) * self.WAIT_ALPHA
+            self.max_wait = max(self.max_wait, wait)
+
+
+def create_engine(url: str, read_only: bool = False):
+    """Создает движок с параметрами пула и таймаутами из Config"""
+    url = normalize_url(url)
+    options = {"echo": config.DB_ECHO}
+
+    if not url.startswith("sqlite"):
+        options.update(
+            poolclass=MeteredPool,
+            pool_size=config.DB_POOL_SIZE,
+            max_overflow=config.DB_MAX_OVERFLOW,
+            pool_timeout=config.DB_POOL_TIMEOUT,
+            pool_recycle=config.DB_POOL_RECYCLE,
+            pool_pre_ping=config.DB_POOL_PRE_PING,
+        )
 
-load_dotenv()
+    if url.startswith("postgresql+asyncpg"):
+        server_settings = {}
+        if config.DB_STATEMENT_TIMEOUT:
+            server_settings["statement_timeout"] = str(config.DB_STATEMENT_TIMEOUT)
+        if read_only:
+            server_settings["default_transaction_read_only"] = "on"
+        options["connect_args"] = {"server_settings": server_settings}
 
-DATABASE_URL = os.getenv("DATABASE_URL")
-if DATABASE_URL and DATABASE_URL.startswith("postgresql://"):
-    DATABASE_URL = DATABASE_URL.replace("postgresql://", "postgresql+asyncpg://", 1)
+    return create_async_engine(url, **options)
 
-engine = create_async_engine(DATABASE_URL, echo=True)
+
+def pool_metrics(engine) -> dict:
+    """Занятость пула и время ожидания соединения"""
+    pool = engine.sync_engine.pool
+    if not isinstance(pool, MeteredPool):
+        # SQLite в локальных прогонах работает без нашего пула
+        return {"size": 0, "checked_out": 0, "overflow": 0, "checkouts": 0, "avg_wait_ms": 0.0, "max_wait_ms": 0.0}
+    return {
+        "size": pool.size(),
+        "checked_out": pool.checkedout(),
+        "overflow": max(pool.overflow(), 0),
+        "checkouts": pool.checkouts,
+        "avg_wait_ms": round(pool.avg_wait * 1000, 1),
+        "max_wait_ms": round(pool.max_wait * 1000, 1),
+    }
+
+
+DATABASE_URL = normalize_url(config.DATABASE_URL)
+
+engine = create_engine(DATABASE_URL)
 AsyncSessionLocal = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
 
+# Реплика только для чтения; без отдельного адреса читаем с основной базы
+replica_engine = create_engine(config.DATABASE_REPLICA_URL, read_only=True) if config.DATABASE_REPLICA_URL else engine
+ReplicaSessionLocal = async_sessionmaker(replica_engine, class_=AsyncSession, expire_on_commit=False)
+
+# Ключ ("user", id) или ("section", раздел) -> момент, до которого чтения идут на основную базу
+_sticky_until: dict[tuple, float] = {}
+
+
+def mark_write(user_id: int | None = None, *sections: str):
+    """Запоминает запись: пока реплика догоняет, автор и затронутые разделы читают с основной базы"""
+    now = time.monotonic()
+    until = now + config.REPLICA_STICKY_SECONDS
+    if user_id is not None:
+        _sticky_until[("user", user_id)] = until
+    for section in sections:
+        _sticky_until[("section", section.split("_", 1)[0])] = until
+    # Не даем словарю расти: убираем истекшие отметки
+    if len(_sticky_until) > 1024:
+        for key in [key for key, value in _sticky_until.items() if value <= now]:
+            del _sticky_until[key]
+
+
+def read_session(user_id: int | None = None, section: str | None = None) -> AsyncSession:
+    """Сессия для чтения: реплика, если пользователь или раздел недавно не менялись"""
+    if replica_engine is engine:
+        return AsyncSessionLocal()
+    now = time.monotonic()
+    if user_id is not None and _sticky_until.get(("user", user_id), 0) > now:
+        return AsyncSessionLocal()
+    if section is not None and _sticky_until.get(("section", section.split("_", 1)[0]), 0) > now:
+        return AsyncSessionLocal()
+    return ReplicaSessionLocal()
+
+def upsert_insert(session: AsyncSession):
+    """insert() с поддержкой ON CONFLICT для диалекта сессии (PostgreSQL или SQLite)"""
+    return pg_insert if session.bind.dialect.name == "postgresql" else sqlite_insert
+
+MIGRATIONS_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), "migrations")
+
+def _schema_state(connection) -> tuple[bool, set[str]]:
+    """(ведется ли база через Alembic, текущие ревизии)"""
+    if not inspect(connection).has_table("alembic_version"):
+        return False, set()
+    return True, set(MigrationContext.configure(connection).get_current_heads())
+
 async def init_db():
+    """Проверяет схему перед стартом.
+
+    Рабочая база ведется миграциями Alembic: бот не запускается, пока она не
+    обновлена до последней ревизии (`alembic upgrade head`). Только локальная
+    база SQLite без миграций (разработка, тесты) создается по моделям.
+    """
     async with engine.begin() as conn:
-        await conn.run_sync(Base.metadata.create_all)
+        migrated, current = await conn.run_sync(_schema_state)
+        if not migrated and engine.dialect.name == "sqlite":
+            await conn.run_sync(Base.metadata.create_all)
+            return
+    
+    alembic_config = AlembicConfig()
+    alembic_config.set_main_option("script_location", MIGRATIONS_DIR)
+    heads = set(ScriptDirectory.from_config(alembic_config).get_heads())
+    if current != heads:
+        raise RuntimeError(
+            f"Схема базы на ревизии {', '.join(sorted(current)) or 'нет'}, нужна {', '.join(sorted(heads))}: "
+            "выполните `alembic upgrade head`"
+        )
 
 async def get_session():
     async with AsyncSessionLocal() as session:
         try:
             yield session
         finally:
-            await session.close()
\ No newline at end of file
+            await session.close()
@@ -0,0 +1,126 @@
+import asyncio
+import json
+import logging
+from datetime import datetime, timedelta
+from typing import Any, Dict, Optional
+from aiogram.fsm.state import State
+from aiogram.fsm.storage.base import BaseStorage, StateType, StorageKey
+from sqlalchemy import select, delete, and_, or_, case
+from .database import AsyncSessionLocal, upsert_insert
+from .models import FSMState
+
+logger = logging.getLogger(__name__)
+
+
+def _default(value):
+    # Мастер мероприятий хранит дату как datetime
+    if isinstance(value, datetime):
+        return {"__datetime__": value.isoformat()}
+    raise TypeError(f"Тип {type(value).__name__} не сериализуется в JSON")
+
+
+def _object_hook(value: dict):
+    if "__datetime__" in value:
+        return datetime.fromisoformat(value["__datetime__"])
+    return value
+
+
+def fsm_json_dumps(data: Dict[str, Any]) -> str:
+    return json.dumps(data, default=_default, separators=(",", ":"), ensure_ascii=False)
+
+
+def fsm_json_loads(raw: str) -> Dict[str, Any]:
+    return json.loads(raw, object_hook=_object_hook)
+
+
+class SQLAlchemyStorage(BaseStorage):
+    """Хранилище FSM в таблице fsm_states: одна компактная строка на (чат, пользователь).
+
+    Брошенные мастера удаляются по истечении state_ttl секунд с последнего шага.
+    """
+
+    def __init__(self, session_maker=AsyncSessionLocal, state_ttl: int = 86400):
+        self.session_maker = session_maker
+        self.state_ttl = state_ttl
+
+    @staticmethod
+    def _key(key: StorageKey) -> str:
+        return f"{key.bot_id}:{key.chat_id}:{key.user_id}:{key.thread_id or ''}:{key.destiny}"
+
+    async def _upsert(self, key: StorageKey, **values):
+        row_key = self._key(key)
+        now = datetime.utcnow()
+        # Из просроченной строки не берем ничего: иначе set_state вернул бы
+        # данные брошенного мастера, а set_data - его шаг
+        expired = FSMState.updated_at < now - timedelta(seconds=self.state_ttl)
+        reset = {
+            column: case((expired, None), else_=getattr(FSMState, column))
+            for column in ("state", "data") if column not in values
+        }
+        async with self.session_maker() as session:
+            stmt = upsert_insert(session)(FSMState).values(key=row_key, updated_at=now, **values)
+            stmt = stmt.on_conflict_do_update(
+                index_elements=[FSMState.key],
+                set_={**values, **reset, "updated_at": now}
+            )
+            await session.execute(stmt)
+            # После state.clear() строка пустая - не храним ее
+            await session.execute(
+                delete(FSMState).where(
+                    and_(FSMState.key == row_key, FSMState.state.is_(None), FSMState.data.is_(None))
+                )
+            )
+            await session.commit()
+
+    async def _get(self, key: StorageKey) -> Optional[FSMState]:
+        cutoff = datetime.utcnow() - timedelta(seconds=self.state_ttl)
+        async with self.session_maker() as session:
+            result = await session.execute(
+                select(FSMState).where(
+                    and_(FSMState.key == self._key(key), FSMState.updated_at >= cutoff)
+                )
+            )
+            return result.scalar_one_or_none()
+
+    async def set_state(self, key: StorageKey, state: StateType = None) -> None:
+        await self._upsert(key, state=state.state if isinstance(state, State) else state)
+
+    async def get_state(self, key: StorageKey) -> Optional[str]:
+        row = await self._get(key)
+        return row.state if row else None
+
+    async def set_data(self, key: StorageKey, data: Dict[str, Any]) -> None:
+        await self._upsert(key, data=fsm_json_dumps(data) if data else None)
+
+    async def get_data(self, key: StorageKey) -> Dict[str, Any]:
+        row = await self._get(key)
+        return fsm_json_loads(row.data) if row and row.data else {}
+
+    async def cleanup(self) -> int:
+        """Удаляет просроченные и пустые строки, возвращает их количество"""
+        cutoff = datetime.utcnow() - timedelta(seconds=self.state_ttl)
+        async with self.session_maker() as session:
+            result = await session.execute(
+                delete(FSMState).where(
+                    or_(
+                        FSMState.updated_at < cutoff,
+                        and_(FSMState.state.is_(None), FSMState.data.is_(None))
+                    )
+                )
+            )
+            await session.commit()
+        return result.rowcount
+
+    async def run_cleanup(self, interval: int):
+        """Фоновая задача: периодически чистит брошенные мастера"""
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                removed = await self.cleanup()
+                if removed:
+                    logger.info("Удалено %s устаревших состояний FSM", removed)
+            except Exception:
+                logger.exception("Не удалось очистить состояния FSM")
+
+    async def close(self) -> None:
+        pass
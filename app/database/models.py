@@ -1,26 +1,61 @@
-from sqlalchemy import Column, Integer, String, DateTime, Text, Boolean, ForeignKey, Table
+from sqlalchemy import Column, Integer, BigInteger, String, DateTime, Text, Boolean, ForeignKey, Table, Index, text, func, literal_column
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import relationship
 from datetime import datetime
 
 Base = declarative_base()
 
-# Связующая таблица для проектов и специальностей
+def search_document(*columns):
+    """tsvector для полнотекстового поиска PostgreSQL.
+
+    Запросы поиска должны строить документ этой же функцией, иначе
+    выражение не совпадет с GIN-индексом и индекс не будет использован.
+    """
+    document = func.coalesce(columns[0], literal_column("''"))
+    for column in columns[1:]:
+        document = document + literal_column("' '", String) + func.coalesce(column, literal_column("''"))
+    return func.to_tsvector(literal_column("'russian'::regconfig"), document)
+
+def search_index(name: str, *columns) -> Index:
+    """GIN-индекс по search_document, создается только в PostgreSQL"""
+    return Index(name, search_document(*columns), postgresql_using='gin').ddl_if(dialect='postgresql')
+
+# Связующая таблица для проектов и навыков
 project_skills = Table('project_skills', Base.metadata,
-    Column('project_id', Integer, ForeignKey('projects.id')),
-    Column('skill', String(50))
+    Column('project_id', Integer, ForeignKey('projects.id', ondelete='CASCADE'), primary_key=True),
+    Column('skill_id', Integer, ForeignKey('skills.id', ondelete='CASCADE'), primary_key=True),
+    # Проекты, которым нужен навык
+    Index('ix_project_skills_skill_id', 'skill_id', 'project_id'),
 )
 
+# Навыки, которые указал о себе пользователь
+user_skills = Table('user_skills', Base.metadata,
+    Column('user_id', Integer, ForeignKey('users.id', ondelete='CASCADE'), primary_key=True),
+    Column('skill_id', Integer, ForeignKey('skills.id', ondelete='CASCADE'), primary_key=True),
+)
+
+class Skill(Base):
+    __tablename__ = 'skills'
+    
+    id = Column(Integer, primary_key=True)
+    name = Column(String(50), unique=True, nullable=False)  # в нижнем регистре, для поиска совпадений
+    title = Column(String(50), nullable=False)  # как написано при добавлении
+
 class User(Base):
     __tablename__ = 'users'
     
     id = Column(Integer, primary_key=True)
-    telegram_id = Column(Integer, unique=True, nullable=False)
+    telegram_id = Column(BigInteger, unique=True, nullable=False)
     username = Column(String(50))
     full_name = Column(String(100))
     is_admin = Column(Boolean, default=False)
     is_mentor = Column(Boolean, default=False)
-    created_at = Column(DateTime, default=datetime.utcnow)
+    created_at = Column(DateTime, default=datetime.utcnow, index=True)
+    # Обновляются пачками из middlewares/activity.py
+    last_seen_at = Column(DateTime, index=True)
+    interactions_count = Column(Integer, default=0, server_default='0', nullable=False)
+    
+    skills = relationship("Skill", secondary="user_skills", order_by="Skill.name")
 
 class Mentor(Base):
     __tablename__ = 'mentors'
@@ -34,6 +69,11 @@ class Mentor(Base):
     is_active = Column(Boolean, default=True)
     
     user = relationship("User", backref="mentor_profile")
+    
+    __table_args__ = (
+        Index('ix_mentors_active', 'id', postgresql_where=text('is_active'), sqlite_where=text('is_active = 1')),
+        search_index('ix_mentors_search', name, bio, specialization),
+    )
 
 class Event(Base):
     __tablename__ = 'events'
@@ -50,6 +90,23 @@ class Event(Base):
     
     mentor = relationship("Mentor", backref="events")
     creator = relationship("User", backref="created_events")
+    
+    __table_args__ = (
+        # Ближайшие мероприятия и пагинация по (date_time, id)
+        Index('ix_events_active_date_time', 'date_time', 'id',
+              postgresql_where=text('is_active'), sqlite_where=text('is_active = 1')),
+        # Рейтинг менторов
+        Index('ix_events_active_mentor_id', 'mentor_id',
+              postgresql_where=text('is_active'), sqlite_where=text('is_active = 1')),
+    )
+
+# Подписки пользователей на напоминания о мероприятиях
+event_subscriptions = Table('event_subscriptions', Base.metadata,
+    Column('event_id', Integer, ForeignKey('events.id', ondelete='CASCADE'), primary_key=True),
+    Column('user_id', Integer, ForeignKey('users.id', ondelete='CASCADE'), primary_key=True),
+    # Когда отправлено напоминание; сбрасывается при переносе мероприятия
+    Column('reminded_at', DateTime),
+)
 
 class Lecture(Base):
     __tablename__ = 'lectures'
@@ -67,6 +124,12 @@ class Lecture(Base):
     
     mentor = relationship("Mentor", backref="lectures")
     uploader = relationship("User", backref="uploaded_lectures")
+    
+    __table_args__ = (
+        Index('ix_lectures_category_uploaded_at', 'category', 'uploaded_at', 'id'),
+        Index('ix_lectures_uploaded_at', 'uploaded_at', 'id'),
+        search_index('ix_lectures_search', title, description),
+    )
 
 class Vacancy(Base):
     __tablename__ = 'vacancies'
@@ -84,6 +147,12 @@ class Vacancy(Base):
     posted_by = Column(Integer, ForeignKey('users.id'))
     
     poster = relationship("User", backref="posted_vacancies")
+    
+    __table_args__ = (
+        Index('ix_vacancies_active_posted_at', 'posted_at', 'id',
+              postgresql_where=text('is_active'), sqlite_where=text('is_active = 1')),
+        search_index('ix_vacancies_search', title, description, requirements),
+    )
 
 class Project(Base):
     __tablename__ = 'projects'
@@ -92,9 +161,62 @@ class Project(Base):
     title = Column(String(200), nullable=False)
     description = Column(Text)
     status = Column(String(50), default='discussion')  # discussion, development, completed
-    required_skills = Column(Text)  # JSON строка со списком навыков
     contact_person = Column(Integer, ForeignKey('users.id'))
     created_at = Column(DateTime, default=datetime.utcnow)
     is_active = Column(Boolean, default=True)
     
-    contact = relationship("User", backref="managed_projects")
\ No newline at end of file
+    contact = relationship("User", backref="managed_projects")
+    skills = relationship("Skill", secondary=project_skills, backref="projects", order_by="Skill.name")
+    
+    __table_args__ = (
+        Index('ix_projects_active_created_at', 'created_at', 'id',
+              postgresql_where=text('is_active'), sqlite_where=text('is_active = 1')),
+        Index('ix_projects_active_status', 'status',
+              postgresql_where=text('is_active'), sqlite_where=text('is_active = 1')),
+        search_index('ix_projects_search', title, description),
+    )
+
+class FSMState(Base):
+    __tablename__ = 'fsm_states'
+    
+    # bot_id:chat_id:user_id:thread_id:destiny
+    key = Column(String(128), primary_key=True)
+    state = Column(String(100))
+    data = Column(Text)  # JSON с данными мастера
+    updated_at = Column(DateTime, default=datetime.utcnow, index=True)
+
+class ScheduledJob(Base):
+    __tablename__ = 'scheduled_jobs'
+    
+    id = Column(Integer, primary_key=True)
+    # Одна задача на ключ, например event_reminder:<id мероприятия>
+    key = Column(String(100), unique=True, nullable=False)
+    kind = Column(String(50), nullable=False)
+    run_at = Column(DateTime, nullable=False, index=True)
+    payload = Column(Text)  # JSON с параметрами задачи
+
+class Broadcast(Base):
+    __tablename__ = 'broadcasts'
+    
+    id = Column(Integer, primary_key=True)
+    text = Column(Text, nullable=False)
+    parse_mode = Column(String(20))
+    status = Column(String(20), default='running', index=True)  # running, done
+    # Прогресс: последний обработанный users.id, после перезапуска продолжаем с него
+    last_user_id = Column(Integer, default=0, nullable=False)
+    delivered = Column(Integer, default=0, nullable=False)
+    blocked = Column(Integer, default=0, nullable=False)
+    failed = Column(Integer, default=0, nullable=False)
+    admin_telegram_id = Column(BigInteger)  # кому отправить отчет
+    # Реплика, которая ведет рассылку, и срок ее аренды
+    owner = Column(String(64))
+    lease_until = Column(DateTime)
+    # Анонсируемое мероприятие: одновременно идет не больше одного анонса
+    event_id = Column(Integer, ForeignKey('events.id', ondelete='SET NULL'))
+    created_at = Column(DateTime, default=datetime.utcnow)
+    finished_at = Column(DateTime)
+    
+    __table_args__ = (
+        Index('ix_broadcasts_running_event_id', 'event_id', unique=True,
+              postgresql_where=status == 'running', sqlite_where=status == 'running'),
+    )
@@ -0,0 +1,219 @@
+"""Локальный сервер, отвечающий как Telegram Bot API, для нагрузочных и ручных проверок.
+
+Записывает отправленные и отредактированные сообщения, считает вызовы методов,
+умеет добавлять задержку и случайные 5xx. Бот подключается к нему через BOT_API_URL.
+
+Отдельный запуск (бот в другом терминале с BOT_API_URL=http://127.0.0.1:8081):
+    python app/fake_bot_api.py --port 8081 --delay 0.05
+"""
+import argparse
+import asyncio
+import json
+import random
+import time
+from collections import Counter, deque
+from dataclasses import dataclass
+from typing import Any, Dict, Optional
+from aiohttp import web
+
+BOT_USER = {"id": 1000000, "is_bot": True, "first_name": "IT Jamaat", "username": "it_jamaat_bot"}
+
+
+@dataclass
+class RecordedMessage:
+    chat_id: int
+    message_id: int
+    text: Optional[str]
+    reply_markup: Optional[dict]
+    edits: int = 0
+
+    def buttons(self) -> list[str]:
+        """callback_data всех кнопок сообщения"""
+        if not self.reply_markup:
+            return []
+        return [
+            button["callback_data"]
+            for row in self.reply_markup.get("inline_keyboard", [])
+            for button in row
+            if button.get("callback_data")
+        ]
+
+    def as_result(self) -> dict:
+        result = {
+            "message_id": self.message_id,
+            "date": int(time.time()),
+            "chat": {"id": self.chat_id, "type": "private"},
+            "from": BOT_USER,
+            "text": self.text or "",
+        }
+        if self.reply_markup:
+            result["reply_markup"] = self.reply_markup
+        return result
+
+
+class TelegramError(Exception):
+    def __init__(self, code: int, description: str):
+        self.code = code
+        self.description = description
+
+
+class FakeBotAPI:
+    """Сервер с поведением Bot API, достаточным для хендлеров бота.
+
+    Последнее сообщение каждого чата хранится целиком (из него нагрузочный тест
+    берет кнопки), остальные - только в ограниченной истории. Редактирование
+    без изменений отвечает ошибкой «message is not modified», как Telegram.
+    """
+
+    def __init__(self, delay: float = 0.0, error_rate: float = 0.0, history_size: int = 1000):
+        self.delay = delay
+        self.error_rate = error_rate
+        self.calls: Counter = Counter()
+        self.sent = 0
+        self.edited = 0
+        self.not_modified = 0
+        self.last_messages: Dict[int, RecordedMessage] = {}
+        self.history: deque = deque(maxlen=history_size)
+        self._message_ids: Counter = Counter()
+        self._updates: list[dict] = []
+        self._update_id = 0
+        self._runner: Optional[web.AppRunner] = None
+        self.url = ""
+
+    def app(self) -> web.Application:
+        app = web.Application()
+        app.router.add_route("*", "/bot{token}/{method}", self._handle)
+        return app
+
+    async def start(self, host: str = "127.0.0.1", port: int = 8081) -> str:
+        self._runner = web.AppRunner(self.app())
+        await self._runner.setup()
+        await web.TCPSite(self._runner, host, port).start()
+        # При port=0 порт выбирает система
+        port = self._runner.addresses[0][1]
+        self.url = f"http://{host}:{port}"
+        return self.url
+
+    async def stop(self):
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
+
+    def push_update(self, update: dict):
+        """Обновление для бота, работающего через getUpdates"""
+        self._update_id += 1
+        self._updates.append({**update, "update_id": self._update_id})
+
+    def last_message(self, chat_id: int) -> Optional[RecordedMessage]:
+        return self.last_messages.get(chat_id)
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            "sent": self.sent,
+            "edited": self.edited,
+            "not_modified": self.not_modified,
+            "calls": dict(self.calls.most_common()),
+        }
+
+    async def _handle(self, request: web.Request) -> web.Response:
+        method = request.match_info["method"]
+        self.calls[method] += 1
+        params = dict(await request.post()) if request.body_exists else {}
+        if self.delay:
+            await asyncio.sleep(self.delay)
+        if self.error_rate and random.random() < self.error_rate:
+            return self._error(502, "Bad Gateway")
+
+        handler = getattr(self, "_" + method, None)
+        try:
+            result = await handler(params) if handler else True
+        except TelegramError as error:
+            return self._error(error.code, error.description)
+        return web.json_response({"ok": True, "result": result})
+
+    @staticmethod
+    def _error(code: int, description: str) -> web.Response:
+        return web.json_response({"ok": False, "error_code": code, "description": description}, status=code)
+
+    @staticmethod
+    def _markup(params: dict) -> Optional[dict]:
+        markup = params.get("reply_markup")
+        return json.loads(markup) if markup else None
+
+    def _record(self, method: str, message: RecordedMessage):
+        self.last_messages[message.chat_id] = message
+        self.history.append((method, message.chat_id, message.message_id, message.text))
+
+    async def _getMe(self, params: dict) -> dict:
+        return BOT_USER
+
+    async def _getUpdates(self, params: dict) -> list:
+        offset = int(params.get("offset") or 0)
+        self._updates = [update for update in self._updates if update["update_id"] >= offset]
+        if not self._updates:
+            # Длинный опрос: ждем недолго, чтобы остановка не зависала
+            await asyncio.sleep(min(float(params.get("timeout") or 0), 1.0))
+        return self._updates[:int(params.get("limit") or 100)]
+
+    async def _sendMessage(self, params: dict) -> dict:
+        chat_id = int(params["chat_id"])
+        self._message_ids[chat_id] += 1
+        message = RecordedMessage(chat_id, self._message_ids[chat_id], params.get("text"), self._markup(params))
+        self.sent += 1
+        self._record("sendMessage", message)
+        return message.as_result()
+
+    async def _editMessageText(self, params: dict) -> dict | bool:
+        if "inline_message_id" in params:
+            self.edited += 1
+            return True
+        chat_id, message_id = int(params["chat_id"]), int(params["message_id"])
+        text, markup = params.get("text"), self._markup(params)
+        previous = self.last_messages.get(chat_id)
+        if previous is not None and previous.message_id == message_id:
+            if previous.text == text and previous.reply_markup == markup:
+                self.not_modified += 1
+                raise TelegramError(400, "Bad Request: message is not modified: specified new message content "
+                                         "and reply markup are exactly the same as a current content and reply "
+                                         "markup of the message")
+            message = previous
+            message.text, message.reply_markup = text, markup
+            message.edits += 1
+        else:
+            message = RecordedMessage(chat_id, message_id, text, markup, edits=1)
+        self.edited += 1
+        self._record("editMessageText", message)
+        return message.as_result()
+
+    async def _editMessageReplyMarkup(self, params: dict) -> dict:
+        chat_id, message_id = int(params["chat_id"]), int(params["message_id"])
+        previous = self.last_messages.get(chat_id)
+        text = previous.text if previous is not None and previous.message_id == message_id else ""
+        message = RecordedMessage(chat_id, message_id, text, self._markup(params), edits=1)
+        self.edited += 1
+        self._record("editMessageReplyMarkup", message)
+        return message.as_result()
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="Локальный сервер Bot API")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8081)
+    parser.add_argument("--delay", type=float, default=0.0, help="задержка ответа, с")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="доля ответов 502")
+    args = parser.parse_args()
+
+    server = FakeBotAPI(delay=args.delay, error_rate=args.error_rate)
+    print(f"Bot API: {await server.start(args.host, args.port)}")
+    try:
+        await asyncio.Event().wait()
+    finally:
+        print(json.dumps(server.summary(), ensure_ascii=False, indent=2))
+        await server.stop()
+
+
+if __name__ == "__main__":
+    try:
+        asyncio.run(main())
+    except KeyboardInterrupt:
+        pass
@@ -3,10 +3,21 @@ from aiogram.types import Message, CallbackQuery, InlineKeyboardMarkup, InlineKe
 from aiogram.filters import Command
 from aiogram.fsm.context import FSMContext
 from aiogram.fsm.state import State, StatesGroup
-from sqlalchemy import select, and_
+from sqlalchemy import select
 from sqlalchemy.orm import selectinload
-from database.database import AsyncSessionLocal
-from database.models import User, Mentor, Event, Lecture, Vacancy, Project
+from database.database import AsyncSessionLocal, engine, pool_metrics, read_session, mark_write
+from database.models import Mentor, Event
+from services.cache import listing_cache
+from handlers.user_handlers import leave_wizard, escape_markdown
+from services.reminders import schedule_event_reminder, cancel_event_reminder
+from services.broadcast import broadcast_engine
+from middlewares.concurrency import update_pool
+from middlewares.throttling import throttling
+from bot_session import TunedAiohttpSession
+from services.stats import (
+    get_stats_snapshot, format_snapshot_age, top_mentors, activity_histogram, sparkline,
+    truncate_datetime, LECTURE_CATEGORIES, PROJECT_STATUSES, LEADERBOARD_WINDOWS
+)
 import os
 from datetime import datetime, timedelta
 
@@ -14,6 +25,9 @@ admin_router = Router()
 
 ADMIN_IDS = list(map(int, os.getenv("ADMIN_IDS", "").split(",")))
 
+# Периоды гистограммы активности: дни -> размер интервала
+HISTOGRAM_RANGES = {14: "day", 30: "day", 90: "week", 365: "month"}
+
 class AdminStates(StatesGroup):
     adding_mentor = State()
     mentor_name = State()
@@ -34,15 +48,26 @@ class AdminStates(StatesGroup):
     edit_event_datetime = State()
     edit_event_location = State()
     edit_event_mentors = State()
+    
+    broadcast_text = State()
 
 async def is_admin(user_id: int) -> bool:
     return user_id in ADMIN_IDS
 
+async def content_changed(user_id: int, *sections: str, ids: tuple = ()):
+    """После записи сбрасывает кэш разделов и направляет их чтение на основную базу.
+
+    ids - измененные записи: inline-индекс перечитает только их карточки
+    """
+    mark_write(user_id, *sections)
+    await listing_cache.invalidate(*sections, ids=ids)
+
 @admin_router.message(Command("admin"))
-async def admin_panel(message: Message):
+async def admin_panel(message: Message, state: FSMContext, raw_state: str | None):
     if not await is_admin(message.from_user.id):
         await message.answer("❌ У вас нет прав администратора")
         return
+    await leave_wizard(state, raw_state)
     
     keyboard = InlineKeyboardMarkup(inline_keyboard=[
         [InlineKeyboardButton(text="➕ Добавить ментора", callback_data="admin_add_mentor")],
@@ -50,6 +75,7 @@ async def admin_panel(message: Message):
         [InlineKeyboardButton(text="📅 Добавить мероприятие", callback_data="admin_add_event")],
         [InlineKeyboardButton(text="✏️ Редактировать мероприятие", callback_data="admin_edit_event")],
         [InlineKeyboardButton(text="🗑 Удалить мероприятие", callback_data="admin_delete_event")],
+        [InlineKeyboardButton(text="📣 Рассылка", callback_data="admin_broadcast")],
         [InlineKeyboardButton(text="📊 Статистика", callback_data="admin_stats")]
     ])
     
@@ -94,6 +120,7 @@ async def save_mentor(message: Message, state: FSMContext):
         )
         session.add(mentor)
         await session.commit()
+        await content_changed(message.from_user.id, "mentors")
     
     await message.answer(f"✅ Ментор **{data['name']}** успешно добавлен!", parse_mode="Markdown")
     await state.clear()
@@ -232,6 +259,8 @@ async def select_mentor_for_event(callback: CallbackQuery, state: FSMContext):
         )
         session.add(event)
         await session.commit()
+        await content_changed(callback.from_user.id, "events", ids=(event.id,))
+    await schedule_event_reminder(event.id, event.date_time)
     
     # Формируем текст подтверждения
     confirmation_text = "✅ **Мероприятие успешно создано!**\n\n"
@@ -241,8 +270,9 @@ async def select_mentor_for_event(callback: CallbackQuery, state: FSMContext):
     confirmation_text += f"📍 **Место:** {data['location']}\n"
     confirmation_text += f"👨‍🏫 **Ментор:** {mentor_name}\n"
     
-    # Добавляем кнопку возврата в админ панель
+    # Анонс нового мероприятия всем пользователям и возврат в админ панель
     keyboard = InlineKeyboardMarkup(inline_keyboard=[
+        [InlineKeyboardButton(text="📣 Анонсировать всем", callback_data=f"announce_event_{event.id}")],
         [InlineKeyboardButton(text="🔧 Вернуться в админ панель", callback_data="admin_back")]
     ])
     
@@ -264,6 +294,8 @@ async def save_event_without_mentor(message: Message, state: FSMContext):
         )
         session.add(event)
         await session.commit()
+        await content_changed(message.from_user.id, "events", ids=(event.id,))
+    await schedule_event_reminder(event.id, event.date_time)
     
     # Формируем текст подтверждения
     confirmation_text = "✅ **Мероприятие успешно создано!**\n\n"
@@ -273,8 +305,9 @@ async def save_event_without_mentor(message: Message, state: FSMContext):
     confirmation_text += f"📍 **Место:** {data['location']}\n"
     confirmation_text += f"👨‍🏫 **Ментор:** Не назначен\n"
     
-    # Добавляем кнопку возврата в админ панель
+    # Анонс нового мероприятия всем пользователям и возврат в админ панель
     keyboard = InlineKeyboardMarkup(inline_keyboard=[
+        [InlineKeyboardButton(text="📣 Анонсировать всем", callback_data=f"announce_event_{event.id}")],
         [InlineKeyboardButton(text="🔧 Вернуться в админ панель", callback_data="admin_back")]
     ])
     
@@ -293,6 +326,7 @@ async def cancel_add_event(callback: CallbackQuery, state: FSMContext):
         [InlineKeyboardButton(text="📅 Добавить мероприятие", callback_data="admin_add_event")],
         [InlineKeyboardButton(text="✏️ Редактировать мероприятие", callback_data="admin_edit_event")],
         [InlineKeyboardButton(text="🗑 Удалить мероприятие", callback_data="admin_delete_event")],
+        [InlineKeyboardButton(text="📣 Рассылка", callback_data="admin_broadcast")],
         [InlineKeyboardButton(text="📊 Статистика", callback_data="admin_stats")]
     ])
     
@@ -304,9 +338,10 @@ async def cancel_add_event(callback: CallbackQuery, state: FSMContext):
 
 # Редактирование мероприятий
 @admin_router.callback_query(F.data == "admin_edit_event")
-async def select_event_to_edit(callback: CallbackQuery):
+async def select_event_to_edit(callback: CallbackQuery, state: FSMContext, raw_state: str | None):
     if not await is_admin(callback.from_user.id):
         return
+    await leave_wizard(state, raw_state)
     
     async with AsyncSessionLocal() as session:
         result = await session.execute(
@@ -343,7 +378,8 @@ async def select_event_to_edit(callback: CallbackQuery):
     )
 
 @admin_router.callback_query(F.data.startswith("show_edit_options_"))
-async def show_edit_options(callback: CallbackQuery):
+async def show_edit_options(callback: CallbackQuery, state: FSMContext, raw_state: str | None):
+    await leave_wizard(state, raw_state)
     event_id = int(callback.data.split("_")[-1])
     
     async with AsyncSessionLocal() as session:
@@ -397,6 +433,7 @@ async def save_edited_title(message: Message, state: FSMContext):
         event = result.scalar_one()
         event.title = message.text
         await session.commit()
+        await content_changed(message.from_user.id, "events", ids=(event.id,))
     
     await message.answer(f"✅ Название изменено на: **{message.text}**", parse_mode="Markdown")
     await state.clear()
@@ -423,6 +460,7 @@ async def save_edited_description(message: Message, state: FSMContext):
         event = result.scalar_one()
         event.description = message.text
         await session.commit()
+        await content_changed(message.from_user.id, "events", ids=(event.id,))
     
     await message.answer("✅ Описание успешно изменено!")
     await state.clear()
@@ -451,6 +489,9 @@ async def save_edited_datetime(message: Message, state: FSMContext):
             event = result.scalar_one()
             event.date_time = new_datetime
             await session.commit()
+            await content_changed(message.from_user.id, "events", ids=(event.id,))
+        # Напоминание переносится на новое время
+        await schedule_event_reminder(event_id, new_datetime, rescheduled=True)
         
         await message.answer(f"✅ Дата изменена на: **{new_datetime.strftime('%d.%m.%Y %H:%M')}**", parse_mode="Markdown")
         await state.clear()
@@ -479,6 +520,7 @@ async def save_edited_location(message: Message, state: FSMContext):
         event = result.scalar_one()
         event.location = message.text
         await session.commit()
+        await content_changed(message.from_user.id, "events", ids=(event.id,))
     
     await message.answer(f"✅ Место изменено на: **{message.text}**", parse_mode="Markdown")
     await state.clear()
@@ -562,6 +604,7 @@ async def assign_mentor_to_event(callback: CallbackQuery, state: FSMContext):
         # Назначаем ментора
         event.mentor_id = mentor_id
         await session.commit()
+        await content_changed(callback.from_user.id, "events", ids=(event.id,))
         
         # Получаем имя ментора для отображения
         mentor_name = "не назначен"
@@ -581,9 +624,10 @@ async def assign_mentor_to_event(callback: CallbackQuery, state: FSMContext):
 
 # Удаление мероприятий
 @admin_router.callback_query(F.data == "admin_delete_event")
-async def select_event_to_delete(callback: CallbackQuery):
+async def select_event_to_delete(callback: CallbackQuery, state: FSMContext, raw_state: str | None):
     if not await is_admin(callback.from_user.id):
         return
+    await leave_wizard(state, raw_state)
     
     async with AsyncSessionLocal() as session:
         result = await session.execute(
@@ -658,6 +702,8 @@ async def delete_event_confirmed(callback: CallbackQuery):
             # Помечаем как неактивное вместо физического удаления
             event.is_active = False
             await session.commit()
+            await content_changed(callback.from_user.id, "events", ids=(event.id,))
+            await cancel_event_reminder(event_id)
             
             await callback.message.edit_text(
                 f"✅ Мероприятие **{event.title}** успешно удалено!",
@@ -668,9 +714,10 @@ async def delete_event_confirmed(callback: CallbackQuery):
 
 # Удаление менторов
 @admin_router.callback_query(F.data == "admin_remove_mentor")
-async def select_mentor_to_remove(callback: CallbackQuery):
+async def select_mentor_to_remove(callback: CallbackQuery, state: FSMContext, raw_state: str | None):
     if not await is_admin(callback.from_user.id):
         return
+    await leave_wizard(state, raw_state)
     
     async with AsyncSessionLocal() as session:
         result = await session.execute(
@@ -740,6 +787,7 @@ async def remove_mentor_confirmed(callback: CallbackQuery):
             # Помечаем как неактивного
             mentor.is_active = False
             await session.commit()
+            await content_changed(callback.from_user.id, "mentors")
             
             await callback.message.edit_text(
                 f"✅ Ментор **{mentor.name}** успешно удален!",
@@ -750,167 +798,61 @@ async def remove_mentor_confirmed(callback: CallbackQuery):
 
 
 @admin_router.callback_query(F.data == "admin_stats")
-async def show_admin_stats(callback: CallbackQuery):
+async def show_admin_stats(callback: CallbackQuery, state: FSMContext, raw_state: str | None):
     if not await is_admin(callback.from_user.id):
         return
+    await leave_wizard(state, raw_state)
     
-    async with AsyncSessionLocal() as session:
-        # Общая статистика пользователей
-        users_result = await session.execute(select(User))
-        total_users = len(users_result.scalars().all())
-        
-        # Количество активных менторов
-        mentors_result = await session.execute(
-            select(Mentor).where(Mentor.is_active == True)
-        )
-        active_mentors = len(mentors_result.scalars().all())
-        
-        # Количество активных мероприятий
-        events_result = await session.execute(
-            select(Event).where(Event.is_active == True)
-        )
-        active_events = len(events_result.scalars().all())
-        
-        # Количество будущих мероприятий
-        future_events_result = await session.execute(
-            select(Event).where(
-                and_(Event.is_active == True, Event.date_time > datetime.utcnow())
-            )
-        )
-        future_events = len(future_events_result.scalars().all())
-        
-        # Количество прошедших мероприятий
-        past_events_result = await session.execute(
-            select(Event).where(
-                and_(Event.is_active == True, Event.date_time <= datetime.utcnow())
-            )
-        )
-        past_events = len(past_events_result.scalars().all())
-        
-        # Количество лекций
-        lectures_result = await session.execute(select(Lecture))
-        total_lectures = len(lectures_result.scalars().all())
-        
-        # Инициализируем переменные для статистики по вакансиям и проектам
-        active_vacancies = 0
-        active_projects = 0
-        discussion_count = 0
-        development_count = 0
-        completed_count = 0
-        programming_count = 0
-        security_count = 0
-        data_count = 0
-        web_count = 0
-        mobile_count = 0
-        
-        try:
-            # Количество активных вакансий
-            vacancies_result = await session.execute(
-                select(Vacancy).where(Vacancy.is_active == True)
-            )
-            active_vacancies = len(vacancies_result.scalars().all())
-        except Exception:
-            # Если таблица Vacancy не существует, пропускаем
-            pass
-        
-        try:
-            # Количество активных проектов
-            projects_result = await session.execute(
-                select(Project).where(Project.is_active == True)
-            )
-            active_projects = len(projects_result.scalars().all())
-            
-            # Статистика по статусам проектов
-            discussion_projects = await session.execute(
-                select(Project).where(
-                    and_(Project.is_active == True, Project.status == 'discussion')
-                )
-            )
-            discussion_count = len(discussion_projects.scalars().all())
-            
-            development_projects = await session.execute(
-                select(Project).where(
-                    and_(Project.is_active == True, Project.status == 'development')
-                )
-            )
-            development_count = len(development_projects.scalars().all())
-            
-            completed_projects = await session.execute(
-                select(Project).where(
-                    and_(Project.is_active == True, Project.status == 'completed')
-                )
-            )
-            completed_count = len(completed_projects.scalars().all())
-        except Exception:
-            # Если таблица Project не существует, пропускаем
-            pass
-        
-        try:
-            # Статистика по категориям лекций
-            programming_lectures = await session.execute(
-                select(Lecture).where(Lecture.category == 'Программирование')
-            )
-            programming_count = len(programming_lectures.scalars().all())
-            
-            security_lectures = await session.execute(
-                select(Lecture).where(Lecture.category == 'Кибербезопасность')
-            )
-            security_count = len(security_lectures.scalars().all())
-            
-            data_lectures = await session.execute(
-                select(Lecture).where(Lecture.category == 'Data Science')
-            )
-            data_count = len(data_lectures.scalars().all())
-            
-            web_lectures = await session.execute(
-                select(Lecture).where(Lecture.category == 'Web разработка')
-            )
-            web_count = len(web_lectures.scalars().all())
-            
-            mobile_lectures = await session.execute(
-                select(Lecture).where(Lecture.category == 'Mobile разработка')
-            )
-            mobile_count = len(mobile_lectures.scalars().all())
-        except Exception:
-            # Если у Lecture нет поля category, пропускаем
-            pass
+    stats = await get_stats_snapshot()
     
     # Формируем текст статистики
     text = "📊 **Статистика IT Jama'at**\n\n"
     
     text += "👥 **Пользователи:**\n"
-    text += f"• Всего пользователей: {total_users}\n"
-    text += f"• Активных менторов: {active_mentors}\n\n"
+    text += f"• Всего пользователей: {stats.total_users}\n"
+    text += f"• Активных за сутки (DAU): {stats.daily_active_users}\n"
+    text += f"• Активных за 30 дней (MAU): {stats.monthly_active_users}\n"
+    text += f"• Активных менторов: {stats.active_mentors}\n\n"
     
     text += "📅 **Мероприятия:**\n"
-    text += f"• Всего активных: {active_events}\n"
-    text += f"• Предстоящих: {future_events}\n"
-    text += f"• Прошедших: {past_events}\n\n"
+    text += f"• Всего активных: {stats.active_events}\n"
+    text += f"• Предстоящих: {stats.future_events}\n"
+    text += f"• Прошедших: {stats.past_events}\n\n"
     
     text += "📚 **Лекции:**\n"
-    text += f"• Всего лекций: {total_lectures}\n"
-    if programming_count > 0:
-        text += f"• Программирование: {programming_count}\n"
-    if security_count > 0:
-        text += f"• Кибербезопасность: {security_count}\n"
-    if data_count > 0:
-        text += f"• Data Science: {data_count}\n"
-    if web_count > 0:
-        text += f"• Web разработка: {web_count}\n"
-    if mobile_count > 0:
-        text += f"• Mobile разработка: {mobile_count}\n"
+    text += f"• Всего лекций: {stats.total_lectures}\n"
+    for category in LECTURE_CATEGORIES:
+        count = stats.lectures_by_category.get(category, 0)
+        if count > 0:
+            text += f"• {category}: {count}\n"
     
     text += "\n💼 **Работа:**\n"
-    text += f"• Активных вакансий: {active_vacancies}\n\n"
+    text += f"• Активных вакансий: {stats.active_vacancies}\n\n"
     
     text += "🚀 **Проекты:**\n"
-    text += f"• Всего активных: {active_projects}\n"
-    if discussion_count > 0:
-        text += f"• На обсуждении: {discussion_count}\n"
-    if development_count > 0:
-        text += f"• В разработке: {development_count}\n"
-    if completed_count > 0:
-        text += f"• Завершенных: {completed_count}\n"
+    text += f"• Всего активных: {stats.active_projects}\n"
+    status_text = {"discussion": "На обсуждении", "development": "В разработке", "completed": "Завершенных"}
+    for status in PROJECT_STATUSES:
+        count = stats.projects_by_status.get(status, 0)
+        if count > 0:
+            text += f"• {status_text[status]}: {count}\n"
+    
+    pool = update_pool.metrics()
+    text += "\n⚙️ **Обработка обновлений:**\n"
+    text += f"• В очереди: {pool['queued']}, в работе: {pool['running']}\n"
+    text += f"• Ожидание: в среднем {pool['avg_wait_ms']} мс, максимум {pool['max_wait_ms']} мс\n"
+    flood = throttling.metrics()
+    text += f"• Отброшено флуда: {flood['dropped']}, повторных нажатий: {flood['cooled']}\n"
+    
+    if isinstance(callback.bot.session, TunedAiohttpSession):
+        api = callback.bot.session.metrics()
+        text += f"• Запросов к Bot API: {api['requests']}, в среднем {api['avg_ms']} мс, повторов {api['retried']}\n"
+    
+    db_pool = pool_metrics(engine)
+    text += f"• Соединений БД занято: {db_pool['checked_out']} из {db_pool['size'] + db_pool['overflow']}, "
+    text += f"ожидание {db_pool['avg_wait_ms']} мс (макс. {db_pool['max_wait_ms']} мс)\n"
+    
+    text += f"\n{format_snapshot_age(stats)}"
     
     # Добавляем кнопки для более детальной статистики
     keyboard = InlineKeyboardMarkup(inline_keyboard=[
@@ -922,216 +864,200 @@ async def show_admin_stats(callback: CallbackQuery):
     await callback.message.edit_text(text, reply_markup=keyboard, parse_mode="Markdown")
 
 
-@admin_router.callback_query(F.data == "detailed_stats")
-async def show_detailed_stats(callback: CallbackQuery):
+@admin_router.callback_query(F.data.startswith("detailed_stats"))
+async def show_detailed_stats(callback: CallbackQuery, state: FSMContext, raw_state: str | None):
     if not await is_admin(callback.from_user.id):
         return
+    await leave_wizard(state, raw_state)
     
-    async with AsyncSessionLocal() as session:
-        # Статистика по регистрациям за последние 30 дней
-        thirty_days_ago = datetime.utcnow() - timedelta(days=30)
-        recent_users = await session.execute(
-            select(User).where(User.created_at >= thirty_days_ago)
-        )
-        recent_users_count = len(recent_users.scalars().all())
-        
-        # Статистика по мероприятиям за последние 30 дней
-        recent_events = await session.execute(
-            select(Event).where(
-                and_(Event.is_active == True, Event.date_time >= thirty_days_ago)
-            )
-        )
-        recent_events_count = len(recent_events.scalars().all())
-        
-        # Статистика по лекциям за последние 30 дней
-        recent_lectures_count = 0
-        recent_vacancies_count = 0
-        recent_projects_count = 0
-        
-        try:
-            recent_lectures = await session.execute(
-                select(Lecture).where(Lecture.uploaded_at >= thirty_days_ago)
-            )
-            recent_lectures_count = len(recent_lectures.scalars().all())
-        except Exception:
-            pass
-        
-        try:
-            # Статистика по вакансиям за последние 30 дней
-            recent_vacancies = await session.execute(
-                select(Vacancy).where(Vacancy.posted_at >= thirty_days_ago)
-            )
-            recent_vacancies_count = len(recent_vacancies.scalars().all())
-        except Exception:
-            pass
-        
-        try:
-            # Статистика по проектам за последние 30 дней
-            recent_projects = await session.execute(
-                select(Project).where(Project.created_at >= thirty_days_ago)
-            )
-            recent_projects_count = len(recent_projects.scalars().all())
-        except Exception:
-            pass
-        
+    # detailed_stats - за все время, detailed_stats_<дни> - за окно
+    window = callback.data.replace("detailed_stats", "").lstrip("_")
+    days = int(window) if window.isdigit() else None
+    
+    stats = await get_stats_snapshot()
+    
+    async with read_session(user_id=callback.from_user.id) as session:
         # Топ-5 менторов по количеству мероприятий
-        mentor_events = {}
-        try:
-            top_mentors = await session.execute(
-                select(Mentor.name, Event.mentor_id)
-                .join(Event)
-                .where(Event.is_active == True)
-                .group_by(Mentor.name, Event.mentor_id)
-            )
-            
-            for mentor_name, mentor_id in top_mentors:
-                mentor_events_count = await session.execute(
-                    select(Event).where(
-                        and_(Event.mentor_id == mentor_id, Event.is_active == True)
-                    )
-                )
-                mentor_events[mentor_name] = len(mentor_events_count.scalars().all())
-        except Exception:
-            pass
-        
-        # Сортируем менторов по количеству мероприятий
-        sorted_mentors = sorted(mentor_events.items(), key=lambda x: x[1], reverse=True)[:5]
+        sorted_mentors = await top_mentors(session, days=days, limit=5)
     
     text = "📈 **Детальная статистика (последние 30 дней)**\n\n"
     
     text += "📊 **Активность:**\n"
-    text += f"• Новых пользователей: {recent_users_count}\n"
-    text += f"• Новых мероприятий: {recent_events_count}\n"
-    text += f"• Новых лекций: {recent_lectures_count}\n"
-    text += f"• Новых вакансий: {recent_vacancies_count}\n"
-    text += f"• Новых проектов: {recent_projects_count}\n\n"
+    text += f"• Новых пользователей: {stats.recent_users}\n"
+    text += f"• Новых мероприятий: {stats.recent_events}\n"
+    text += f"• Новых лекций: {stats.recent_lectures}\n"
+    text += f"• Новых вакансий: {stats.recent_vacancies}\n"
+    text += f"• Новых проектов: {stats.recent_projects}\n\n"
     
     if sorted_mentors:
-        text += "🏆 **Топ менторов по мероприятиям:**\n"
+        period_text = f"за {days} дн." if days else "за все время"
+        text += f"🏆 **Топ менторов по мероприятиям ({period_text}):**\n"
         for i, (mentor_name, count) in enumerate(sorted_mentors, 1):
             text += f"{i}. {mentor_name}: {count} мероприятий\n"
     
+    text += f"\n{format_snapshot_age(stats)}"
+    
+    window_buttons = []
+    for window_days in LEADERBOARD_WINDOWS:
+        label = f"{window_days} дн." if window_days else "Все время"
+        if window_days == days:
+            label = f"✅ {label}"
+        suffix = f"_{window_days}" if window_days else ""
+        window_buttons.append(InlineKeyboardButton(text=label, callback_data=f"detailed_stats{suffix}"))
+    
     keyboard = InlineKeyboardMarkup(inline_keyboard=[
+        window_buttons,
         [InlineKeyboardButton(text="◀️ К общей статистике", callback_data="admin_stats")]
     ])
     
     await callback.message.edit_text(text, reply_markup=keyboard, parse_mode="Markdown")
 
 
-@admin_router.callback_query(F.data == "daily_stats")
-async def show_daily_stats(callback: CallbackQuery):
+@admin_router.callback_query(F.data.startswith("daily_stats"))
+async def show_daily_stats(callback: CallbackQuery, state: FSMContext, raw_state: str | None):
     if not await is_admin(callback.from_user.id):
         return
+    await leave_wizard(state, raw_state)
     
-    async with AsyncSessionLocal() as session:
-        # Статистика за сегодня
-        today = datetime.utcnow().replace(hour=0, minute=0, second=0, microsecond=0)
-        tomorrow = today + timedelta(days=1)
-        
-        today_users = await session.execute(
-            select(User).where(
-                and_(User.created_at >= today, User.created_at < tomorrow)
-            )
-        )
-        today_users_count = len(today_users.scalars().all())
-        
-        today_events = await session.execute(
-            select(Event).where(
-                and_(Event.date_time >= today, Event.date_time < tomorrow, Event.is_active == True)
-            )
-        )
-        today_events_count = len(today_events.scalars().all())
-        
-        today_lectures_count = 0
-        today_vacancies_count = 0
-        today_projects_count = 0
-        
-        try:
-            today_lectures = await session.execute(
-                select(Lecture).where(
-                    and_(Lecture.uploaded_at >= today, Lecture.uploaded_at < tomorrow)
-                )
-            )
-            today_lectures_count = len(today_lectures.scalars().all())
-        except Exception:
-            pass
-        
-        try:
-            today_vacancies = await session.execute(
-                select(Vacancy).where(
-                    and_(Vacancy.posted_at >= today, Vacancy.posted_at < tomorrow)
-                )
-            )
-            today_vacancies_count = len(today_vacancies.scalars().all())
-        except Exception:
-            pass
-        
-        try:
-            today_projects = await session.execute(
-                select(Project).where(
-                    and_(Project.created_at >= today, Project.created_at < tomorrow)
-                )
-            )
-            today_projects_count = len(today_projects.scalars().all())
-        except Exception:
-            pass
-        
-        # Статистика за вчера
-        yesterday = today - timedelta(days=1)
-        
-        yesterday_users = await session.execute(
-            select(User).where(
-                and_(User.created_at >= yesterday, User.created_at < today)
-            )
-        )
-        yesterday_users_count = len(yesterday_users.scalars().all())
-        
-        # Статистика за неделю
-        week_ago = today - timedelta(days=7)
-        
-        week_users = await session.execute(
-            select(User).where(User.created_at >= week_ago)
-        )
-        week_users_count = len(week_users.scalars().all())
-        
-        week_events = await session.execute(
-            select(Event).where(
-                and_(Event.date_time >= week_ago, Event.is_active == True)
-            )
-        )
-        week_events_count = len(week_events.scalars().all())
+    # daily_stats_<дни> - период гистограммы
+    window = callback.data.replace("daily_stats", "").lstrip("_")
+    days = int(window) if window.isdigit() and int(window) in HISTOGRAM_RANGES else 14
+    unit = HISTOGRAM_RANGES[days]
+    
+    stats = await get_stats_snapshot()
+    
+    end = truncate_datetime(datetime.utcnow(), "day") + timedelta(days=1)
+    async with read_session(user_id=callback.from_user.id) as session:
+        histogram = await activity_histogram(session, end - timedelta(days=days), end, unit)
     
     text = "📊 **Статистика по дням**\n\n"
     
     text += "📅 **Сегодня:**\n"
-    text += f"• Новых пользователей: {today_users_count}\n"
-    text += f"• Мероприятий: {today_events_count}\n"
-    text += f"• Новых лекций: {today_lectures_count}\n"
-    text += f"• Новых вакансий: {today_vacancies_count}\n"
-    text += f"• Новых проектов: {today_projects_count}\n\n"
+    text += f"• Новых пользователей: {stats.today_users}\n"
+    text += f"• Мероприятий: {stats.today_events}\n"
+    text += f"• Новых лекций: {stats.today_lectures}\n"
+    text += f"• Новых вакансий: {stats.today_vacancies}\n"
+    text += f"• Новых проектов: {stats.today_projects}\n\n"
     
     text += "📅 **Вчера:**\n"
-    text += f"• Новых пользователей: {yesterday_users_count}\n\n"
+    text += f"• Новых пользователей: {stats.yesterday_users}\n\n"
     
     text += "📅 **За неделю:**\n"
-    text += f"• Новых пользователей: {week_users_count}\n"
-    text += f"• Мероприятий: {week_events_count}\n"
+    text += f"• Новых пользователей: {stats.week_users}\n"
+    text += f"• Мероприятий: {stats.week_events}\n\n"
+    
+    unit_text = {"day": "по дням", "week": "по неделям", "month": "по месяцам"}
+    series_text = {
+        "users": "👥 Пользователи",
+        "events": "📅 Мероприятия",
+        "lectures": "📚 Лекции",
+        "vacancies": "💼 Вакансии",
+        "projects": "🚀 Проекты",
+    }
+    text += f"📈 **Динамика за {days} дн. ({unit_text[unit]}):**\n"
+    for name, values in histogram.series.items():
+        text += f"{series_text[name]}: {sum(values)}\n`{sparkline(values)}`\n"
+    
+    text += f"\n{format_snapshot_age(stats)}"
+    
+    range_buttons = []
+    for range_days in HISTOGRAM_RANGES:
+        label = f"{range_days} дн."
+        if range_days == days:
+            label = f"✅ {label}"
+        range_buttons.append(InlineKeyboardButton(text=label, callback_data=f"daily_stats_{range_days}"))
     
     keyboard = InlineKeyboardMarkup(inline_keyboard=[
+        range_buttons,
         [InlineKeyboardButton(text="◀️ К общей статистике", callback_data="admin_stats")]
     ])
     
     await callback.message.edit_text(text, reply_markup=keyboard, parse_mode="Markdown")
 
 
+# Описание в анонсе обрезается: сообщение Telegram - не больше 4096 символов
+ANNOUNCEMENT_DESCRIPTION_LIMIT = 3000
+
+def event_announcement(event: Event) -> str:
+    mentor_name = escape_markdown(event.mentor.name) if event.mentor else "Не указан"
+    text = "📣 **Новое мероприятие!**\n\n"
+    text += f"📅 **{escape_markdown(event.title)}**\n"
+    text += f"📍 {escape_markdown(event.location or 'Онлайн')}\n"
+    text += f"⏰ {event.date_time.strftime('%d.%m.%Y %H:%M')}\n"
+    text += f"👨‍🏫 {mentor_name}\n"
+    if event.description:
+        description = event.description
+        if len(description) > ANNOUNCEMENT_DESCRIPTION_LIMIT:
+            description = description[:ANNOUNCEMENT_DESCRIPTION_LIMIT].rstrip() + "…"
+        text += f"\n{escape_markdown(description)}\n"
+    text += "\nПодписаться на напоминание можно в разделе «📅 Мероприятия»"
+    return text
+
+@admin_router.callback_query(F.data.startswith("announce_event_"))
+async def announce_event(callback: CallbackQuery):
+    if not await is_admin(callback.from_user.id):
+        return
+    
+    event_id = int(callback.data.split("_")[-1])
+    async with AsyncSessionLocal() as session:
+        result = await session.execute(
+            select(Event).options(selectinload(Event.mentor)).where(Event.id == event_id)
+        )
+        event = result.scalar_one_or_none()
+    if event is None or not event.is_active:
+        await callback.answer("❌ Мероприятие не найдено")
+        return
+    
+    broadcast_id = await broadcast_engine.create(
+        event_announcement(event), admin_telegram_id=callback.from_user.id, parse_mode="Markdown", event_id=event.id
+    )
+    if broadcast_id is None:
+        await callback.answer("📣 Анонс этого мероприятия уже рассылается")
+        return
+    await callback.message.edit_reply_markup(reply_markup=InlineKeyboardMarkup(inline_keyboard=[
+        [InlineKeyboardButton(text="🔧 Вернуться в админ панель", callback_data="admin_back")]
+    ]))
+    await callback.answer(f"📣 Рассылка #{broadcast_id} запущена, отчет придет по завершении")
+
+# Рассылка произвольного текста (например, о новой вакансии)
+@admin_router.callback_query(F.data == "admin_broadcast")
+async def start_broadcast(callback: CallbackQuery, state: FSMContext):
+    if not await is_admin(callback.from_user.id):
+        return
+    
+    keyboard = InlineKeyboardMarkup(inline_keyboard=[
+        [InlineKeyboardButton(text="◀️ Назад", callback_data="admin_back")]
+    ])
+    await callback.message.edit_text("📣 Отправьте текст рассылки для всех пользователей:", reply_markup=keyboard)
+    await state.set_state(AdminStates.broadcast_text)
+
+@admin_router.message(AdminStates.broadcast_text, F.text)
+async def send_broadcast(message: Message, state: FSMContext):
+    if not await is_admin(message.from_user.id):
+        return
+    
+    broadcast_id = await broadcast_engine.create(message.text, admin_telegram_id=message.from_user.id)
+    await state.clear()
+    await message.answer(f"📣 Рассылка #{broadcast_id} запущена, отчет придет по завершении")
+
+@admin_router.message(AdminStates.broadcast_text)
+async def broadcast_not_text(message: Message):
+    # Фото, стикеры и документы рассылка не поддерживает
+    keyboard = InlineKeyboardMarkup(inline_keyboard=[
+        [InlineKeyboardButton(text="◀️ Назад", callback_data="admin_back")]
+    ])
+    await message.answer("❌ Рассылка поддерживает только текст. Отправьте текст сообщения:", reply_markup=keyboard)
+
 @admin_router.callback_query(F.data == "admin_back")
-async def admin_back(callback: CallbackQuery):
+async def admin_back(callback: CallbackQuery, state: FSMContext, raw_state: str | None):
+    await leave_wizard(state, raw_state)
     keyboard = InlineKeyboardMarkup(inline_keyboard=[
         [InlineKeyboardButton(text="➕ Добавить ментора", callback_data="admin_add_mentor")],
         [InlineKeyboardButton(text="➖ Удалить ментора", callback_data="admin_remove_mentor")],
         [InlineKeyboardButton(text="📅 Добавить мероприятие", callback_data="admin_add_event")],
         [InlineKeyboardButton(text="✏️ Редактировать мероприятие", callback_data="admin_edit_event")],
         [InlineKeyboardButton(text="🗑 Удалить мероприятие", callback_data="admin_delete_event")],
+        [InlineKeyboardButton(text="📣 Рассылка", callback_data="admin_broadcast")],
         [InlineKeyboardButton(text="📊 Статистика", callback_data="admin_stats")]
     ])
     
@@ -1,39 +1,85 @@
 from aiogram import Router, F
-from aiogram.types import Message, CallbackQuery, InlineKeyboardMarkup, InlineKeyboardButton
-from aiogram.filters import Command
-from sqlalchemy import select, and_
+from aiogram.types import Message, CallbackQuery, InlineKeyboardMarkup, InlineKeyboardButton, InlineQuery
+from aiogram.filters import Command, CommandObject
+from aiogram.exceptions import TelegramBadRequest
+from aiogram.fsm.context import FSMContext
+from sqlalchemy import select, delete, and_
 from sqlalchemy.orm import selectinload
-from database.database import AsyncSessionLocal
-from database.models import Event, Mentor, Lecture, Vacancy, Project, User
+from database.database import AsyncSessionLocal, read_session, upsert_insert, mark_write
+from database.models import (
+    Event, Mentor, Lecture, Vacancy, Project, User, Skill, project_skills, user_skills, event_subscriptions
+)
+from services.pagination import Page, fetch_page
+from services.cache import listing_cache, known_users, rendered_messages, content_hash
+from services.search import search, SECTION_EMOJI
+from services.skills import skills_in_demand, parse_skills, set_user_skills
+from services.matching import matching_engine
+from services.reminders import schedule_event_reminder
+from services.inline_index import inline_index
+from config import config
 from datetime import datetime, timedelta
 import json
 
 router = Router()
 
+# Менторы с биографией занимают больше места, поэтому их страница короче
+MENTORS_PAGE_SIZE = 5
+
+LECTURE_CATEGORY_MAP = {
+    "programming": "Программирование",
+    "security": "Кибербезопасность",
+    "data": "Data Science",
+    "web": "Web разработка",
+    "mobile": "Mobile разработка"
+}
+
+def escape_markdown(text: str) -> str:
+    """Экранирует символы разметки Markdown в тексте из базы (названия, описания).
+
+    Одиночный «_» или «*» в названии иначе ломает разбор всего сообщения.
+    """
+    return "".join("\\" + char if char in "*_`[" else char for char in text)
+
+async def leave_wizard(state: FSMContext, raw_state: str | None):
+    """Навигация выводит из незавершенного мастера.
+
+    Иначе следующее сообщение уйдет в его шаг, например в рассылку всем
+    пользователям. raw_state уже прочитан middleware FSM, поэтому без мастера
+    лишнего обращения к хранилищу нет.
+    """
+    if raw_state is not None:
+        await state.clear()
+
 @router.message(Command("start"))
-async def start_command(message: Message):
-    async with AsyncSessionLocal() as session:
-        # Регистрируем пользователя если его нет
-        result = await session.execute(
-            select(User).where(User.telegram_id == message.from_user.id)
-        )
-        user = result.scalar_one_or_none()
-        
-        if not user:
-            user = User(
-                telegram_id=message.from_user.id,
-                username=message.from_user.username,
-                full_name=message.from_user.full_name
+async def start_command(message: Message, state: FSMContext, raw_state: str | None):
+    await leave_wizard(state, raw_state)
+    from_user = message.from_user
+    known_key = ("users", from_user.id, from_user.username, from_user.full_name)
+    
+    # Регистрируем пользователя или обновляем его имя одним запросом
+    if known_users.get(known_key) is None:
+        async with AsyncSessionLocal() as session:
+            insert = upsert_insert(session)
+            stmt = insert(User).values(
+                telegram_id=from_user.id,
+                username=from_user.username,
+                full_name=from_user.full_name
             )
-            session.add(user)
+            stmt = stmt.on_conflict_do_update(
+                index_elements=[User.telegram_id],
+                set_={"username": stmt.excluded.username, "full_name": stmt.excluded.full_name}
+            )
+            await session.execute(stmt)
             await session.commit()
+        known_users.set(known_key, True)
     
     keyboard = InlineKeyboardMarkup(inline_keyboard=[
         [InlineKeyboardButton(text="📅 Мероприятия", callback_data="events")],
         [InlineKeyboardButton(text="👨‍🏫 Менторы", callback_data="mentors")],
         [InlineKeyboardButton(text="📚 Лекции", callback_data="lectures")],
         [InlineKeyboardButton(text="💼 Вакансии", callback_data="vacancies")],
-        [InlineKeyboardButton(text="🚀 Проекты", callback_data="projects")]
+        [InlineKeyboardButton(text="🚀 Проекты", callback_data="projects")],
+        [InlineKeyboardButton(text="⭐ Рекомендации для вас", callback_data="recommendations")]
     ])
     
     await message.answer(
@@ -43,35 +89,74 @@ async def start_command(message: Message):
         reply_markup=keyboard
     )
 
-@router.callback_query(F.data == "events")
-async def show_events(callback: CallbackQuery):
-    async with AsyncSessionLocal() as session:
+def listing_keyboard(section: str, page: Page, extra_rows: list) -> InlineKeyboardMarkup:
+    """Кнопки листания, обновления текущей страницы и навигации"""
+    rows = []
+    nav_row = []
+    if page.prev_cursor:
+        nav_row.append(InlineKeyboardButton(text="⬅️ Назад", callback_data=f"page:{section}:{page.prev_cursor}"))
+    if page.next_cursor:
+        nav_row.append(InlineKeyboardButton(text="Далее ➡️", callback_data=f"page:{section}:{page.next_cursor}"))
+    if nav_row:
+        rows.append(nav_row)
+    
+    refresh_data = f"page:{section}:{page.current_cursor}" if page.current_cursor else section
+    rows.append([InlineKeyboardButton(text="🔄 Обновить", callback_data=refresh_data)])
+    rows.extend(extra_rows)
+    return InlineKeyboardMarkup(inline_keyboard=rows)
+
+async def send_listing(callback: CallbackQuery, text: str, keyboard: InlineKeyboardMarkup, fallback: str):
+    """Редактирует сообщение, только если его содержимое изменилось"""
+    message = callback.message
+    if message is None:
+        await callback.answer(fallback)
+        return
+    
+    # Хэш общий для реплик: сообщение могла отредактировать другая реплика
+    key = (message.chat.id, message.message_id)
+    digest = content_hash(text, keyboard)
+    if await rendered_messages.get(key) == digest:
+        # На экране уже то же самое - только отвечаем на нажатие
+        await callback.answer()
+        return
+    
+    try:
+        await message.edit_text(text, reply_markup=keyboard, parse_mode="Markdown")
+    except TelegramBadRequest as error:
+        # Содержимое совпало, но хэша не было в кэше (например, после перезапуска)
+        if "message is not modified" not in error.message:
+            await callback.answer(fallback)
+            return
+        await callback.answer()
+    except Exception:
+        # Если не удалось отредактировать, отправляем ответ
+        await callback.answer(fallback)
+        return
+    await rendered_messages.set(key, digest)
+
+async def render_events(cursor: str | None = None) -> tuple[str, InlineKeyboardMarkup]:
+    async with read_session(section="events") as session:
         # Получаем ближайшие мероприятия
-        result = await session.execute(
+        page = await fetch_page(
+            session,
             select(Event)
             .options(selectinload(Event.mentor))
-            .where(and_(Event.is_active == True, Event.date_time > datetime.utcnow()))
-            .order_by(Event.date_time)
-            .limit(10)
+            .where(and_(Event.is_active == True, Event.date_time > datetime.utcnow())),
+            (Event.date_time, Event.id),
+            cursor
         )
-        events = result.scalars().all()
+    events = page.items
     
-    # Добавляем время обновления для избежания дублирования контента
-    current_time = datetime.now().strftime("%H:%M")
+    # Подписка на напоминание о каждом мероприятии страницы
+    back_rows = [
+        [InlineKeyboardButton(text=f"🔔 {event.title[:40]}", callback_data=f"subscribe_{event.id}")]
+        for event in events
+    ]
+    back_rows.append([InlineKeyboardButton(text="◀️ Главное меню", callback_data="back_to_main")])
+    keyboard = listing_keyboard("events", page, back_rows)
     
     if not events:
-        # Добавляем кнопки навигации даже когда нет событий
-        back_keyboard = InlineKeyboardMarkup(inline_keyboard=[
-            [InlineKeyboardButton(text="🔄 Обновить", callback_data="events")],
-            [InlineKeyboardButton(text="◀️ Главное меню", callback_data="back_to_main")]
-        ])
-        text = f"📅 Пока нет запланированных мероприятий\n\n🕐 Обновлено: {current_time}"
-        try:
-            await callback.message.edit_text(text, reply_markup=back_keyboard)
-        except Exception:
-            # Если не удалось отредактировать, отправляем ответ
-            await callback.answer("📅 Список мероприятий обновлен")
-        return
+        return "📅 Пока нет запланированных мероприятий", keyboard
     
     text = f"📅 **Ближайшие мероприятия:**\n\n"
     for event in events:
@@ -84,43 +169,63 @@ async def show_events(callback: CallbackQuery):
             text += f"📝 {event.description[:100]}...\n"
         text += "\n"
     
-    text += f"🕐 Обновлено: {current_time}"
-    
-    # Добавляем кнопку обновления списка
-    back_keyboard = InlineKeyboardMarkup(inline_keyboard=[
-        [InlineKeyboardButton(text="🔄 Обновить", callback_data="events")],
-        [InlineKeyboardButton(text="◀️ Главное меню", callback_data="back_to_main")]
-    ])
-    
-    try:
-        await callback.message.edit_text(text, reply_markup=back_keyboard, parse_mode="Markdown")
-    except Exception:
-        # Если не удалось отредактировать, отправляем ответ
-        await callback.answer("📅 Список мероприятий обновлен")
+    return text, keyboard
 
-@router.callback_query(F.data == "mentors")
-async def show_mentors(callback: CallbackQuery):
+@router.callback_query(F.data == "events")
+async def show_events(callback: CallbackQuery):
+    text, keyboard = await render_section("events")
+    await send_listing(callback, text, keyboard, "📅 Список мероприятий обновлен")
+
+@router.callback_query(F.data.startswith("subscribe_"))
+async def toggle_event_subscription(callback: CallbackQuery):
+    event_id = int(callback.data.split("_")[-1])
+    
     async with AsyncSessionLocal() as session:
+        user_id = (await session.execute(
+            select(User.id).where(User.telegram_id == callback.from_user.id)
+        )).scalar_one_or_none()
+        if user_id is None:
+            await callback.answer("Сначала запустите бота командой /start")
+            return
+        
+        event = await session.get(Event, event_id)
+        if event is None or not event.is_active or event.date_time <= datetime.utcnow():
+            await callback.answer("📅 Мероприятие уже прошло или отменено")
+            return
+        
+        # Повторное нажатие отменяет подписку
         result = await session.execute(
-            select(Mentor).where(Mentor.is_active == True)
+            delete(event_subscriptions).where(
+                and_(event_subscriptions.c.event_id == event_id, event_subscriptions.c.user_id == user_id)
+            )
+        )
+        if result.rowcount:
+            await session.commit()
+            await callback.answer(f"🔕 Напоминание о «{event.title}» отключено")
+            return
+        
+        await session.execute(event_subscriptions.insert().values(event_id=event_id, user_id=user_id))
+        await session.commit()
+    
+    await schedule_event_reminder(event.id, event.date_time)
+    await callback.answer(f"🔔 Напомним о «{event.title}» за {config.EVENT_REMINDER_HOURS} ч. до начала")
+
+async def render_mentors(cursor: str | None = None) -> tuple[str, InlineKeyboardMarkup]:
+    async with read_session(section="mentors") as session:
+        page = await fetch_page(
+            session,
+            select(Mentor).where(Mentor.is_active == True),
+            (Mentor.id,),
+            cursor,
+            page_size=MENTORS_PAGE_SIZE
         )
-        mentors = result.scalars().all()
+    mentors = page.items
     
-    # Добавляем время обновления для избежания дублирования контента
-    current_time = datetime.now().strftime("%H:%M")
+    back_rows = [[InlineKeyboardButton(text="◀️ Главное меню", callback_data="back_to_main")]]
+    keyboard = listing_keyboard("mentors", page, back_rows)
     
     if not mentors:
-        # Добавляем кнопки навигации даже когда нет менторов
-        back_keyboard = InlineKeyboardMarkup(inline_keyboard=[
-            [InlineKeyboardButton(text="🔄 Обновить", callback_data="mentors")],
-            [InlineKeyboardButton(text="◀️ Главное меню", callback_data="back_to_main")]
-        ])
-        text = f"👨‍🏫 Пока нет активных менторов\n\n🕐 Обновлено: {current_time}"
-        try:
-            await callback.message.edit_text(text, reply_markup=back_keyboard)
-        except Exception:
-            await callback.answer("👨‍🏫 Список менторов обновлен")
-        return
+        return "👨‍🏫 Пока нет активных менторов", keyboard
     
     text = f"👨‍🏫 **Наши менторы:**\n\n"
     for mentor in mentors:
@@ -132,18 +237,12 @@ async def show_mentors(callback: CallbackQuery):
             text += f"📞 {mentor.contact_info}\n"
         text += "\n"
     
-    text += f"🕐 Обновлено: {current_time}"
-    
-    # Добавляем кнопку обновления списка
-    back_keyboard = InlineKeyboardMarkup(inline_keyboard=[
-        [InlineKeyboardButton(text="🔄 Обновить", callback_data="mentors")],
-        [InlineKeyboardButton(text="◀️ Главное меню", callback_data="back_to_main")]
-    ])
-    
-    try:
-        await callback.message.edit_text(text, reply_markup=back_keyboard, parse_mode="Markdown")
-    except Exception:
-        await callback.answer("👨‍🏫 Список менторов обновлен")
+    return text, keyboard
+
+@router.callback_query(F.data == "mentors")
+async def show_mentors(callback: CallbackQuery):
+    text, keyboard = await render_section("mentors")
+    await send_listing(callback, text, keyboard, "👨‍🏫 Список менторов обновлен")
 
 @router.callback_query(F.data == "lectures")
 async def show_lectures(callback: CallbackQuery):
@@ -158,66 +257,30 @@ async def show_lectures(callback: CallbackQuery):
         [InlineKeyboardButton(text="◀️ Главное меню", callback_data="back_to_main")]
     ])
     
-    await callback.message.edit_text(
-        "📚 **Выберите категорию лекций:**",
-        reply_markup=keyboard,
-        parse_mode="Markdown"
-    )
+    await send_listing(callback, "📚 **Выберите категорию лекций:**", keyboard, "📚 Категории лекций")
 
-@router.callback_query(F.data.startswith("lectures_"))
-async def show_lectures_by_category(callback: CallbackQuery):
-    category = callback.data.replace("lectures_", "")
-    
-    # Добавляем время обновления для избежания дублирования контента
-    current_time = datetime.now().strftime("%H:%M")
+async def render_lectures(category: str, cursor: str | None = None) -> tuple[str, InlineKeyboardMarkup]:
+    query = select(Lecture).options(selectinload(Lecture.mentor))
+    if category != "all":
+        query = query.where(Lecture.category == LECTURE_CATEGORY_MAP.get(category, category))
     
-    async with AsyncSessionLocal() as session:
-        if category == "all":
-            result = await session.execute(
-                select(Lecture).options(selectinload(Lecture.mentor)).order_by(Lecture.uploaded_at.desc())
-            )
-        else:
-            category_map = {
-                "programming": "Программирование",
-                "security": "Кибербезопасность", 
-                "data": "Data Science",
-                "web": "Web разработка",
-                "mobile": "Mobile разработка"
-            }
-            result = await session.execute(
-                select(Lecture)
-                .options(selectinload(Lecture.mentor))
-                .where(Lecture.category == category_map.get(category, category))
-                .order_by(Lecture.uploaded_at.desc())
-            )
-        
-        lectures = result.scalars().all()
+    async with read_session(section="lectures") as session:
+        page = await fetch_page(session, query, (Lecture.uploaded_at, Lecture.id), cursor, descending=True)
+    lectures = page.items
     
-    category_map = {
-        "programming": "Программирование",
-        "security": "Кибербезопасность", 
-        "data": "Data Science",
-        "web": "Web разработка",
-        "mobile": "Mobile разработка"
-    }
+    # Навигация с кнопкой обновления
+    back_rows = [
+        [InlineKeyboardButton(text="◀️ К категориям", callback_data="lectures")],
+        [InlineKeyboardButton(text="🏠 Главное меню", callback_data="back_to_main")]
+    ]
+    keyboard = listing_keyboard(f"lectures_{category}", page, back_rows)
     
     if not lectures:
-        # Улучшенная навигация для пустого списка лекций
-        back_keyboard = InlineKeyboardMarkup(inline_keyboard=[
-            [InlineKeyboardButton(text="🔄 Обновить", callback_data=f"lectures_{category}")],
-            [InlineKeyboardButton(text="◀️ К категориям", callback_data="lectures")],
-            [InlineKeyboardButton(text="🏠 Главное меню", callback_data="back_to_main")]
-        ])
-        text = f"📚 В данной категории пока нет лекций\n\n🕐 Обновлено: {current_time}"
-        try:
-            await callback.message.edit_text(text, reply_markup=back_keyboard)
-        except Exception:
-            await callback.answer("📚 Список лекций обновлен")
-        return
+        return "📚 В данной категории пока нет лекций", keyboard
     
-    text = f"📚 **Лекции {'по всем категориям' if category == 'all' else category_map.get(category, category)}:**\n\n"
+    text = f"📚 **Лекции {'по всем категориям' if category == 'all' else LECTURE_CATEGORY_MAP.get(category, category)}:**\n\n"
     
-    for lecture in lectures[:10]:  # Показываем первые 10
+    for lecture in lectures:
         mentor_name = lecture.mentor.name if lecture.mentor else "Неизвестно"
         text += f"🔸 **{lecture.title}**\n"
         text += f"👨‍🏫 {mentor_name}\n"
@@ -228,46 +291,32 @@ async def show_lectures_by_category(callback: CallbackQuery):
             text += f"📝 {lecture.description[:80]}...\n"
         text += f"📅 {lecture.uploaded_at.strftime('%d.%m.%Y')}\n\n"
     
-    text += f"🕐 Обновлено: {current_time}"
-    
-    # Улучшенная навигация с кнопкой обновления
-    back_keyboard = InlineKeyboardMarkup(inline_keyboard=[
-        [InlineKeyboardButton(text="🔄 Обновить", callback_data=f"lectures_{category}")],
-        [InlineKeyboardButton(text="◀️ К категориям", callback_data="lectures")],
-        [InlineKeyboardButton(text="🏠 Главное меню", callback_data="back_to_main")]
-    ])
-    
-    try:
-        await callback.message.edit_text(text, reply_markup=back_keyboard, parse_mode="Markdown")
-    except Exception:
-        await callback.answer("📚 Список лекций обновлен")
+    return text, keyboard
 
-@router.callback_query(F.data == "vacancies")
-async def show_vacancies(callback: CallbackQuery):
-    async with AsyncSessionLocal() as session:
-        result = await session.execute(
-            select(Vacancy).where(Vacancy.is_active == True).order_by(Vacancy.posted_at.desc())
+@router.callback_query(F.data.startswith("lectures_"))
+async def show_lectures_by_category(callback: CallbackQuery):
+    text, keyboard = await render_section(callback.data)
+    await send_listing(callback, text, keyboard, "📚 Список лекций обновлен")
+
+async def render_vacancies(cursor: str | None = None) -> tuple[str, InlineKeyboardMarkup]:
+    async with read_session(section="vacancies") as session:
+        page = await fetch_page(
+            session,
+            select(Vacancy).where(Vacancy.is_active == True),
+            (Vacancy.posted_at, Vacancy.id),
+            cursor,
+            descending=True
         )
-        vacancies = result.scalars().all()
+    vacancies = page.items
     
-    # Добавляем время обновления для избежания дублирования контента
-    current_time = datetime.now().strftime("%H:%M")
+    back_rows = [[InlineKeyboardButton(text="◀️ Главное меню", callback_data="back_to_main")]]
+    keyboard = listing_keyboard("vacancies", page, back_rows)
     
     if not vacancies:
-        # Добавляем кнопки навигации даже когда нет вакансий
-        back_keyboard = InlineKeyboardMarkup(inline_keyboard=[
-            [InlineKeyboardButton(text="🔄 Обновить", callback_data="vacancies")],
-            [InlineKeyboardButton(text="◀️ Главное меню", callback_data="back_to_main")]
-        ])
-        text = f"💼 Пока нет активных вакансий\n\n🕐 Обновлено: {current_time}"
-        try:
-            await callback.message.edit_text(text, reply_markup=back_keyboard)
-        except Exception:
-            await callback.answer("💼 Список вакансий обновлен")
-        return
+        return "💼 Пока нет активных вакансий", keyboard
     
     text = f"💼 **Актуальные вакансии:**\n\n"
-    for vacancy in vacancies[:10]:
+    for vacancy in vacancies:
         text += f"🔸 **{vacancy.title}**\n"
         text += f"🏢 {vacancy.company or 'Компания не указана'}\n"
         if vacancy.salary_range:
@@ -279,98 +328,301 @@ async def show_vacancies(callback: CallbackQuery):
             text += f"📞 {vacancy.contact_info}\n"
         text += "\n"
     
-    text += f"🕐 Обновлено: {current_time}"
-    
-    # Добавляем кнопку обновления списка
-    back_keyboard = InlineKeyboardMarkup(inline_keyboard=[
-        [InlineKeyboardButton(text="🔄 Обновить", callback_data="vacancies")],
-        [InlineKeyboardButton(text="◀️ Главное меню", callback_data="back_to_main")]
-    ])
-    
-    try:
-        await callback.message.edit_text(text, reply_markup=back_keyboard, parse_mode="Markdown")
-    except Exception:
-        await callback.answer("💼 Список вакансий обновлен")
+    return text, keyboard
 
-@router.callback_query(F.data == "projects")
-async def show_projects(callback: CallbackQuery):
-    async with AsyncSessionLocal() as session:
-        result = await session.execute(
-            select(Project)
-            .options(selectinload(Project.contact))
-            .where(Project.is_active == True)
-            .order_by(Project.created_at.desc())
-        )
-        projects = result.scalars().all()
+@router.callback_query(F.data == "vacancies")
+async def show_vacancies(callback: CallbackQuery):
+    text, keyboard = await render_section("vacancies")
+    await send_listing(callback, text, keyboard, "💼 Список вакансий обновлен")
+
+async def render_projects(cursor: str | None = None, skill_id: int | None = None) -> tuple[str, InlineKeyboardMarkup]:
+    query = (
+        select(Project)
+        .options(selectinload(Project.contact), selectinload(Project.skills))
+        .where(Project.is_active == True)
+    )
+    skill = None
+    async with read_session(section="projects") as session:
+        if skill_id is not None:
+            # Проекты, которым нужен навык: join по индексу project_skills
+            skill = await session.get(Skill, skill_id)
+            query = query.join(project_skills, project_skills.c.project_id == Project.id).where(
+                project_skills.c.skill_id == skill_id
+            )
+        page = await fetch_page(session, query, (Project.created_at, Project.id), cursor, descending=True)
+    projects = page.items
     
-    # Добавляем время обновления для избежания дублирования контента
-    current_time = datetime.now().strftime("%H:%M")
+    if skill_id is None:
+        back_rows = [
+            [InlineKeyboardButton(text="🛠 Проекты по навыкам", callback_data="projects_skills")],
+            [InlineKeyboardButton(text="◀️ Главное меню", callback_data="back_to_main")]
+        ]
+        keyboard = listing_keyboard("projects", page, back_rows)
+    else:
+        back_rows = [
+            [InlineKeyboardButton(text="◀️ К навыкам", callback_data="projects_skills")],
+            [InlineKeyboardButton(text="🏠 Главное меню", callback_data="back_to_main")]
+        ]
+        keyboard = listing_keyboard(f"projects_{skill_id}", page, back_rows)
     
     if not projects:
-        # Добавляем кнопки навигации даже когда нет проектов
-        back_keyboard = InlineKeyboardMarkup(inline_keyboard=[
-            [InlineKeyboardButton(text="🔄 Обновить", callback_data="projects")],
-            [InlineKeyboardButton(text="◀️ Главное меню", callback_data="back_to_main")]
-        ])
-        text = f"🚀 Пока нет активных проектов\n\n🕐 Обновлено: {current_time}"
-        try:
-            await callback.message.edit_text(text, reply_markup=back_keyboard)
-        except Exception:
-            await callback.answer("🚀 Список проектов обновлен")
-        return
+        return "🚀 Пока нет активных проектов", keyboard
     
-    text = f"🚀 **Активные проекты:**\n\n"
-    for project in projects[:10]:
-        status_emoji = {"discussion": "💬", "development": "⚙️", "completed": "✅"}
-        status_text = {"discussion": "Обсуждение", "development": "Разработка", "completed": "Завершен"}
-        
+    status_emoji = {"discussion": "💬", "development": "⚙️", "completed": "✅"}
+    status_text = {"discussion": "Обсуждение", "development": "Разработка", "completed": "Завершен"}
+    
+    if skill is not None:
+        text = f"🚀 **Проекты, где нужен {skill.title}:**\n\n"
+    else:
+        text = f"🚀 **Активные проекты:**\n\n"
+    for project in projects:
         text += f"🔸 **{project.title}**\n"
         text += f"{status_emoji.get(project.status, '📋')} {status_text.get(project.status, project.status)}\n"
         if project.description:
             text += f"📝 {project.description[:100]}...\n"
-        if project.required_skills:
-            text += f"🛠 Нужны: {project.required_skills[:50]}...\n"
+        if project.skills:
+            text += f"🛠 Нужны: {', '.join(item.title for item in project.skills)}\n"
         text += f"📅 {project.created_at.strftime('%d.%m.%Y')}\n\n"
     
-    text += f"🕐 Обновлено: {current_time}"
+    return text, keyboard
+
+@router.callback_query(F.data == "projects")
+async def show_projects(callback: CallbackQuery):
+    text, keyboard = await render_section("projects")
+    await send_listing(callback, text, keyboard, "🚀 Список проектов обновлен")
+
+async def render_skills() -> tuple[str, InlineKeyboardMarkup]:
+    async with read_session(section="projects") as session:
+        skills = await skills_in_demand(session)
+    
+    rows = []
+    for skill_id, title, projects_count in skills:
+        button = InlineKeyboardButton(text=f"{title} ({projects_count})", callback_data=f"projects_{skill_id}")
+        # По две кнопки в ряд
+        if rows and len(rows[-1]) < 2:
+            rows[-1].append(button)
+        else:
+            rows.append([button])
+    rows.append([InlineKeyboardButton(text="◀️ К проектам", callback_data="projects")])
+    keyboard = InlineKeyboardMarkup(inline_keyboard=rows)
     
-    # Добавляем кнопку обновления списка
-    back_keyboard = InlineKeyboardMarkup(inline_keyboard=[
-        [InlineKeyboardButton(text="🔄 Обновить", callback_data="projects")],
+    if not skills:
+        return "🛠 Активным проектам пока не нужны специалисты", keyboard
+    return "🛠 **Выберите навык:**", keyboard
+
+# projects_skills - список навыков, projects_<id навыка> - проекты, где он нужен
+@router.callback_query(F.data.startswith("projects_"))
+async def show_projects_by_skill(callback: CallbackQuery):
+    rendered = await render_section(callback.data)
+    if rendered is None:
+        await callback.answer()
+        return
+    
+    text, keyboard = rendered
+    await send_listing(callback, text, keyboard, "🚀 Список проектов обновлен")
+
+async def render_section(section: str, cursor: str | None = None) -> tuple[str, InlineKeyboardMarkup] | None:
+    """Отдает страницу раздела из кэша, при промахе рендерит ее из базы"""
+    cached = await listing_cache.get(section, cursor)
+    if cached is not None:
+        return cached
+    
+    if section.startswith("lectures_"):
+        rendered = await render_lectures(section.replace("lectures_", "", 1), cursor)
+    elif section == "events":
+        rendered = await render_events(cursor)
+    elif section == "mentors":
+        rendered = await render_mentors(cursor)
+    elif section == "vacancies":
+        rendered = await render_vacancies(cursor)
+    elif section == "projects":
+        rendered = await render_projects(cursor)
+    elif section == "projects_skills":
+        rendered = await render_skills()
+    elif section.startswith("projects_") and section.replace("projects_", "", 1).isdigit():
+        rendered = await render_projects(cursor, int(section.replace("projects_", "", 1)))
+    else:
+        return None
+    
+    await listing_cache.set(section, cursor, rendered)
+    return rendered
+
+# Листание страниц: callback_data вида page:<раздел>:<курсор>
+@router.callback_query(F.data.startswith("page:"))
+async def show_page(callback: CallbackQuery):
+    _, section, cursor = callback.data.split(":", 2)
+    
+    rendered = await render_section(section, cursor)
+    if rendered is None:
+        await callback.answer()
+        return
+    
+    text, keyboard = rendered
+    await send_listing(callback, text, keyboard, "📄 Страница обновлена")
+
+async def render_search(query: str, page: int = 0) -> tuple[str, InlineKeyboardMarkup]:
+    async with read_session() as session:
+        result = await search(session, query, page)
+    
+    nav_row = []
+    if result.page > 0:
+        nav_row.append(InlineKeyboardButton(text="⬅️ Назад", callback_data=f"search:{result.page - 1}"))
+    if result.has_next:
+        nav_row.append(InlineKeyboardButton(text="Далее ➡️", callback_data=f"search:{result.page + 1}"))
+    rows = [nav_row] if nav_row else []
+    rows.append([InlineKeyboardButton(text="◀️ Главное меню", callback_data="back_to_main")])
+    keyboard = InlineKeyboardMarkup(inline_keyboard=rows)
+    
+    if not result.hits:
+        return f"🔎 По запросу «{escape_markdown(query)}» ничего не найдено", keyboard
+    
+    text = f"🔎 **Результаты по запросу «{escape_markdown(query)}»:**\n\n"
+    for hit in result.hits:
+        text += f"{SECTION_EMOJI[hit.section]} {escape_markdown(hit.title)}\n"
+    return text, keyboard
+
+@router.message(Command("search"))
+async def search_command(message: Message, command: CommandObject, state: FSMContext):
+    query = (command.args or "").strip()
+    if not query:
+        await message.answer("🔎 Использование: /search <запрос>\n\nНапример: /search python")
+        return
+    
+    # Запрос не помещается в callback_data, листание берет его из данных FSM
+    query = query[:200]
+    await state.update_data(search_query=query)
+    text, keyboard = await render_search(query)
+    try:
+        await message.answer(text, reply_markup=keyboard, parse_mode="Markdown")
+    except TelegramBadRequest:
+        # Разметку не удалось разобрать - отправляем результаты без нее
+        await message.answer(text, reply_markup=keyboard)
+
+# Листание результатов поиска: callback_data вида search:<номер страницы>
+@router.callback_query(F.data.startswith("search:"))
+async def show_search_page(callback: CallbackQuery, state: FSMContext):
+    query = (await state.get_data()).get("search_query")
+    if not query:
+        await callback.answer("🔎 Повторите поиск командой /search")
+        return
+    
+    text, keyboard = await render_search(query, int(callback.data.split(":", 1)[1]))
+    await send_listing(callback, text, keyboard, "🔎 Результаты обновлены")
+
+@router.message(Command("skills"))
+async def skills_command(message: Message, command: CommandObject):
+    titles = parse_skills(command.args)
+    async with AsyncSessionLocal() as session:
+        user = (await session.execute(
+            select(User).options(selectinload(User.skills)).where(User.telegram_id == message.from_user.id)
+        )).scalar_one_or_none()
+        if user is None:
+            await message.answer("Сначала запустите бота командой /start")
+            return
+        
+        if not titles:
+            current = ", ".join(skill.title for skill in user.skills) or "не указаны"
+            await message.answer(
+                f"🛠 Ваши навыки: {current}\n\n"
+                "Чтобы изменить, отправьте их через запятую:\n/skills Python, Django, SQL"
+            )
+            return
+        
+        skills = await set_user_skills(session, user.id, titles)
+        await session.commit()
+    # Рекомендации сразу после изменения читаем с основной базы
+    mark_write(message.from_user.id)
+    # Новые навыки могли пополнить словарь, по которому разбираются вакансии и менторы
+    matching_engine.invalidate("vacancies", "mentors")
+    
+    keyboard = InlineKeyboardMarkup(inline_keyboard=[
+        [InlineKeyboardButton(text="⭐ Рекомендации для вас", callback_data="recommendations")]
+    ])
+    await message.answer(
+        f"✅ Навыки сохранены: {', '.join(skill.title for skill in skills)}",
+        reply_markup=keyboard
+    )
+
+@router.callback_query(F.data == "recommendations")
+async def show_recommendations(callback: CallbackQuery):
+    async with read_session(user_id=callback.from_user.id) as session:
+        result = await session.execute(
+            select(user_skills.c.skill_id)
+            .join(User, User.id == user_skills.c.user_id)
+            .where(User.telegram_id == callback.from_user.id)
+        )
+        skill_ids = list(result.scalars())
+    
+    keyboard = InlineKeyboardMarkup(inline_keyboard=[
         [InlineKeyboardButton(text="◀️ Главное меню", callback_data="back_to_main")]
     ])
+    if not skill_ids:
+        text = (
+            "⭐ Укажите свои навыки, чтобы получать рекомендации:\n"
+            "/skills Python, Django, SQL"
+        )
+        await send_listing(callback, text, keyboard, "⭐ Укажите навыки командой /skills")
+        return
     
-    try:
-        await callback.message.edit_text(text, reply_markup=back_keyboard, parse_mode="Markdown")
-    except Exception:
-        await callback.answer("🚀 Список проектов обновлен")
+    recommendations = await matching_engine.recommend(skill_ids)
+    headers = {"projects": "🚀 **Проекты:**", "vacancies": "💼 **Вакансии:**", "mentors": "👨‍🏫 **Менторы:**"}
+    text = "⭐ **Рекомендации для вас**\n\n"
+    for section, matches in recommendations.items():
+        if not matches:
+            continue
+        text += f"{headers[section]}\n"
+        for match in matches:
+            text += f"🔸 {match.title} — {round(match.score * 100)}%\n"
+        text += "\n"
+    if not any(recommendations.values()):
+        text += "Пока нет ничего подходящего под ваши навыки"
+    
+    await send_listing(callback, text, keyboard, "⭐ Рекомендации обновлены")
+
+# Inline-режим: @bot запрос. Приходит на каждое нажатие клавиши, поэтому отвечаем из индекса в памяти
+@router.inline_query()
+async def inline_search(inline_query: InlineQuery):
+    await inline_index.refresh()
+    offset = int(inline_query.offset) if inline_query.offset.isdigit() else 0
+    results, next_offset = inline_index.search(inline_query.query, offset)
+    await inline_query.answer(
+        results,
+        cache_time=config.INLINE_CACHE_TIME,
+        is_personal=False,
+        next_offset=next_offset
+    )
 
 @router.callback_query(F.data == "back_to_main")
-async def back_to_main(callback: CallbackQuery):
+async def back_to_main(callback: CallbackQuery, state: FSMContext, raw_state: str | None):
+    await leave_wizard(state, raw_state)
     keyboard = InlineKeyboardMarkup(inline_keyboard=[
         [InlineKeyboardButton(text="📅 Мероприятия", callback_data="events")],
         [InlineKeyboardButton(text="👨‍🏫 Менторы", callback_data="mentors")],
         [InlineKeyboardButton(text="📚 Лекции", callback_data="lectures")],
         [InlineKeyboardButton(text="💼 Вакансии", callback_data="vacancies")],
-        [InlineKeyboardButton(text="🚀 Проекты", callback_data="projects")]
+        [InlineKeyboardButton(text="🚀 Проекты", callback_data="projects")],
+        [InlineKeyboardButton(text="⭐ Рекомендации для вас", callback_data="recommendations")]
     ])
     
-    await callback.message.edit_text(
+    await send_listing(
+        callback,
         "🕌💻 **IT Jama'at**\n\n"
         "Выберите интересующий раздел:",
-        reply_markup=keyboard,
-        parse_mode="Markdown"
+        keyboard,
+        "🕌 Главное меню"
     )
 
 # Дополнительный обработчик для команды /menu (для быстрого возврата к главному меню)
 @router.message(Command("menu"))
-async def menu_command(message: Message):
+async def menu_command(message: Message, state: FSMContext, raw_state: str | None):
+    await leave_wizard(state, raw_state)
     keyboard = InlineKeyboardMarkup(inline_keyboard=[
         [InlineKeyboardButton(text="📅 Мероприятия", callback_data="events")],
         [InlineKeyboardButton(text="👨‍🏫 Менторы", callback_data="mentors")],
         [InlineKeyboardButton(text="📚 Лекции", callback_data="lectures")],
         [InlineKeyboardButton(text="💼 Вакансии", callback_data="vacancies")],
-        [InlineKeyboardButton(text="🚀 Проекты", callback_data="projects")]
+        [InlineKeyboardButton(text="🚀 Проекты", callback_data="projects")],
+        [InlineKeyboardButton(text="⭐ Рекомендации для вас", callback_data="recommendations")]
     ])
     
     await message.answer(
@@ -0,0 +1,346 @@
+"""Нагрузочный тест: синтетические обновления через настоящий диспетчер бота.
+
+Бот отвечает локальному FakeBotAPI, база берется из DATABASE_URL (схема SQLite
+создается автоматически, на Postgres должны быть применены миграции). Пустые
+разделы заполняются тестовыми данными. Виртуальные пользователи проходят
+сценарии: /start и кнопки меню, категории лекций с листанием, мастер
+добавления мероприятия администратором (первые --admins из ADMIN_IDS).
+
+Запуск из корня проекта:
+    DATABASE_URL=sqlite+aiosqlite:///load.db ADMIN_IDS=1 python app/load_test.py --rps 100 --duration 30
+
+Отчет: p50/p95/p99 времени обработки обновления по шагам сценариев, запросы
+к базе на обновление и пропускная способность. С --max-p95 скрипт завершается
+с кодом 1, если общий p95 выше порога или хендлеры падали, поэтому его можно
+запускать в CI. Fake-сервер работает в том же процессе, так что время
+включает и его обработку; --api-delay имитирует задержку до Telegram.
+"""
+import argparse
+import asyncio
+import contextvars
+import json
+import logging
+import math
+import random
+import sys
+import time
+from collections import defaultdict
+from datetime import datetime, timedelta
+from typing import Any, Dict, Optional
+from aiogram import Bot
+from aiogram.types import Update
+from sqlalchemy import event, select, func
+from config import config
+from database.database import engine, replica_engine, init_db, AsyncSessionLocal
+from database.models import Mentor, Event, Lecture, Vacancy, Project
+from fake_bot_api import FakeBotAPI, BOT_USER
+from handlers.admin_handlers import ADMIN_IDS
+from handlers.user_handlers import LECTURE_CATEGORY_MAP
+from main import create_dispatcher
+from bot_session import create_bot_session
+from middlewares.activity import activity_tracker
+from middlewares.throttling import throttling
+from middlewares.concurrency import update_pool
+from services.broadcast import TokenBucket
+from services.cache import cache_backend
+
+# Счетчик запросов к базе текущего обновления
+_queries: contextvars.ContextVar[Optional[list]] = contextvars.ContextVar("load_test_queries", default=None)
+
+# Синтетические пользователи не пересекаются с настоящими; id больше 2**31,
+# как у новых аккаунтов Telegram (users.telegram_id - BIGINT)
+FIRST_USER_ID = 9_000_000_000
+
+# Вес сценария: как часто его выбирает обычный пользователь
+SCENARIO_WEIGHTS = {"menu": 6, "lectures": 3, "search": 1}
+
+
+def scenarios() -> Dict[str, list]:
+    """Шаги сценариев: (метка для отчета, вид, значение).
+
+    message - текст от пользователя, callback - нажатие кнопки с заданными
+    данными, click - нажатие случайной кнопки последнего сообщения бота,
+    callback_data которой начинается с префикса (шаг пропускается, если такой нет).
+    """
+    event_date = (datetime.now() + timedelta(days=random.randint(7, 60))).strftime("%d.%m.%Y %H:%M")
+    return {
+        "menu": [
+            ("/start", "message", "/start"),
+            ("events", "callback", "events"),
+            ("back_to_main", "callback", "back_to_main"),
+            ("mentors", "callback", "mentors"),
+            ("back_to_main", "callback", "back_to_main"),
+            ("vacancies", "callback", "vacancies"),
+            ("page", "click", "page:"),
+            ("back_to_main", "callback", "back_to_main"),
+            ("projects", "callback", "projects"),
+            ("back_to_main", "callback", "back_to_main"),
+        ],
+        "lectures": [
+            ("/start", "message", "/start"),
+            ("lectures", "callback", "lectures"),
+            ("lectures_<category>", "click", "lectures_"),
+            ("page", "click", "page:"),
+            ("lectures", "callback", "lectures"),
+            ("lectures_all", "callback", "lectures_all"),
+            ("page", "click", "page:"),
+        ],
+        "search": [
+            ("/search", "message", f"/search {random.choice(['python', 'лекция', 'проект', 'backend'])}"),
+            ("search_page", "click", "search:"),
+        ],
+        "admin_event": [
+            ("/admin", "message", "/admin"),
+            ("admin_add_event", "callback", "admin_add_event"),
+            ("event_title", "message", f"Нагрузочный тест {random.randint(1, 10**6)}"),
+            ("event_description", "message", "Мероприятие, созданное нагрузочным тестом"),
+            ("event_datetime", "message", event_date),
+            ("event_location", "message", "Онлайн"),
+            ("select_mentor", "click", "select_mentor_"),
+        ],
+    }
+
+
+def percentile(values: list[float], p: float) -> float:
+    """Перцентиль по ближайшему рангу; values отсортированы"""
+    if not values:
+        return 0.0
+    return values[min(len(values) - 1, max(math.ceil(p / 100 * len(values)) - 1, 0))]
+
+
+def _count_query(*args):
+    counter = _queries.get()
+    if counter is not None:
+        counter[0] += 1
+
+
+class LoadTest:
+    def __init__(self, bot: Bot, dp, api: FakeBotAPI, rps: float, duration: float):
+        self.bot = bot
+        self.dp = dp
+        self.api = api
+        self.bucket = TokenBucket(rps, capacity=max(rps / 10, 1))
+        self.duration = duration
+        self.deadline = 0.0
+        self._update_id = 0
+        self._callback_id = 0
+        # метка шага -> [времена обработки], [запросы к базе]
+        self.latencies: Dict[str, list] = defaultdict(list)
+        self.queries: Dict[str, list] = defaultdict(list)
+        self.errors: Dict[str, int] = defaultdict(int)
+        self.elapsed = 0.0
+
+    def _user(self, user_id: int) -> dict:
+        return {"id": user_id, "is_bot": False, "first_name": f"Load {user_id}", "username": f"load{user_id}"}
+
+    def _message_update(self, user_id: int, text: str) -> dict:
+        return {"message": {
+            "message_id": random.randint(1, 2**31),
+            "date": int(time.time()),
+            "chat": {"id": user_id, "type": "private"},
+            "from": self._user(user_id),
+            "text": text,
+        }}
+
+    def _callback_update(self, user_id: int, data: str) -> dict:
+        self._callback_id += 1
+        last = self.api.last_message(user_id)
+        message = last.as_result() if last else {
+            "message_id": 1, "date": int(time.time()), "chat": {"id": user_id, "type": "private"},
+            "from": BOT_USER, "text": "",
+        }
+        return {"callback_query": {
+            "id": str(self._callback_id),
+            "from": self._user(user_id),
+            "chat_instance": str(user_id),
+            "message": message,
+            "data": data,
+        }}
+
+    async def feed(self, label: str, user_id: int, kind: str, value: str):
+        if kind == "click":
+            last = self.api.last_message(user_id)
+            buttons = [data for data in (last.buttons() if last else []) if data.startswith(value)]
+            if not buttons:
+                return
+            kind, value = "callback", random.choice(buttons)
+        payload = self._message_update(user_id, value) if kind == "message" else self._callback_update(user_id, value)
+        self._update_id += 1
+        update = Update.model_validate({"update_id": self._update_id, **payload}, context={"bot": self.bot})
+
+        await self.bucket.acquire()
+        counter = [0]
+        token = _queries.set(counter)
+        started = time.perf_counter()
+        try:
+            await self.dp.feed_update(self.bot, update)
+        except Exception as error:
+            self.errors[label] += 1
+            if self.errors[label] == 1:
+                print(f"Ошибка на шаге {label}: {type(error).__name__}: {error}", file=sys.stderr)
+        finally:
+            self.latencies[label].append(time.perf_counter() - started)
+            self.queries[label].append(counter[0])
+            _queries.reset(token)
+
+    async def user_worker(self, user_id: int, weights: Dict[str, int]):
+        names, values = list(weights), list(weights.values())
+        while time.monotonic() < self.deadline:
+            for label, kind, value in scenarios()[random.choices(names, values)[0]]:
+                if time.monotonic() >= self.deadline:
+                    return
+                await self.feed(label, user_id, kind, value)
+
+    async def run(self, users: int, admins: list[int]):
+        self.deadline = time.monotonic() + self.duration
+        started = time.perf_counter()
+        workers = [self.user_worker(FIRST_USER_ID + index, SCENARIO_WEIGHTS) for index in range(users)]
+        workers += [self.user_worker(admin_id, {"admin_event": 1}) for admin_id in admins]
+        await asyncio.gather(*workers)
+        self.elapsed = time.perf_counter() - started
+
+    def report(self) -> Dict[str, Any]:
+        def row(latencies: list, queries: list, errors: int) -> dict:
+            latencies = sorted(latencies)
+            return {
+                "count": len(latencies),
+                "p50_ms": round(percentile(latencies, 50) * 1000, 1),
+                "p95_ms": round(percentile(latencies, 95) * 1000, 1),
+                "p99_ms": round(percentile(latencies, 99) * 1000, 1),
+                "queries": round(sum(queries) / len(queries), 2) if queries else 0.0,
+                "errors": errors,
+            }
+
+        steps = {label: row(self.latencies[label], self.queries[label], self.errors[label]) for label in self.latencies}
+        total_count = sum(len(values) for values in self.latencies.values())
+        return {
+            "duration_s": round(self.elapsed, 1),
+            "updates": total_count,
+            "throughput": round(total_count / self.elapsed, 1) if self.elapsed else 0.0,
+            "total": row(
+                [value for values in self.latencies.values() for value in values],
+                [value for values in self.queries.values() for value in values],
+                sum(self.errors.values())
+            ),
+            "steps": steps,
+            "throttling": throttling.metrics(),
+            "update_pool": update_pool.metrics(),
+            "bot_api": self.api.summary(),
+        }
+
+
+async def seed(size: int):
+    """Заполняет пустые разделы, чтобы листание и поиск работали на данных"""
+    now = datetime.utcnow()
+    categories = list(LECTURE_CATEGORY_MAP.values())
+    async with AsyncSessionLocal() as session:
+        if not await session.scalar(select(func.count()).select_from(Mentor)):
+            session.add_all(
+                Mentor(name=f"Ментор {i}", specialization=random.choice(["Python", "Go", "Frontend", "ML"]),
+                       bio="Опыт в backend-разработке и архитектуре", contact_info=f"@mentor{i}")
+                for i in range(max(size // 10, 1))
+            )
+        if not await session.scalar(select(func.count()).select_from(Event)):
+            session.add_all(
+                Event(title=f"Встреча {i}", description="Разбор проектов участников",
+                      date_time=now + timedelta(hours=i + 1), location="Онлайн", is_active=True)
+                for i in range(size)
+            )
+        if not await session.scalar(select(func.count()).select_from(Lecture)):
+            session.add_all(
+                Lecture(title=f"Лекция {i}: Python и базы данных", description="Запись лекции сообщества",
+                        category=categories[i % len(categories)], duration=60,
+                        uploaded_at=now - timedelta(hours=i))
+                for i in range(size)
+            )
+        if not await session.scalar(select(func.count()).select_from(Vacancy)):
+            session.add_all(
+                Vacancy(title=f"Backend разработчик {i}", company="IT Jama'at", description="Python, PostgreSQL",
+                        requirements="asyncio, SQLAlchemy", location="Удаленно", is_active=True,
+                        posted_at=now - timedelta(hours=i))
+                for i in range(size)
+            )
+        if not await session.scalar(select(func.count()).select_from(Project)):
+            session.add_all(
+                Project(title=f"Проект {i}", description="Открытый проект сообщества на Python",
+                        is_active=True, created_at=now - timedelta(hours=i))
+                for i in range(size)
+            )
+        await session.commit()
+
+
+def print_report(result: Dict[str, Any]):
+    print(f"\nОбновлений: {result['updates']} за {result['duration_s']} с, "
+          f"{result['throughput']} в секунду")
+    print(f"{'шаг':<22}{'кол-во':>8}{'p50, мс':>10}{'p95, мс':>10}{'p99, мс':>10}{'запросов':>10}{'ошибок':>8}")
+    rows = sorted(result["steps"].items(), key=lambda item: -item[1]["p95_ms"])
+    for label, row in rows + [("всего", result["total"])]:
+        print(f"{label:<22}{row['count']:>8}{row['p50_ms']:>10}{row['p95_ms']:>10}{row['p99_ms']:>10}"
+              f"{row['queries']:>10}{row['errors']:>8}")
+    api = result["bot_api"]
+    print(f"\nBot API: отправлено {api['sent']}, отредактировано {api['edited']}, "
+          f"без изменений {api['not_modified']}")
+    print(f"Защита от флуда: отброшено {result['throttling']['dropped']}, "
+          f"повторных нажатий {result['throttling']['cooled']}")
+    print(f"Пул обработки: среднее ожидание {result['update_pool']['avg_wait_ms']} мс, "
+          f"максимум {result['update_pool']['max_wait_ms']} мс")
+
+
+async def run_load_test(rps: float, duration: float, users: int, admins: int,
+                        seed_size: int, api_delay: float = 0.0) -> Dict[str, Any]:
+    """Прогон сценариев против FakeBotAPI, возвращает отчет (его же проверяет smoke-тест)"""
+    if engine.dialect.name == "sqlite":
+        await init_db()
+    await seed(seed_size)
+    for target in {engine, replica_engine}:
+        event.listen(target.sync_engine, "before_cursor_execute", _count_query)
+
+    api = FakeBotAPI(delay=api_delay)
+    config.BOT_API_URL = await api.start(port=0)
+    bot = Bot(token="1000000:load-test", session=create_bot_session())
+    dp = create_dispatcher()
+    await cache_backend.start()
+
+    test = LoadTest(bot, dp, api, rps=rps, duration=duration)
+    try:
+        await test.run(users, ADMIN_IDS[:admins])
+        await activity_tracker.flush()
+    finally:
+        for target in {engine, replica_engine}:
+            event.remove(target.sync_engine, "before_cursor_execute", _count_query)
+        await cache_backend.close()
+        await bot.session.close()
+        await api.stop()
+        await engine.dispose()
+    return test.report()
+
+
+async def main() -> int:
+    parser = argparse.ArgumentParser(description="Нагрузочный тест хендлеров бота")
+    parser.add_argument("--rps", type=float, default=50, help="обновлений в секунду")
+    parser.add_argument("--duration", type=float, default=30, help="длительность, с")
+    parser.add_argument("--users", type=int, default=100, help="виртуальных пользователей")
+    parser.add_argument("--admins", type=int, default=1, help="администраторов из ADMIN_IDS в мастерах")
+    parser.add_argument("--seed", type=int, default=200, help="записей в пустых разделах")
+    parser.add_argument("--api-delay", type=float, default=0.0, help="задержка ответа Bot API, с")
+    parser.add_argument("--json", help="сохранить результат в файл")
+    parser.add_argument("--max-p95", type=float, help="порог общего p95, мс")
+    args = parser.parse_args()
+    # main.py включает INFO; в отчете нужны только предупреждения
+    logging.getLogger().setLevel(logging.WARNING)
+
+    result = await run_load_test(args.rps, args.duration, args.users, args.admins, args.seed, args.api_delay)
+    print_report(result)
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as file:
+            json.dump(result, file, ensure_ascii=False, indent=2)
+
+    if args.max_p95 is not None and (result["total"]["p95_ms"] > args.max_p95 or result["total"]["errors"]):
+        print(f"\nFAIL: p95 {result['total']['p95_ms']} мс (порог {args.max_p95}), "
+              f"ошибок {result['total']['errors']}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main()))
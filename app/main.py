@@ -1,10 +1,20 @@
 import asyncio
 import logging
 from aiogram import Bot, Dispatcher
-from aiogram.fsm.storage.memory import MemoryStorage
 from handlers.user_handlers import router
 from handlers.admin_handlers import admin_router
 from database.database import init_db
+from database.fsm_storage import SQLAlchemyStorage
+from services.stats import run_stats_refresher
+from services.cache import cache_backend
+from services.scheduler import scheduler
+from services.broadcast import broadcast_engine
+from config import config
+from webhook import run_webhook
+from bot_session import create_bot_session
+from middlewares.concurrency import update_pool
+from middlewares.activity import activity_tracker
+from middlewares.throttling import throttling
 import os
 from dotenv import load_dotenv
 
@@ -12,20 +22,65 @@ load_dotenv()
 
 logging.basicConfig(level=logging.INFO)
 
-async def main():
-    # Инициализация бота и диспетчера
-    bot = Bot(token=os.getenv("BOT_TOKEN"))
-    dp = Dispatcher(storage=MemoryStorage())
+def create_dispatcher() -> Dispatcher:
+    """Диспетчер с хранилищем FSM, middleware и роутерами; его же использует load_test.py"""
+    # Хранилище FSM: в базе данных или то, что дает бэкенд кэша (память/Redis)
+    if config.FSM_STORAGE == "postgres":
+        storage = SQLAlchemyStorage(state_ttl=config.FSM_STATE_TTL)
+    else:
+        storage = cache_backend.fsm_storage()
+    dp = Dispatcher(storage=storage)
+    
+    # Учет активности: только отметка в памяти, запись в базу пачками
+    dp.update.outer_middleware(activity_tracker)
+    # Флуд отсекается до того, как займет место в пуле обработки
+    dp.update.outer_middleware(throttling)
+    # Ограниченный пул обработки с очередностью внутри одного пользователя
+    dp.update.outer_middleware(update_pool)
     
     # Подключение роутеров
     dp.include_router(router)
     dp.include_router(admin_router)
+    return dp
+
+async def main():
+    # Инициализация бота и диспетчера
+    bot = Bot(token=os.getenv("BOT_TOKEN"), session=create_bot_session())
+    dp = create_dispatcher()
+    storage = dp.storage
     
     # Инициализация базы данных
     await init_db()
+    await cache_backend.start()
+    
+    # Фоновое обновление статистики для админки
+    stats_task = asyncio.create_task(run_stats_refresher(config.STATS_REFRESH_INTERVAL))
+    background_tasks = [stats_task, asyncio.create_task(activity_tracker.run_flusher())]
+    
+    # Напоминания о мероприятиях и другие отложенные задачи
+    background_tasks.append(asyncio.create_task(scheduler.run(bot)))
+    # Рассылки, прерванные перезапуском или падением другой реплики
+    background_tasks.append(asyncio.create_task(broadcast_engine.run(bot)))
+    
+    # Очистка брошенных мастеров раз в час
+    if isinstance(storage, SQLAlchemyStorage):
+        background_tasks.append(asyncio.create_task(storage.run_cleanup(3600)))
     
-    # Запуск поллинга
-    await dp.start_polling(bot)
+    # Запуск вебхука или поллинга
+    try:
+        if config.WEBHOOK_URL:
+            await run_webhook(dp, bot)
+        else:
+            await dp.start_polling(bot)
+    finally:
+        for task in background_tasks:
+            task.cancel()
+        # Дописываем активность, накопленную с последней записи
+        try:
+            await activity_tracker.flush()
+        except Exception:
+            logging.exception("Не удалось записать активность пользователей при остановке")
+        await cache_backend.close()
 
 if __name__ == "__main__":
     asyncio.run(main())
\ No newline at end of file
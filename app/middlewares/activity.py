@@ -0,0 +1,97 @@
+import asyncio
+import logging
+from datetime import datetime
+from typing import Any, Awaitable, Callable, Dict
+from aiogram import BaseMiddleware
+from aiogram.types import TelegramObject
+from sqlalchemy import bindparam
+from config import config
+from database.database import AsyncSessionLocal
+from database.models import User
+
+logger = logging.getLogger(__name__)
+
+
+class ActivityMiddleware(BaseMiddleware):
+    """Учет активности пользователей с отложенной записью.
+
+    Каждое обновление только отмечается в буфере в памяти. Фоновая задача
+    раз в flush_interval секунд (или раньше, если набралось max_pending
+    обновлений) записывает буфер одним UPDATE с пачкой параметров.
+    """
+
+    def __init__(self, flush_interval: int = 30, max_pending: int = 1000):
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        # telegram_id -> [последняя активность, число обращений с прошлой записи]
+        self._buffer: Dict[int, list] = {}
+        self._pending = 0
+        self._flush_now = asyncio.Event()
+
+    async def __call__(
+        self,
+        handler: Callable[[TelegramObject, Dict[str, Any]], Awaitable[Any]],
+        event: TelegramObject,
+        data: Dict[str, Any]
+    ) -> Any:
+        user = data.get("event_from_user")
+        if user is not None and not user.is_bot:
+            self._record(user.id, datetime.utcnow(), 1)
+            self._pending += 1
+            if self._pending >= self.max_pending:
+                self._flush_now.set()
+        return await handler(event, data)
+
+    def _record(self, telegram_id: int, seen_at: datetime, count: int):
+        entry = self._buffer.get(telegram_id)
+        if entry is None:
+            self._buffer[telegram_id] = [seen_at, count]
+        else:
+            entry[0] = max(entry[0], seen_at)
+            entry[1] += count
+
+    async def flush(self) -> int:
+        """Записывает накопленную активность, возвращает число пользователей"""
+        if not self._buffer:
+            return 0
+        batch, self._buffer, self._pending = self._buffer, {}, 0
+
+        users = User.__table__
+        stmt = (
+            users.update()
+            .where(users.c.telegram_id == bindparam("tid"))
+            .values(
+                last_seen_at=bindparam("seen_at"),
+                interactions_count=users.c.interactions_count + bindparam("hits")
+            )
+        )
+        params = [{"tid": tid, "seen_at": seen_at, "hits": hits} for tid, (seen_at, hits) in batch.items()]
+        try:
+            async with AsyncSessionLocal() as session:
+                await session.execute(stmt, params)
+                await session.commit()
+        except Exception:
+            # Возвращаем пачку в буфер, чтобы не потерять ее до следующей попытки
+            for tid, (seen_at, hits) in batch.items():
+                self._record(tid, seen_at, hits)
+            raise
+        return len(params)
+
+    async def run_flusher(self):
+        """Фоновая задача записи буфера"""
+        while True:
+            try:
+                await asyncio.wait_for(self._flush_now.wait(), timeout=self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._flush_now.clear()
+            try:
+                await self.flush()
+            except Exception:
+                logger.exception("Не удалось записать активность пользователей")
+
+
+activity_tracker = ActivityMiddleware(
+    flush_interval=config.ACTIVITY_FLUSH_INTERVAL,
+    max_pending=config.ACTIVITY_FLUSH_BATCH
+)
@@ -0,0 +1,89 @@
+import asyncio
+import time
+from contextlib import nullcontext
+from typing import Any, Awaitable, Callable, Dict
+from aiogram import BaseMiddleware
+from aiogram.types import TelegramObject
+from config import config
+
+
+class OrderedConcurrencyMiddleware(BaseMiddleware):
+    """Ограниченный пул обработки обновлений.
+
+    Одновременно выполняется не больше max_workers обновлений. Обновления одного
+    пользователя в одном чате идут строго по очереди (это нужно мастерам FSM),
+    а разные пользователи обрабатываются параллельно.
+    """
+
+    # Сглаживание среднего времени ожидания
+    WAIT_ALPHA = 0.1
+
+    def __init__(self, max_workers: int = 32):
+        self.max_workers = max_workers
+        self._semaphore = asyncio.Semaphore(max_workers)
+        # (chat_id, user_id) -> [замок, число обновлений в очереди и в работе]
+        self._locks: Dict[tuple, list] = {}
+        self.queued = 0
+        self.running = 0
+        self.processed = 0
+        self.avg_wait = 0.0
+        self.max_wait = 0.0
+
+    def _record_wait(self, wait: float):
+        self.processed += 1
+        self.avg_wait += (wait - self.avg_wait) * self.WAIT_ALPHA
+        self.max_wait = max(self.max_wait, wait)
+
+    async def __call__(
+        self,
+        handler: Callable[[TelegramObject, Dict[str, Any]], Awaitable[Any]],
+        event: TelegramObject,
+        data: Dict[str, Any]
+    ) -> Any:
+        user = data.get("event_from_user")
+        chat = data.get("event_chat")
+        
+        key = None
+        order_lock = nullcontext()
+        if user is not None or chat is not None:
+            key = (chat.id if chat else None, user.id if user else None)
+            entry = self._locks.get(key)
+            if entry is None:
+                entry = self._locks[key] = [asyncio.Lock(), 0]
+            entry[1] += 1
+            order_lock = entry[0]
+        
+        started = time.monotonic()
+        self.queued += 1
+        waiting = True
+        try:
+            async with order_lock:
+                async with self._semaphore:
+                    waiting = False
+                    self.queued -= 1
+                    self._record_wait(time.monotonic() - started)
+                    self.running += 1
+                    try:
+                        return await handler(event, data)
+                    finally:
+                        self.running -= 1
+        finally:
+            if waiting:
+                # Обновление отменили, пока оно ждало своей очереди
+                self.queued -= 1
+            if key is not None:
+                entry[1] -= 1
+                if entry[1] == 0:
+                    del self._locks[key]
+
+    def metrics(self) -> Dict[str, Any]:
+        return {
+            "queued": self.queued,
+            "running": self.running,
+            "processed": self.processed,
+            "avg_wait_ms": round(self.avg_wait * 1000, 1),
+            "max_wait_ms": round(self.max_wait * 1000, 1),
+        }
+
+
+update_pool = OrderedConcurrencyMiddleware(max_workers=config.UPDATE_WORKERS)
@@ -0,0 +1,110 @@
+import time
+from typing import Any, Awaitable, Callable, Dict
+from aiogram import BaseMiddleware
+from aiogram.types import TelegramObject, Update
+from config import config
+from services.cache import SharedRecords, cache_backend
+
+# Кнопки просмотра разделов, включая листание и «🔄 Обновить»: повтор в течение
+# cooldown ничего не меняет на экране
+VIEW_CALLBACKS = ("events", "mentors", "lectures", "vacancies", "projects", "page:", "search:", "recommendations")
+
+
+class _UserState:
+    __slots__ = ("tokens", "updated")
+
+    def __init__(self, tokens: float, updated: float):
+        self.tokens = tokens
+        self.updated = updated
+
+
+class ThrottlingMiddleware(BaseMiddleware):
+    """Защита от флуда.
+
+    У каждого пользователя свой token bucket: rate обновлений в секунду,
+    до burst подряд; лишние обновления отбрасываются. Нажатие кнопки
+    просмотра, которая и так открыта в этом сообщении (последним нажатием
+    на нем была она же) меньше cooldown секунд назад, не доходит до
+    хендлера: сообщение уже показывает этот результат, поэтому достаточно
+    ответить на callback. Переходы между экранами не задерживаются.
+    Что открыто в сообщении, хранится в общем бэкенде кэша (backend): при
+    нескольких репликах переход, обработанный другой репликой, тоже виден.
+    Token bucket - в памяти процесса. Состояния пользователей, не активных
+    idle_ttl секунд, удаляются.
+    """
+
+    def __init__(self, rate: float = 3, burst: float = 10, cooldown: float = 3,
+                 idle_ttl: float = 600, view_callbacks: tuple = VIEW_CALLBACKS,
+                 backend=None, screens_size: int = 10000):
+        self.rate = rate
+        self.burst = burst
+        self.cooldown = cooldown
+        self.idle_ttl = idle_ttl
+        self.view_callbacks = view_callbacks
+        # (пользователь, id сообщения) -> callback_data последнего нажатия; живет cooldown секунд
+        self.screens = SharedRecords(backend, "screens", maxsize=screens_size, ttl=cooldown)
+        self._users: Dict[int, _UserState] = {}
+        self._next_eviction = time.monotonic() + idle_ttl
+        self.dropped = 0
+        self.cooled = 0
+
+    def _evict(self, now: float):
+        if now < self._next_eviction:
+            return
+        self._next_eviction = now + self.idle_ttl
+        idle = [user_id for user_id, state in self._users.items() if now - state.updated > self.idle_ttl]
+        for user_id in idle:
+            del self._users[user_id]
+
+    async def __call__(
+        self,
+        handler: Callable[[TelegramObject, Dict[str, Any]], Awaitable[Any]],
+        event: TelegramObject,
+        data: Dict[str, Any]
+    ) -> Any:
+        user = data.get("event_from_user")
+        # Inline-запросы отвечаются из памяти и кэшируются Telegram
+        if user is None or not isinstance(event, Update) or event.inline_query is not None:
+            return await handler(event, data)
+
+        now = time.monotonic()
+        self._evict(now)
+        state = self._users.get(user.id)
+        if state is None:
+            state = self._users[user.id] = _UserState(self.burst, now)
+
+        callback = event.callback_query
+        screen_key = None
+        if callback is not None and callback.data and self.cooldown > 0:
+            screen_key = (user.id, callback.message.message_id if callback.message else 0)
+            if (callback.data.startswith(self.view_callbacks)
+                    and await self.screens.get(screen_key) == callback.data):
+                self.cooled += 1
+                await callback.answer()
+                return None
+
+        state.tokens = min(self.burst, state.tokens + (now - state.updated) * self.rate)
+        state.updated = now
+        if state.tokens < 1:
+            self.dropped += 1
+            if callback is not None:
+                await callback.answer("⏳ Слишком часто, подождите немного")
+            return None
+        state.tokens -= 1
+
+        if screen_key is not None:
+            # Любое нажатие меняет экран сообщения, в том числе «Назад» и подписка
+            await self.screens.set(screen_key, callback.data)
+        return await handler(event, data)
+
+    def metrics(self) -> Dict[str, Any]:
+        return {"users": len(self._users), "dropped": self.dropped, "cooled": self.cooled}
+
+
+throttling = ThrottlingMiddleware(
+    rate=config.THROTTLE_RATE,
+    burst=config.THROTTLE_BURST,
+    cooldown=config.CALLBACK_COOLDOWN,
+    idle_ttl=config.THROTTLE_IDLE_TTL,
+    backend=cache_backend
+)
@@ -0,0 +1,287 @@
+import asyncio
+import logging
+import os
+import socket
+import time
+import uuid
+from datetime import datetime, timedelta
+from aiogram.exceptions import TelegramRetryAfter, TelegramForbiddenError, TelegramNotFound, TelegramBadRequest
+from sqlalchemy import select, update, and_, or_
+from sqlalchemy.exc import IntegrityError
+from config import config
+from database.database import AsyncSessionLocal, ReplicaSessionLocal
+from database.models import Broadcast, User
+
+logger = logging.getLogger(__name__)
+
+DELIVERED = "delivered"
+BLOCKED = "blocked"
+FAILED = "failed"
+
+# Нарушение индекса ix_broadcasts_running_event_id: PostgreSQL называет индекс, SQLite - колонку
+RUNNING_EVENT_CONFLICT = ("ix_broadcasts_running_event_id", "broadcasts.event_id")
+
+# Сколько раз повторять отправку после RetryAfter или сетевой ошибки
+MAX_ATTEMPTS = 3
+
+
+class TokenBucket:
+    """Ограничение частоты: rate токенов в секунду, не больше capacity подряд"""
+
+    def __init__(self, rate: float, capacity: float | None = None):
+        self.rate = rate
+        self.capacity = capacity or rate
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.paused_until = 0.0
+
+    def pause(self, seconds: float):
+        """После RetryAfter Telegram ждут все отправители"""
+        self.paused_until = max(self.paused_until, time.monotonic() + seconds)
+
+    async def acquire(self):
+        while True:
+            now = time.monotonic()
+            if now < self.paused_until:
+                await asyncio.sleep(self.paused_until - now)
+                continue
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return
+            await asyncio.sleep((1 - self.tokens) / self.rate)
+
+
+class ChatLimiter:
+    """Не чаще одного сообщения в interval секунд в один чат"""
+
+    def __init__(self, interval: float = 1.0):
+        self.interval = interval
+        self._next: dict[int, float] = {}
+
+    async def acquire(self, chat_id: int):
+        now = time.monotonic()
+        slot = max(now, self._next.get(chat_id, 0.0))
+        self._next[chat_id] = slot + self.interval
+        if len(self._next) > 10000:
+            for key in [key for key, value in self._next.items() if value < now]:
+                del self._next[key]
+        if slot > now:
+            await asyncio.sleep(slot - now)
+
+
+class TelegramLimiter:
+    """Общий лимит бота и лимит на чат для всех исходящих рассылок"""
+
+    def __init__(self, rate: float, chat_interval: float = 1.0, concurrency: int | None = None):
+        self.bucket = TokenBucket(rate)
+        self.chats = ChatLimiter(chat_interval)
+        # Отправок в полете; при задержке API в сотни мс держит темп на уровне лимита
+        self.semaphore = asyncio.Semaphore(concurrency or max(int(rate), 1))
+
+    async def send(self, bot, chat_id: int, text: str, **kwargs) -> str:
+        """Отправляет сообщение с учетом лимитов, возвращает delivered, blocked или failed"""
+        async with self.semaphore:
+            await self.chats.acquire(chat_id)
+            for attempt in range(MAX_ATTEMPTS):
+                await self.bucket.acquire()
+                try:
+                    await bot.send_message(chat_id, text, **kwargs)
+                    return DELIVERED
+                except TelegramRetryAfter as error:
+                    self.bucket.pause(error.retry_after)
+                except (TelegramForbiddenError, TelegramNotFound):
+                    # Бот заблокирован или чат удален
+                    return BLOCKED
+                except TelegramBadRequest as error:
+                    if "chat not found" in error.message.lower():
+                        return BLOCKED
+                    logger.warning("Сообщение в %s отклонено: %s", chat_id, error.message)
+                    return FAILED
+                except Exception as error:
+                    logger.warning("Ошибка отправки в %s (попытка %s): %s", chat_id, attempt + 1, error)
+                    await asyncio.sleep(2 ** attempt)
+            return FAILED
+
+    async def send_many(self, bot, chat_ids: list[int], text: str, **kwargs) -> list[str]:
+        """Отправляет пачку параллельно, насколько позволяют лимиты"""
+        return list(await asyncio.gather(*(self.send(bot, chat_id, text, **kwargs) for chat_id in chat_ids)))
+
+
+telegram_limiter = TelegramLimiter(rate=config.BROADCAST_RATE)
+
+
+class BroadcastEngine:
+    """Рассылки всем пользователям.
+
+    Получатели читаются пачками по users.id; после каждой пачки прогресс
+    и счетчики сохраняются в broadcasts, поэтому после перезапуска
+    рассылка продолжается с места остановки (последняя пачка может уйти
+    повторно, если процесс упал посреди нее).
+
+    Рассылку ведет одна реплика: она атомарно берет ее в аренду (owner,
+    lease_until) и продлевает аренду, пока отправляет. Рассылку с истекшей
+    арендой подхватывает любая живая реплика.
+    """
+
+    def __init__(self, limiter: TelegramLimiter, batch_size: int = 200, lease: float = 120):
+        self.limiter = limiter
+        self.batch_size = batch_size
+        self.lease = timedelta(seconds=lease)
+        self.owner = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"[-64:]
+        self.bot = None
+        self._tasks: dict[int, asyncio.Task] = {}
+
+    async def create(self, text: str, admin_telegram_id: int | None = None, parse_mode: str | None = None,
+                     event_id: int | None = None) -> int | None:
+        """Запускает рассылку; для анонса мероприятия, который уже идет, возвращает None"""
+        async with AsyncSessionLocal() as session:
+            broadcast = Broadcast(
+                text=text,
+                parse_mode=parse_mode,
+                status="running",
+                admin_telegram_id=admin_telegram_id,
+                event_id=event_id,
+                owner=self.owner,
+                lease_until=datetime.utcnow() + self.lease
+            )
+            session.add(broadcast)
+            try:
+                await session.commit()
+            except IntegrityError as error:
+                # Частичный уникальный индекс: повторное нажатие или повтор callback.
+                # Остальные нарушения (например, мероприятие удалено) - настоящие ошибки
+                if event_id is None or not any(marker in str(error.orig) for marker in RUNNING_EVENT_CONFLICT):
+                    raise
+                return None
+        self._start(broadcast.id)
+        return broadcast.id
+
+    async def _claim(self, broadcast_id: int) -> bool:
+        """Берет рассылку в аренду, если ее никто не ведет или аренда истекла"""
+        now = datetime.utcnow()
+        async with AsyncSessionLocal() as session:
+            result = await session.execute(
+                update(Broadcast)
+                .where(and_(
+                    Broadcast.id == broadcast_id,
+                    Broadcast.status == "running",
+                    or_(Broadcast.owner.is_(None), Broadcast.lease_until < now, Broadcast.owner == self.owner)
+                ))
+                .values(owner=self.owner, lease_until=now + self.lease)
+            )
+            await session.commit()
+        return result.rowcount == 1
+
+    async def _renew(self, broadcast_id: int, **values) -> bool:
+        """Продлевает аренду (и сохраняет values); False, если рассылку забрала другая реплика"""
+        async with AsyncSessionLocal() as session:
+            result = await session.execute(
+                update(Broadcast)
+                .where(and_(Broadcast.id == broadcast_id, Broadcast.owner == self.owner))
+                .values(lease_until=datetime.utcnow() + self.lease, **values)
+            )
+            await session.commit()
+        return result.rowcount == 1
+
+    async def resume(self, bot):
+        """Продолжает незавершенные рассылки, которые удалось взять в аренду"""
+        self.bot = bot
+        async with AsyncSessionLocal() as session:
+            result = await session.execute(
+                select(Broadcast.id).where(and_(
+                    Broadcast.status == "running",
+                    or_(Broadcast.owner.is_(None), Broadcast.lease_until < datetime.utcnow())
+                ))
+            )
+            candidates = list(result.scalars())
+        for broadcast_id in candidates:
+            if broadcast_id not in self._tasks and await self._claim(broadcast_id):
+                logger.info("Продолжаем рассылку %s", broadcast_id)
+                self._start(broadcast_id)
+
+    async def run(self, bot):
+        """Фоновая задача: при старте и затем раз в срок аренды подхватывает брошенные рассылки"""
+        while True:
+            try:
+                await self.resume(bot)
+            except Exception:
+                logger.exception("Не удалось проверить незавершенные рассылки")
+            await asyncio.sleep(self.lease.total_seconds())
+
+    async def _keep_lease(self, broadcast_id: int, task: asyncio.Task):
+        # Пачка может отправляться дольше аренды (RetryAfter), поэтому продлеваем отдельно
+        while True:
+            await asyncio.sleep(self.lease.total_seconds() / 3)
+            try:
+                renewed = await self._renew(broadcast_id)
+            except Exception:
+                # Временная ошибка базы: попробуем на следующем шаге, аренды хватит еще на два
+                logger.exception("Не удалось продлить аренду рассылки %s", broadcast_id)
+                continue
+            if not renewed:
+                logger.warning("Рассылку %s забрала другая реплика, останавливаемся", broadcast_id)
+                task.cancel()
+                return
+
+    def _start(self, broadcast_id: int):
+        if broadcast_id not in self._tasks:
+            task = asyncio.create_task(self._run(broadcast_id))
+            self._tasks[broadcast_id] = task
+            task.add_done_callback(lambda _: self._tasks.pop(broadcast_id, None))
+
+    async def _recipients(self, after_user_id: int) -> list[tuple[int, int]]:
+        async with ReplicaSessionLocal() as session:
+            result = await session.execute(
+                select(User.id, User.telegram_id)
+                .where(User.id > after_user_id)
+                .order_by(User.id)
+                .limit(self.batch_size)
+            )
+            return [tuple(row) for row in result]
+
+    async def _run(self, broadcast_id: int):
+        heartbeat = asyncio.create_task(self._keep_lease(broadcast_id, asyncio.current_task()))
+        try:
+            async with AsyncSessionLocal() as session:
+                broadcast = await session.get(Broadcast, broadcast_id)
+            counts = {DELIVERED: broadcast.delivered, BLOCKED: broadcast.blocked, FAILED: broadcast.failed}
+            last_user_id = broadcast.last_user_id
+            kwargs = {"parse_mode": broadcast.parse_mode} if broadcast.parse_mode else {}
+
+            while batch := await self._recipients(last_user_id):
+                outcomes = await self.limiter.send_many(
+                    self.bot, [telegram_id for _, telegram_id in batch], broadcast.text, **kwargs
+                )
+                for outcome in outcomes:
+                    counts[outcome] += 1
+                last_user_id = batch[-1][0]
+                if not await self._renew(broadcast_id, last_user_id=last_user_id, **counts):
+                    logger.warning("Рассылку %s забрала другая реплика, останавливаемся", broadcast_id)
+                    return
+
+            if not await self._renew(broadcast_id, status="done", finished_at=datetime.utcnow()):
+                return
+            logger.info("Рассылка %s завершена: %s", broadcast_id, counts)
+
+            if broadcast.admin_telegram_id:
+                await self.limiter.send(
+                    self.bot,
+                    broadcast.admin_telegram_id,
+                    f"📣 Рассылка #{broadcast_id} завершена\n\n"
+                    f"✅ Доставлено: {counts[DELIVERED]}\n"
+                    f"🚫 Заблокировали бота: {counts[BLOCKED]}\n"
+                    f"⚠️ Ошибки: {counts[FAILED]}"
+                )
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            logger.exception("Рассылка %s прервана", broadcast_id)
+        finally:
+            heartbeat.cancel()
+
+
+broadcast_engine = BroadcastEngine(
+    telegram_limiter, batch_size=config.BROADCAST_BATCH_SIZE, lease=config.BROADCAST_LEASE
+)
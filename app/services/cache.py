@@ -0,0 +1,276 @@
+import asyncio
+import hashlib
+import json
+import logging
+import math
+import time
+import uuid
+from collections import OrderedDict
+from aiogram.fsm.storage.base import BaseStorage
+from aiogram.fsm.storage.memory import MemoryStorage
+from aiogram.types import InlineKeyboardMarkup
+from config import config
+from database.fsm_storage import fsm_json_dumps, fsm_json_loads
+
+logger = logging.getLogger(__name__)
+
+
+def section_base(section: str) -> str:
+    """lectures_<категория> относится к разделу lectures"""
+    return section.split("_", 1)[0]
+
+
+class TTLCache:
+    """LRU-кэш с временем жизни записей. Ключи - кортежи, первый элемент которых - раздел"""
+
+    def __init__(self, maxsize: int = 256, ttl: float | None = 300):
+        self.maxsize = maxsize
+        # None - записи живут до вытеснения или инвалидации
+        self.ttl = ttl
+        self._data: OrderedDict = OrderedDict()
+
+    def get(self, key):
+        item = self._data.get(key)
+        if item is None:
+            return None
+        expires_at, value = item
+        if expires_at < time.monotonic():
+            del self._data[key]
+            return None
+        self._data.move_to_end(key)
+        return value
+
+    def set(self, key, value, ttl: float | None = None):
+        ttl = ttl if ttl is not None else self.ttl
+        expires_at = time.monotonic() + ttl if ttl is not None else float("inf")
+        self._data[key] = (expires_at, value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def invalidate(self, *sections: str):
+        """Удаляет все записи перечисленных разделов"""
+        stale = [key for key in self._data if section_base(key[0]) in sections]
+        for key in stale:
+            del self._data[key]
+
+    def clear(self):
+        self._data.clear()
+
+    def __len__(self):
+        return len(self._data)
+
+
+class InvalidationListeners:
+    """Индексы в памяти процесса, которые нужно сбрасывать вместе с кэшем разделов"""
+
+    def __init__(self):
+        self._listeners = []
+
+    def add_listener(self, callback):
+        """callback(*sections, ids=...) вызывается при любой инвалидации, в том числе с других реплик.
+
+        ids - id измененных записей раздела, если они известны: индекс может
+        обновить только их. Пустой ids - изменился весь раздел.
+        """
+        self._listeners.append(callback)
+
+    def _notify(self, sections, ids: tuple = ()):
+        for callback in self._listeners:
+            try:
+                callback(*sections, ids=ids)
+            except Exception:
+                logger.exception("Ошибка обработчика инвалидации кэша")
+
+
+class MemoryBackend(InvalidationListeners):
+    """Кэш и FSM в памяти процесса - для запуска в одном экземпляре"""
+
+    # Данные видны только этому процессу
+    shared = False
+
+    def __init__(self, maxsize: int):
+        super().__init__()
+        self._cache = TTLCache(maxsize=maxsize, ttl=None)
+
+    async def start(self):
+        pass
+
+    async def close(self):
+        self._cache.clear()
+
+    async def get(self, section: str, key: str, local: bool = True) -> str | None:
+        return self._cache.get((section, key))
+
+    async def set(self, section: str, key: str, value: str, ttl: int | None = None, local: bool = True):
+        self._cache.set((section, key), value, ttl)
+
+    async def invalidate(self, *sections: str, ids: tuple = ()):
+        self._cache.invalidate(*sections)
+        self._notify(sections, ids)
+
+    def fsm_storage(self) -> BaseStorage:
+        return MemoryStorage()
+
+
+class RedisBackend(InvalidationListeners):
+    """Общий кэш и FSM в Redis для нескольких реплик.
+
+    Перед Redis стоит короткоживущий локальный кэш; при инвалидации реплика
+    публикует разделы в канал, и остальные реплики сбрасывают свои локальные копии.
+    """
+
+    # Локальная копия живет недолго на случай потерянного сообщения pub/sub
+    LOCAL_TTL = 30
+    shared = True
+
+    def __init__(self, redis, maxsize: int, prefix: str = "itj"):
+        super().__init__()
+        self.redis = redis
+        self.prefix = prefix
+        self.channel = f"{prefix}:invalidate"
+        self.instance_id = uuid.uuid4().hex
+        self._local = TTLCache(maxsize=maxsize, ttl=self.LOCAL_TTL)
+        self._listener: asyncio.Task | None = None
+
+    def _key(self, section: str, key: str) -> str:
+        return f"{self.prefix}:{section}:{key}"
+
+    async def start(self):
+        self._listener = asyncio.create_task(self._listen())
+
+    async def close(self):
+        if self._listener:
+            self._listener.cancel()
+        await self.redis.close()
+
+    async def get(self, section: str, key: str, local: bool = True) -> str | None:
+        """local=False - только из Redis, для записей, которые меняют другие реплики"""
+        if local:
+            value = self._local.get((section, key))
+            if value is not None:
+                return value
+        value = await self.redis.get(self._key(section, key))
+        if value is not None and local:
+            self._local.set((section, key), value)
+        return value
+
+    async def set(self, section: str, key: str, value: str, ttl: int | None = None, local: bool = True):
+        await self.redis.set(self._key(section, key), value, ex=ttl)
+        if local:
+            self._local.set((section, key), value)
+
+    async def invalidate(self, *sections: str, ids: tuple = ()):
+        self._local.invalidate(*sections)
+        self._notify(sections, ids)
+        for section in sections:
+            # lectures затрагивает и lectures_<категория>
+            async for name in self.redis.scan_iter(match=f"{self.prefix}:{section}*"):
+                await self.redis.delete(name)
+        await self.redis.publish(
+            self.channel, f"{self.instance_id}|{','.join(sections)}|{','.join(map(str, ids))}"
+        )
+
+    async def _listen(self):
+        pubsub = self.redis.pubsub()
+        await pubsub.subscribe(self.channel)
+        try:
+            async for message in pubsub.listen():
+                if message["type"] != "message":
+                    continue
+                sender, _, payload = message["data"].partition("|")
+                sections, _, ids = payload.partition("|")
+                if sender != self.instance_id and sections:
+                    self._local.invalidate(*sections.split(","))
+                    self._notify(sections.split(","), tuple(int(item) for item in ids.split(",") if item))
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            logger.exception("Подписка на инвалидацию кэша оборвалась")
+        finally:
+            await pubsub.close()
+
+    def fsm_storage(self) -> BaseStorage:
+        from aiogram.fsm.storage.redis import RedisStorage
+        return RedisStorage(redis=self.redis, json_loads=fsm_json_loads, json_dumps=fsm_json_dumps)
+
+
+def create_backend():
+    if config.CACHE_BACKEND == "redis":
+        from redis.asyncio import Redis
+        redis = Redis.from_url(config.REDIS_URL, decode_responses=True)
+        return RedisBackend(redis, maxsize=config.LISTING_CACHE_SIZE)
+    return MemoryBackend(maxsize=config.LISTING_CACHE_SIZE)
+
+
+cache_backend = create_backend()
+
+
+class ListingCache:
+    """Готовые тексты и клавиатуры публичных разделов: (раздел, курсор) -> (текст, клавиатура)"""
+
+    def __init__(self, backend, ttl: int):
+        self.backend = backend
+        self.ttl = ttl
+
+    async def get(self, section: str, cursor: str | None) -> tuple[str, InlineKeyboardMarkup] | None:
+        raw = await self.backend.get(section, cursor or "")
+        if raw is None:
+            return None
+        data = json.loads(raw)
+        return data["text"], InlineKeyboardMarkup.model_validate(data["keyboard"])
+
+    async def set(self, section: str, cursor: str | None, rendered: tuple[str, InlineKeyboardMarkup]):
+        text, keyboard = rendered
+        raw = json.dumps({"text": text, "keyboard": keyboard.model_dump(exclude_none=True)})
+        await self.backend.set(section, cursor or "", raw, self.ttl)
+
+    async def invalidate(self, *sections: str, ids: tuple = ()):
+        await self.backend.invalidate(*sections, ids=ids)
+
+
+listing_cache = ListingCache(cache_backend, ttl=config.LISTING_CACHE_TTL)
+
+
+# Пользователи, уже записанные в базу с текущими именем и username:
+# ("users", telegram_id, username, full_name). Повторный /start не ходит в базу
+known_users = TTLCache(maxsize=config.KNOWN_USERS_CACHE_SIZE, ttl=config.KNOWN_USERS_CACHE_TTL)
+
+
+def content_hash(text: str, keyboard: InlineKeyboardMarkup | None = None) -> str:
+    """Хэш текста и клавиатуры сообщения"""
+    digest = hashlib.blake2b(text.encode(), digest_size=16)
+    if keyboard is not None:
+        digest.update(keyboard.model_dump_json(exclude_none=True).encode())
+    return digest.hexdigest()
+
+
+class SharedRecords:
+    """Короткие записи о сообщениях, которые должны видеть все реплики: ключ -> строка.
+
+    С общим бэкендом запись читается и пишется напрямую в Redis, без локальной
+    копии: сообщение могла только что изменить другая реплика. В одном
+    процессе - отдельный LRU, чтобы такие записи не вытесняли страницы разделов.
+    """
+
+    def __init__(self, backend, section: str, maxsize: int, ttl: float):
+        self.backend = backend
+        self.section = section
+        self.ttl = ttl
+        self._local = None if backend is not None and backend.shared else TTLCache(maxsize=maxsize, ttl=ttl)
+
+    async def get(self, key: tuple) -> str | None:
+        if self._local is not None:
+            return self._local.get(key)
+        return await self.backend.get(self.section, ":".join(map(str, key)), local=False)
+
+    async def set(self, key: tuple, value: str):
+        if self._local is not None:
+            self._local.set(key, value)
+        else:
+            await self.backend.set(self.section, ":".join(map(str, key)), value, math.ceil(self.ttl), local=False)
+
+
+# Что сейчас показывает сообщение бота: (chat_id, message_id) -> content_hash.
+# Через 48 часов сообщение уже нельзя редактировать, поэтому дольше не храним
+rendered_messages = SharedRecords(cache_backend, "messages", config.RENDERED_MESSAGES_SIZE, ttl=48 * 3600)
@@ -0,0 +1,254 @@
+import asyncio
+import time
+from collections import defaultdict
+from dataclasses import dataclass
+from datetime import datetime
+from aiogram.types import InlineQueryResultArticle, InputTextMessageContent
+from sqlalchemy import select, and_
+from sqlalchemy.orm import selectinload
+from config import config
+from database.database import read_session
+from database.models import Event, Lecture, Vacancy
+from services.cache import cache_backend
+from services.search import tokenize
+
+INLINE_PAGE_SIZE = 20
+
+# Длинные префиксы почти не сужают выдачу, дальше работают триграммы
+MAX_PREFIX = 10
+
+# Порядок разделов в выдаче без запроса или при равном ранге
+INLINE_SECTIONS = ("events", "lectures", "vacancies")
+
+
+@dataclass(frozen=True)
+class Card:
+    """Готовая карточка inline-выдачи"""
+    section: str
+    id: int
+    result: InlineQueryResultArticle
+    # Порядок внутри раздела: ближайшие мероприятия, свежие лекции и вакансии
+    order: float
+    # Мероприятие пропадает из выдачи, когда прошло
+    expires_at: datetime | None = None
+
+
+def trigrams(token: str) -> set[str]:
+    return {token[i:i + 3] for i in range(len(token) - 2)}
+
+
+def article(section: str, item_id: int, title: str, description: str, text: str) -> InlineQueryResultArticle:
+    return InlineQueryResultArticle(
+        id=f"{section}:{item_id}",
+        title=title,
+        description=description[:100],
+        input_message_content=InputTextMessageContent(message_text=text)
+    )
+
+
+def newest_first(moment: datetime | None) -> float:
+    """Порядок «сначала свежие»; записи без даты (добавленные в обход бота) - в конце"""
+    return -moment.timestamp() if moment else 0.0
+
+
+def event_card(event: Event) -> tuple[Card, str]:
+    when = event.date_time.strftime('%d.%m.%Y %H:%M')
+    mentor_name = event.mentor.name if event.mentor else "Не указан"
+    text = f"📅 {event.title}\n📍 {event.location or 'Онлайн'}\n⏰ {when}\n👨‍🏫 {mentor_name}"
+    if event.description:
+        text += f"\n\n{event.description}"
+    card = Card(
+        "events", event.id,
+        article("events", event.id, f"📅 {event.title}", f"{when}, {event.location or 'Онлайн'}", text),
+        order=event.date_time.timestamp(),
+        expires_at=event.date_time
+    )
+    return card, " ".join(filter(None, [event.title, event.description, event.location, mentor_name]))
+
+
+def lecture_card(lecture: Lecture) -> tuple[Card, str]:
+    text = f"📚 {lecture.title}"
+    if lecture.category:
+        text += f"\n🏷 {lecture.category}"
+    if lecture.description:
+        text += f"\n\n{lecture.description}"
+    if lecture.video_url:
+        text += f"\n\n🎥 {lecture.video_url}"
+    card = Card(
+        "lectures", lecture.id,
+        article("lectures", lecture.id, f"📚 {lecture.title}", lecture.description or lecture.category or "", text),
+        order=newest_first(lecture.uploaded_at)
+    )
+    return card, " ".join(filter(None, [lecture.title, lecture.description, lecture.category]))
+
+
+def vacancy_card(vacancy: Vacancy) -> tuple[Card, str]:
+    company = vacancy.company or 'Компания не указана'
+    text = f"💼 {vacancy.title}\n🏢 {company}"
+    if vacancy.salary_range:
+        text += f"\n💰 {vacancy.salary_range}"
+    text += f"\n📍 {vacancy.location or 'Не указано'}"
+    if vacancy.description:
+        text += f"\n\n{vacancy.description}"
+    if vacancy.contact_info:
+        text += f"\n\n📞 {vacancy.contact_info}"
+    card = Card(
+        "vacancies", vacancy.id,
+        article("vacancies", vacancy.id, f"💼 {vacancy.title}",
+                ", ".join(filter(None, [company, vacancy.salary_range])), text),
+        order=newest_first(vacancy.posted_at)
+    )
+    return card, " ".join(filter(None, [vacancy.title, vacancy.company, vacancy.description, vacancy.requirements]))
+
+
+async def load_section(section: str, ids: set[int] | None = None) -> list[tuple[Card, str]]:
+    """Карточки раздела (или только записей ids) и текст для индексации"""
+    if section == "events":
+        query = (
+            select(Event)
+            .options(selectinload(Event.mentor))
+            .where(and_(Event.is_active == True, Event.date_time > datetime.utcnow()))
+        )
+        model, make_card = Event, event_card
+    elif section == "lectures":
+        query, model, make_card = select(Lecture), Lecture, lecture_card
+    else:
+        query, model, make_card = select(Vacancy).where(Vacancy.is_active == True), Vacancy, vacancy_card
+    if ids is not None:
+        query = query.where(model.id.in_(ids))
+    async with read_session(section=section) as session:
+        result = await session.execute(query)
+        return [make_card(item) for item in result.scalars()]
+
+
+class InlineIndex:
+    """Префиксный и триграммный индекс карточек для inline-режима.
+
+    Запросы обслуживаются из памяти. После изменений админом при следующем
+    запросе перечитываются только измененные карточки (id приходят вместе с
+    инвалидацией, в том числе с других реплик); без id раздел перечитывается
+    целиком. Раз в ttl секунд перечитываются все разделы.
+    """
+
+    def __init__(self, ttl: float = 300):
+        self.ttl = ttl
+        self.cards: dict[tuple[str, int], Card] = {}
+        self._prefixes: dict[str, set] = defaultdict(set)
+        self._trigrams: dict[str, set] = defaultdict(set)
+        # ключ карточки -> (префиксы, триграммы) для удаления из индекса
+        self._terms: dict[tuple[str, int], tuple[set, set]] = {}
+        self._loaded_at: dict[str, float] = {}
+        # раздел -> id записей, измененных после загрузки раздела
+        self._changed: dict[str, set[int]] = {}
+        self._lock = asyncio.Lock()
+
+    def invalidate(self, *sections: str, ids: tuple = ()):
+        for section in sections or INLINE_SECTIONS:
+            if section not in INLINE_SECTIONS:
+                continue
+            if ids and section in self._loaded_at:
+                self._changed.setdefault(section, set()).update(ids)
+            else:
+                self._loaded_at.pop(section, None)
+
+    def _stale_sections(self) -> list[str]:
+        now = time.monotonic()
+        return [section for section in INLINE_SECTIONS
+                if now - self._loaded_at.get(section, -self.ttl) >= self.ttl]
+
+    def _add(self, card: Card, text: str):
+        key = (card.section, card.id)
+        prefixes, grams = set(), set()
+        for token in tokenize(text):
+            prefixes.update(token[:i] for i in range(1, min(len(token), MAX_PREFIX) + 1))
+            grams.update(trigrams(token))
+        for prefix in prefixes:
+            self._prefixes[prefix].add(key)
+        for gram in grams:
+            self._trigrams[gram].add(key)
+        self.cards[key] = card
+        self._terms[key] = (prefixes, grams)
+
+    def _remove(self, key: tuple[str, int]):
+        prefixes, grams = self._terms.pop(key)
+        for prefix in prefixes:
+            self._prefixes[prefix].discard(key)
+            if not self._prefixes[prefix]:
+                del self._prefixes[prefix]
+        for gram in grams:
+            self._trigrams[gram].discard(key)
+            if not self._trigrams[gram]:
+                del self._trigrams[gram]
+        del self.cards[key]
+
+    def replace_section(self, section: str, cards: list[tuple[Card, str]]):
+        for key in [key for key in self.cards if key[0] == section]:
+            self._remove(key)
+        for card, text in cards:
+            self._add(card, text)
+        self._loaded_at[section] = time.monotonic()
+        self._changed.pop(section, None)
+
+    def update_cards(self, section: str, ids: set[int], cards: list[tuple[Card, str]]):
+        """Заменяет карточки записей ids; записи, которых нет в cards (удалены, прошли), убирает"""
+        for item_id in ids:
+            if (section, item_id) in self._terms:
+                self._remove((section, item_id))
+        for card, text in cards:
+            self._add(card, text)
+
+    async def refresh(self):
+        """Перечитывает устаревшие разделы и измененные карточки. Без изменений ничего не запрашивает"""
+        if not self._stale_sections() and not self._changed:
+            return
+        async with self._lock:
+            for section in self._stale_sections():
+                self.replace_section(section, await load_section(section))
+            for section in list(self._changed):
+                ids = set(self._changed[section])
+                self.update_cards(section, ids, await load_section(section, ids))
+                # Пока шел запрос, могли измениться другие записи - их оставляем
+                remaining = self._changed.get(section, set()) - ids
+                if remaining:
+                    self._changed[section] = remaining
+                else:
+                    self._changed.pop(section, None)
+
+    def _match(self, term: str) -> tuple[set, set]:
+        """Карточки, где слово начинается с term, и карточки, где term встречается внутри слова"""
+        prefix_keys = set(self._prefixes.get(term[:MAX_PREFIX], ()))
+        infix_keys = set()
+        grams = trigrams(term)
+        if grams:
+            infix_keys = set.intersection(*(self._trigrams.get(gram, set()) for gram in grams))
+        return prefix_keys, infix_keys
+
+    def search(self, query: str, offset: int = 0,
+               limit: int = INLINE_PAGE_SIZE) -> tuple[list[InlineQueryResultArticle], str]:
+        """Страница результатов и next_offset (пустой, если страница последняя)"""
+        scores = None
+        for term in set(tokenize(query)):
+            prefix_keys, infix_keys = self._match(term)
+            # Совпадение с началом слова весит больше, чем с серединой
+            term_scores = {key: 1 for key in infix_keys}
+            term_scores.update({key: 2 for key in prefix_keys})
+            if scores is None:
+                scores = term_scores
+            else:
+                scores = {key: score + term_scores[key] for key, score in scores.items() if key in term_scores}
+        if scores is None:
+            scores = dict.fromkeys(self.cards, 0)
+
+        now = datetime.utcnow()
+        cards = [self.cards[key] for key in scores
+                 if self.cards[key].expires_at is None or self.cards[key].expires_at > now]
+        cards.sort(key=lambda card: (-scores[(card.section, card.id)],
+                                     INLINE_SECTIONS.index(card.section), card.order))
+
+        page = cards[offset:offset + limit]
+        next_offset = str(offset + limit) if offset + limit < len(cards) else ""
+        return [card.result for card in page], next_offset
+
+
+inline_index = InlineIndex(ttl=config.LISTING_CACHE_TTL)
+cache_backend.add_listener(inline_index.invalidate)
@@ -0,0 +1,157 @@
+import asyncio
+import heapq
+import math
+import time
+from collections import defaultdict
+from dataclasses import dataclass
+from sqlalchemy import select
+from config import config
+from database.database import read_session
+from database.models import Skill, Project, Vacancy, Mentor, project_skills
+from services.cache import cache_backend
+from services.search import tokenize
+
+MATCHING_SECTIONS = ("projects", "vacancies", "mentors")
+
+# Навыки из нескольких слов ("machine learning") ищутся в тексте как n-граммы
+MAX_SKILL_WORDS = 3
+
+
+@dataclass(frozen=True)
+class Match:
+    section: str
+    id: int
+    title: str
+    score: float
+
+
+def skill_key(name: str) -> str:
+    """Название навыка в том же виде, что и слова текста: node.js -> node js"""
+    return " ".join(tokenize(name))
+
+
+def extract_skills(text: str, vocabulary: dict[str, int]) -> dict[int, int]:
+    """Навыки из словаря, упомянутые в тексте: id навыка -> число упоминаний"""
+    tokens = tokenize(text)
+    found: dict[int, int] = defaultdict(int)
+    for size in range(1, MAX_SKILL_WORDS + 1):
+        for i in range(len(tokens) - size + 1):
+            skill_id = vocabulary.get(" ".join(tokens[i:i + size]))
+            if skill_id is not None:
+                found[skill_id] += 1
+    return found
+
+
+class SectionMatrix:
+    """Разреженная матрица раздела, хранится по столбцам (навыкам).
+
+    Строки - элементы каталога с TF-IDF весами навыков, нормированные
+    до единичной длины, поэтому скалярное произведение равно косинусу.
+    """
+
+    def __init__(self, section: str, items: dict[int, tuple[str, dict[int, int]]]):
+        self.section = section
+        self.titles = {item_id: title for item_id, (title, _) in items.items()}
+        # Сколько элементов раздела требуют навык
+        frequency: dict[int, int] = defaultdict(int)
+        for _, counts in items.values():
+            for skill_id in counts:
+                frequency[skill_id] += 1
+
+        # навык -> {id элемента: вес}
+        self.columns: dict[int, dict[int, float]] = defaultdict(dict)
+        total = len(items)
+        for item_id, (_, counts) in items.items():
+            weights = {skill_id: count * math.log(1 + total / frequency[skill_id])
+                       for skill_id, count in counts.items()}
+            norm = math.sqrt(sum(weight * weight for weight in weights.values()))
+            for skill_id, weight in weights.items():
+                self.columns[skill_id][item_id] = weight / norm
+
+    def top(self, skill_ids: list[int], limit: int) -> list[Match]:
+        """Элементы с наибольшим косинусом к вектору навыков пользователя"""
+        if not skill_ids:
+            return []
+        # У пользователя все навыки равноценны
+        user_weight = 1 / math.sqrt(len(skill_ids))
+        scores: dict[int, float] = defaultdict(float)
+        for skill_id in skill_ids:
+            for item_id, weight in self.columns.get(skill_id, {}).items():
+                scores[item_id] += weight * user_weight
+        best = heapq.nlargest(limit, scores.items(), key=lambda item: (item[1], -item[0]))
+        return [Match(self.section, item_id, self.titles[item_id], score) for item_id, score in best]
+
+
+async def load_section(section: str, vocabulary: dict[str, int]) -> SectionMatrix:
+    """Элементы раздела и их навыки: проекты - по project_skills,
+    вакансии - по ключевым словам в требованиях, менторы - по специализации"""
+    items: dict[int, tuple[str, dict[int, int]]] = {}
+    async with read_session(section=section) as session:
+        if section == "projects":
+            rows = await session.execute(
+                select(Project.id, Project.title, project_skills.c.skill_id)
+                .join(project_skills, project_skills.c.project_id == Project.id)
+                .where(Project.is_active == True)
+            )
+            for project_id, title, skill_id in rows:
+                items.setdefault(project_id, (title, {}))[1][skill_id] = 1
+        elif section == "vacancies":
+            rows = await session.execute(
+                select(Vacancy.id, Vacancy.title, Vacancy.requirements).where(Vacancy.is_active == True)
+            )
+            for vacancy_id, title, requirements in rows:
+                counts = extract_skills(f"{title} {requirements or ''}", vocabulary)
+                if counts:
+                    items[vacancy_id] = (title, counts)
+        else:
+            rows = await session.execute(
+                select(Mentor.id, Mentor.name, Mentor.specialization).where(Mentor.is_active == True)
+            )
+            for mentor_id, name, specialization in rows:
+                counts = extract_skills(specialization or "", vocabulary)
+                if counts:
+                    items[mentor_id] = (name, counts)
+    return SectionMatrix(section, items)
+
+
+class MatchingEngine:
+    """Рекомендации по навыкам. Матрицы разделов держатся в памяти и
+    перестраиваются по одному разделу после изменений или раз в ttl секунд"""
+
+    def __init__(self, ttl: float = 300):
+        self.ttl = ttl
+        self.matrices: dict[str, SectionMatrix] = {}
+        self._loaded_at: dict[str, float] = {}
+        self._lock = asyncio.Lock()
+
+    def invalidate(self, *sections: str, ids: tuple = ()):
+        # Матрица раздела перестраивается целиком, ids не используются
+        for section in sections or MATCHING_SECTIONS:
+            self._loaded_at.pop(section, None)
+
+    def _stale_sections(self) -> list[str]:
+        now = time.monotonic()
+        return [section for section in MATCHING_SECTIONS
+                if now - self._loaded_at.get(section, -self.ttl) >= self.ttl]
+
+    async def refresh(self):
+        if not self._stale_sections():
+            return
+        async with self._lock:
+            stale = self._stale_sections()
+            if not stale:
+                return
+            async with read_session() as session:
+                rows = await session.execute(select(Skill.id, Skill.name))
+                vocabulary = {skill_key(name): skill_id for skill_id, name in rows}
+            for section in stale:
+                self.matrices[section] = await load_section(section, vocabulary)
+                self._loaded_at[section] = time.monotonic()
+
+    async def recommend(self, skill_ids: list[int], limit: int = 5) -> dict[str, list[Match]]:
+        await self.refresh()
+        return {section: self.matrices[section].top(skill_ids, limit) for section in MATCHING_SECTIONS}
+
+
+matching_engine = MatchingEngine(ttl=config.LISTING_CACHE_TTL)
+cache_backend.add_listener(matching_engine.invalidate)
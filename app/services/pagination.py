@@ -0,0 +1,113 @@
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from sqlalchemy import DateTime, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+
+PAGE_SIZE = 10
+
+EPOCH = datetime(1970, 1, 1)
+
+# Направления курсора: n - после ключа, p - до ключа, c - начиная с ключа (обновление страницы)
+DIRECTIONS = ("n", "p", "c")
+
+_DIGITS = "0123456789abcdefghijklmnopqrstuvwxyz"
+
+
+@dataclass(frozen=True)
+class Page:
+    """Страница выборки и курсоры для соседних страниц"""
+    items: list
+    next_cursor: str | None = None
+    prev_cursor: str | None = None
+    current_cursor: str | None = None
+
+
+def _to_base36(value: int) -> str:
+    if value == 0:
+        return "0"
+    digits = []
+    while value:
+        value, rest = divmod(value, 36)
+        digits.append(_DIGITS[rest])
+    return "".join(reversed(digits))
+
+
+def _encode_value(value) -> str:
+    if isinstance(value, datetime):
+        return _to_base36((value - EPOCH) // timedelta(microseconds=1))
+    return _to_base36(value)
+
+
+def _decode_value(raw: str, column):
+    value = int(raw, 36)
+    if isinstance(column.type, DateTime):
+        return EPOCH + timedelta(microseconds=value)
+    return value
+
+
+def encode_cursor(direction: str, key: tuple) -> str:
+    """Курсор для callback_data: направление и ключ строки в base36, например n.lq3x9k1s0.2f"""
+    return ".".join([direction] + [_encode_value(value) for value in key])
+
+
+def decode_cursor(raw: str, key_columns: tuple) -> tuple[str, tuple] | None:
+    """Разбирает курсор из callback_data, для испорченных данных возвращает None"""
+    parts = raw.split(".")
+    if len(parts) != len(key_columns) + 1 or parts[0] not in DIRECTIONS:
+        return None
+    try:
+        key = tuple(_decode_value(part, column) for part, column in zip(parts[1:], key_columns))
+    except (ValueError, OverflowError):
+        return None
+    return parts[0], key
+
+
+async def fetch_page(session: AsyncSession, query, key_columns: tuple, cursor: str | None = None,
+                     descending: bool = False, page_size: int = PAGE_SIZE) -> Page:
+    """Keyset-пагинация: читает ровно page_size + 1 строк по индексу (key_columns), без OFFSET"""
+    decoded = decode_cursor(cursor, key_columns) if cursor else None
+    row_key = tuple_(*key_columns) if len(key_columns) > 1 else key_columns[0]
+
+    def bound(key):
+        return tuple_(*key) if len(key) > 1 else key[0]
+
+    def key_of(item):
+        return tuple(getattr(item, column.key) for column in key_columns)
+
+    forward_order = [column.desc() if descending else column.asc() for column in key_columns]
+    backward_order = [column.asc() if descending else column.desc() for column in key_columns]
+
+    if decoded is None:
+        rows = (await session.execute(query.order_by(*forward_order).limit(page_size + 1))).scalars().all()
+        has_next, has_prev = len(rows) > page_size, False
+        items = list(rows[:page_size])
+    else:
+        direction, key = decoded
+        if direction == "p":
+            condition = row_key > bound(key) if descending else row_key < bound(key)
+            rows = (await session.execute(
+                query.where(condition).order_by(*backward_order).limit(page_size + 1)
+            )).scalars().all()
+            has_next, has_prev = True, len(rows) > page_size
+            items = list(reversed(rows[:page_size]))
+        else:
+            if direction == "n":
+                condition = row_key < bound(key) if descending else row_key > bound(key)
+            else:
+                condition = row_key <= bound(key) if descending else row_key >= bound(key)
+            rows = (await session.execute(
+                query.where(condition).order_by(*forward_order).limit(page_size + 1)
+            )).scalars().all()
+            has_next, has_prev = len(rows) > page_size, True
+            items = list(rows[:page_size])
+
+        # Страница могла опустеть после удаления записей - показываем первую
+        if not items:
+            return await fetch_page(session, query, key_columns, None, descending, page_size)
+
+    return Page(
+        items=items,
+        next_cursor=encode_cursor("n", key_of(items[-1])) if items and has_next else None,
+        prev_cursor=encode_cursor("p", key_of(items[0])) if items and has_prev else None,
+        current_cursor=encode_cursor("c", key_of(items[0])) if items and has_prev else None,
+    )
@@ -0,0 +1,85 @@
+import logging
+from datetime import datetime, timedelta
+from sqlalchemy import select, update, and_
+from config import config
+from database.database import AsyncSessionLocal
+from database.models import Event, User, event_subscriptions
+from services.scheduler import scheduler
+from services.broadcast import telegram_limiter, DELIVERED
+
+logger = logging.getLogger(__name__)
+
+EVENT_REMINDER = "event_reminder"
+
+
+def reminder_key(event_id: int) -> str:
+    return f"{EVENT_REMINDER}:{event_id}"
+
+
+async def schedule_event_reminder(event_id: int, date_time: datetime, rescheduled: bool = False):
+    """Ставит напоминание за EVENT_REMINDER_HOURS часов до начала.
+
+    Если это время уже прошло, напоминание уйдет сразу. При переносе
+    мероприятия (rescheduled) подписчикам напомнят еще раз, о новом времени.
+    """
+    now = datetime.utcnow()
+    if date_time <= now:
+        await scheduler.cancel(reminder_key(event_id))
+        return
+    if rescheduled:
+        async with AsyncSessionLocal() as session:
+            await session.execute(
+                update(event_subscriptions)
+                .where(event_subscriptions.c.event_id == event_id)
+                .values(reminded_at=None)
+            )
+            await session.commit()
+    run_at = max(date_time - timedelta(hours=config.EVENT_REMINDER_HOURS), now)
+    await scheduler.schedule(reminder_key(event_id), EVENT_REMINDER, run_at, {"event_id": event_id})
+
+
+async def cancel_event_reminder(event_id: int):
+    await scheduler.cancel(reminder_key(event_id))
+
+
+async def send_event_reminder(bot, payload: dict):
+    """Напоминает подписчикам, которым еще не напоминали об этом мероприятии"""
+    event_id = payload["event_id"]
+    async with AsyncSessionLocal() as session:
+        event = await session.get(Event, event_id)
+        if event is None or not event.is_active or event.date_time <= datetime.utcnow():
+            return
+        result = await session.execute(
+            select(User.id, User.telegram_id)
+            .join(event_subscriptions, event_subscriptions.c.user_id == User.id)
+            .where(and_(event_subscriptions.c.event_id == event_id, event_subscriptions.c.reminded_at.is_(None)))
+        )
+        subscribers = result.all()
+    if not subscribers:
+        return
+
+    hours_left = max(round((event.date_time - datetime.utcnow()).total_seconds() / 3600), 1)
+    text = (
+        f"🔔 **Напоминание:** через {hours_left} ч. начнется мероприятие\n\n"
+        f"📅 **{event.title}**\n"
+        f"📍 {event.location or 'Онлайн'}\n"
+        f"⏰ {event.date_time.strftime('%d.%m.%Y %H:%M')}"
+    )
+
+    outcomes = await telegram_limiter.send_many(
+        bot, [telegram_id for _, telegram_id in subscribers], text, parse_mode="Markdown"
+    )
+    reminded = [user_id for (user_id, _), outcome in zip(subscribers, outcomes) if outcome == DELIVERED]
+
+    if reminded:
+        async with AsyncSessionLocal() as session:
+            await session.execute(
+                update(event_subscriptions)
+                .where(and_(event_subscriptions.c.event_id == event_id, event_subscriptions.c.user_id.in_(reminded)))
+                .values(reminded_at=datetime.utcnow())
+            )
+            await session.commit()
+    logger.info("Напоминание о мероприятии %s: отправлено %s из %s", event_id, len(reminded), len(subscribers))
+
+
+scheduler.register(EVENT_REMINDER, send_event_reminder)
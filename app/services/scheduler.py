@@ -0,0 +1,151 @@
+import asyncio
+import heapq
+import itertools
+import json
+import logging
+import time
+from datetime import datetime, timedelta
+from typing import Any, Awaitable, Callable, Dict
+from sqlalchemy import select, delete, and_
+from config import config
+from database.database import AsyncSessionLocal, upsert_insert
+from database.models import ScheduledJob
+
+logger = logging.getLogger(__name__)
+
+JobHandler = Callable[[Any, Dict[str, Any]], Awaitable[None]]
+
+
+class Scheduler:
+    """Отложенные задачи: таблица scheduled_jobs и min-куча в памяти.
+
+    Таблица читается при старте, дальше цикл спит до ближайшей задачи и
+    просыпается раньше, если запланирована более ранняя. Раз в poll_interval
+    секунд из таблицы дочитываются задачи, срок которых подходит: так задачу,
+    поставленную другой репликой (в том числе упавшей), выполнит живая.
+    Перед выполнением задача удаляется из таблицы с проверкой run_at:
+    так перенесенная или отмененная задача не выполнится по старому
+    времени, а при нескольких репликах задачу выполнит только одна.
+    """
+
+    def __init__(self, poll_interval: float = 60):
+        self.poll_interval = poll_interval
+        # (run_at, порядковый номер, ключ); устаревшие записи пропускаются при извлечении
+        self._heap: list[tuple[datetime, int, str]] = []
+        # ключ -> (run_at, вид, параметры) - актуальное состояние
+        self._jobs: dict[str, tuple[datetime, str, dict]] = {}
+        self._counter = itertools.count()
+        self._handlers: dict[str, JobHandler] = {}
+        self._wakeup = asyncio.Event()
+        self._running: set[asyncio.Task] = set()
+        self.bot = None
+
+    def register(self, kind: str, handler: JobHandler):
+        """handler(bot, payload) выполняет задачи вида kind"""
+        self._handlers[kind] = handler
+
+    def __len__(self) -> int:
+        return len(self._jobs)
+
+    def _push(self, key: str, kind: str, run_at: datetime, payload: dict):
+        self._jobs[key] = (run_at, kind, payload)
+        heapq.heappush(self._heap, (run_at, next(self._counter), key))
+        if self._heap[0][2] == key:
+            self._wakeup.set()
+
+    async def schedule(self, key: str, kind: str, run_at: datetime, payload: dict | None = None):
+        """Создает задачу или переносит существующую с тем же ключом"""
+        payload = payload or {}
+        async with AsyncSessionLocal() as session:
+            stmt = upsert_insert(session)(ScheduledJob).values(
+                key=key, kind=kind, run_at=run_at, payload=json.dumps(payload)
+            )
+            stmt = stmt.on_conflict_do_update(
+                index_elements=[ScheduledJob.key],
+                set_={"kind": kind, "run_at": run_at, "payload": stmt.excluded.payload}
+            )
+            await session.execute(stmt)
+            await session.commit()
+        self._push(key, kind, run_at, payload)
+
+    async def cancel(self, key: str):
+        async with AsyncSessionLocal() as session:
+            await session.execute(delete(ScheduledJob).where(ScheduledJob.key == key))
+            await session.commit()
+        # Запись в куче останется и будет пропущена
+        self._jobs.pop(key, None)
+
+    async def load(self):
+        """Восстанавливает кучу из таблицы"""
+        async with AsyncSessionLocal() as session:
+            result = await session.execute(select(ScheduledJob))
+            for job in result.scalars():
+                self._push(job.key, job.kind, job.run_at, json.loads(job.payload or "{}"))
+        logger.info("Загружено отложенных задач: %s", len(self._jobs))
+
+    async def poll(self):
+        """Дочитывает задачи со сроком до следующего опроса, которых нет в куче или которые перенесли"""
+        horizon = datetime.utcnow() + timedelta(seconds=self.poll_interval)
+        async with AsyncSessionLocal() as session:
+            result = await session.execute(select(ScheduledJob).where(ScheduledJob.run_at <= horizon))
+            for job in result.scalars():
+                if self._jobs.get(job.key, (None,))[0] != job.run_at:
+                    self._push(job.key, job.kind, job.run_at, json.loads(job.payload or "{}"))
+
+    async def _claim(self, key: str, run_at: datetime) -> bool:
+        async with AsyncSessionLocal() as session:
+            result = await session.execute(
+                delete(ScheduledJob).where(and_(ScheduledJob.key == key, ScheduledJob.run_at == run_at))
+            )
+            await session.commit()
+        return result.rowcount == 1
+
+    async def _execute(self, key: str, kind: str, run_at: datetime, payload: dict):
+        try:
+            if not await self._claim(key, run_at):
+                return
+            handler = self._handlers.get(kind)
+            if handler is None:
+                logger.error("Нет обработчика для задачи %s (%s)", key, kind)
+                return
+            await handler(self.bot, payload)
+        except Exception:
+            logger.exception("Задача %s завершилась с ошибкой", key)
+
+    async def run(self, bot):
+        """Фоновая задача: загружает очередь и выполняет задачи в срок"""
+        self.bot = bot
+        await self.load()
+        next_poll = time.monotonic() + self.poll_interval
+        while True:
+            if time.monotonic() >= next_poll:
+                try:
+                    await self.poll()
+                except Exception:
+                    logger.exception("Не удалось прочитать отложенные задачи")
+                next_poll = time.monotonic() + self.poll_interval
+            self._wakeup.clear()
+            # Пропускаем отмененные и перенесенные записи
+            while self._heap and self._jobs.get(self._heap[0][2], (None,))[0] != self._heap[0][0]:
+                heapq.heappop(self._heap)
+
+            delay = (self._heap[0][0] - datetime.utcnow()).total_seconds() if self._heap else None
+            if delay is None or delay > 0:
+                # Спим до ближайшей задачи, но не дольше, чем до следующего опроса таблицы
+                timeout = max(next_poll - time.monotonic(), 0)
+                if delay is not None:
+                    timeout = min(timeout, delay)
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=timeout)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+
+            run_at, _, key = heapq.heappop(self._heap)
+            _, kind, payload = self._jobs.pop(key)
+            task = asyncio.create_task(self._execute(key, kind, run_at, payload))
+            self._running.add(task)
+            task.add_done_callback(self._running.discard)
+
+
+scheduler = Scheduler(poll_interval=config.SCHEDULER_POLL_INTERVAL)
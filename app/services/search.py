@@ -0,0 +1,176 @@
+import math
+import re
+import time
+from bisect import bisect_left
+from collections import defaultdict
+from dataclasses import dataclass
+from sqlalchemy import select, literal, literal_column, func, union_all
+from sqlalchemy.ext.asyncio import AsyncSession
+from config import config
+from services.cache import cache_backend
+from database.models import Lecture, Vacancy, Project, Mentor, search_document
+
+SEARCH_PAGE_SIZE = 8
+
+# Раздел -> (модель, колонка заголовка, колонки документа, условие активности)
+SEARCH_SECTIONS = {
+    "lectures": (Lecture, Lecture.title, (Lecture.title, Lecture.description), None),
+    "vacancies": (Vacancy, Vacancy.title, (Vacancy.title, Vacancy.description, Vacancy.requirements),
+                  Vacancy.is_active == True),
+    "projects": (Project, Project.title, (Project.title, Project.description), Project.is_active == True),
+    "mentors": (Mentor, Mentor.name, (Mentor.name, Mentor.bio, Mentor.specialization), Mentor.is_active == True),
+}
+
+SECTION_EMOJI = {"lectures": "📚", "vacancies": "💼", "projects": "🚀", "mentors": "👨‍🏫"}
+
+_TOKEN_RE = re.compile(r"\w+")
+
+
+@dataclass(frozen=True)
+class SearchHit:
+    section: str
+    id: int
+    title: str
+    rank: float
+
+
+@dataclass(frozen=True)
+class SearchPage:
+    hits: list[SearchHit]
+    page: int
+    has_next: bool
+
+
+def tokenize(text: str) -> list[str]:
+    """Слова в нижнем регистре, ё приравнивается к е"""
+    return [token for token in _TOKEN_RE.findall(text.lower().replace("ё", "е")) if len(token) > 1]
+
+
+class InvertedIndex:
+    """Инвертированный индекс в памяти для SQLite, где нет tsvector.
+
+    Все слова запроса должны встретиться в документе, каждое слово запроса
+    совпадает с любым словом документа, начинающимся с него. Ранг - TF-IDF.
+    """
+
+    def __init__(self):
+        # слово -> {(раздел, id): сколько раз встречается}
+        self.postings: dict[str, dict[tuple[str, int], int]] = defaultdict(dict)
+        self.titles: dict[tuple[str, int], str] = {}
+        self.lengths: dict[tuple[str, int], int] = {}
+        self._vocabulary: list[str] = []
+
+    def add(self, section: str, doc_id: int, title: str, text: str):
+        key = (section, doc_id)
+        tokens = tokenize(text)
+        self.titles[key] = title
+        self.lengths[key] = len(tokens) or 1
+        for token in tokens:
+            postings = self.postings[token]
+            postings[key] = postings.get(key, 0) + 1
+        self._vocabulary = []
+
+    def _expand(self, term: str) -> list[str]:
+        if not self._vocabulary:
+            self._vocabulary = sorted(self.postings)
+        words = []
+        position = bisect_left(self._vocabulary, term)
+        while position < len(self._vocabulary) and self._vocabulary[position].startswith(term):
+            words.append(self._vocabulary[position])
+            position += 1
+        return words
+
+    def search(self, query: str) -> list[SearchHit]:
+        terms = set(tokenize(query))
+        if not terms:
+            return []
+
+        total = len(self.titles)
+        scores: dict[tuple[str, int], float] | None = None
+        for term in terms:
+            term_scores: dict[tuple[str, int], float] = defaultdict(float)
+            for word in self._expand(term):
+                postings = self.postings[word]
+                idf = math.log(1 + total / len(postings))
+                for key, count in postings.items():
+                    term_scores[key] += count / self.lengths[key] * idf
+            if scores is None:
+                scores = term_scores
+            else:
+                scores = {key: score + term_scores[key] for key, score in scores.items() if key in term_scores}
+            if not scores:
+                return []
+
+        hits = [SearchHit(section, doc_id, self.titles[(section, doc_id)], rank)
+                for (section, doc_id), rank in scores.items()]
+        hits.sort(key=lambda hit: (-hit.rank, hit.section, hit.id))
+        return hits
+
+
+class FallbackSearch:
+    """Индекс для SQLite: строится при первом поиске, перестраивается после изменений"""
+
+    def __init__(self, ttl: float = 300):
+        self.ttl = ttl
+        self._index: InvertedIndex | None = None
+        self._built_at = 0.0
+
+    def invalidate(self, *sections: str, ids: tuple = ()):
+        # Индекс строится по всем разделам сразу, поэтому ids не используются
+        if not sections or any(section in SEARCH_SECTIONS for section in sections):
+            self._index = None
+
+    async def get_index(self, session: AsyncSession) -> InvertedIndex:
+        if self._index is None or time.monotonic() - self._built_at > self.ttl:
+            index = InvertedIndex()
+            for section, (model, title, columns, active) in SEARCH_SECTIONS.items():
+                query = select(model.id, title, *columns)
+                if active is not None:
+                    query = query.where(active)
+                for row in (await session.execute(query)).all():
+                    index.add(section, row[0], row[1], " ".join(value for value in row[2:] if value))
+            self._index = index
+            self._built_at = time.monotonic()
+        return self._index
+
+
+fallback_search = FallbackSearch(ttl=config.LISTING_CACHE_TTL)
+cache_backend.add_listener(fallback_search.invalidate)
+
+
+async def _search_postgres(session: AsyncSession, query: str, offset: int, limit: int) -> list[SearchHit]:
+    ts_query = func.websearch_to_tsquery(literal_column("'russian'::regconfig"), query)
+    parts = []
+    for section, (model, title, columns, active) in SEARCH_SECTIONS.items():
+        document = search_document(*columns)
+        part = select(
+            literal(section).label("section"),
+            model.id.label("id"),
+            title.label("title"),
+            func.ts_rank(document, ts_query).label("rank")
+        ).where(document.op("@@")(ts_query))
+        if active is not None:
+            part = part.where(active)
+        parts.append(part)
+
+    results = union_all(*parts).subquery()
+    rows = await session.execute(
+        select(results)
+        .order_by(results.c.rank.desc(), results.c.section, results.c.id)
+        .offset(offset)
+        .limit(limit)
+    )
+    return [SearchHit(row.section, row.id, row.title, row.rank) for row in rows]
+
+
+async def search(session: AsyncSession, query: str, page: int = 0,
+                 page_size: int = SEARCH_PAGE_SIZE) -> SearchPage:
+    """Ранжированный поиск по лекциям, вакансиям, проектам и менторам"""
+    offset = page * page_size
+    # Берем на одну запись больше, чтобы узнать, есть ли следующая страница
+    if session.bind.dialect.name == "postgresql":
+        hits = await _search_postgres(session, query, offset, page_size + 1)
+    else:
+        index = await fallback_search.get_index(session)
+        hits = index.search(query)[offset:offset + page_size + 1]
+    return SearchPage(hits=hits[:page_size], page=page, has_next=len(hits) > page_size)
@@ -0,0 +1,73 @@
+import json
+from sqlalchemy import select, delete, func
+from sqlalchemy.ext.asyncio import AsyncSession
+from database.database import upsert_insert
+from database.models import Skill, Project, project_skills, user_skills
+
+
+def normalize_skill(title: str) -> str:
+    return " ".join(title.split()).lower()
+
+
+def parse_skills(raw: str | None) -> list[str]:
+    """Навыки из JSON-списка или из строки через запятую, без повторов"""
+    if not raw:
+        return []
+    try:
+        values = json.loads(raw)
+    except ValueError:
+        values = raw.split(",")
+    if isinstance(values, str):
+        values = [values]
+    if not isinstance(values, list):
+        return []
+
+    titles, seen = [], set()
+    for value in values:
+        title = " ".join(str(value).split())[:50]
+        if title and normalize_skill(title) not in seen:
+            seen.add(normalize_skill(title))
+            titles.append(title)
+    return titles
+
+
+async def ensure_skills(session: AsyncSession, titles: list[str]) -> list[Skill]:
+    """Возвращает навыки по названиям, недостающие создает одним запросом"""
+    if not titles:
+        return []
+    rows = {normalize_skill(title): title for title in titles}
+    insert = upsert_insert(session)
+    await session.execute(
+        insert(Skill)
+        .values([{"name": name, "title": title} for name, title in rows.items()])
+        .on_conflict_do_nothing(index_elements=[Skill.name])
+    )
+    result = await session.execute(select(Skill).where(Skill.name.in_(rows)))
+    return list(result.scalars())
+
+
+async def set_user_skills(session: AsyncSession, user_id: int, titles: list[str]) -> list[Skill]:
+    """Заменяет навыки пользователя (users.id)"""
+    skills = await ensure_skills(session, titles)
+    await session.execute(delete(user_skills).where(user_skills.c.user_id == user_id))
+    if skills:
+        await session.execute(
+            user_skills.insert(),
+            [{"user_id": user_id, "skill_id": skill.id} for skill in skills]
+        )
+    return skills
+
+
+async def skills_in_demand(session: AsyncSession, limit: int = 30) -> list[tuple[int, str, int]]:
+    """Навыки, которые нужны активным проектам: (id, название, число проектов)"""
+    projects_count = func.count(project_skills.c.project_id)
+    result = await session.execute(
+        select(Skill.id, Skill.title, projects_count)
+        .join(project_skills, project_skills.c.skill_id == Skill.id)
+        .join(Project, Project.id == project_skills.c.project_id)
+        .where(Project.is_active == True)
+        .group_by(Skill.id, Skill.title)
+        .order_by(projects_count.desc(), Skill.title)
+        .limit(limit)
+    )
+    return [tuple(row) for row in result]
@@ -0,0 +1,324 @@
+import asyncio
+import json
+import logging
+from dataclasses import dataclass, field, asdict
+from datetime import datetime, timedelta
+from sqlalchemy import select, func, and_, literal, union_all, true
+from sqlalchemy.ext.asyncio import AsyncSession
+from database.database import ReplicaSessionLocal
+from database.models import User, Mentor, Event, Lecture, Vacancy, Project
+from services.cache import cache_backend
+
+logger = logging.getLogger(__name__)
+
+# Категории лекций в порядке отображения в админке
+LECTURE_CATEGORIES = [
+    "Программирование",
+    "Кибербезопасность",
+    "Data Science",
+    "Web разработка",
+    "Mobile разработка",
+]
+
+PROJECT_STATUSES = ["discussion", "development", "completed"]
+
+# Ряды гистограммы активности: название -> (колонка даты, доп. условие)
+HISTOGRAM_SERIES = {
+    "users": (User.created_at, None),
+    "events": (Event.date_time, Event.is_active == True),
+    "lectures": (Lecture.uploaded_at, None),
+    "vacancies": (Vacancy.posted_at, None),
+    "projects": (Project.created_at, None),
+}
+
+HISTOGRAM_UNITS = ("day", "week", "month")
+
+SPARK_CHARS = "▁▂▃▄▅▆▇█"
+
+# Окна для рейтинга менторов: None означает все время
+LEADERBOARD_WINDOWS = [7, 30, 90, None]
+
+
+@dataclass(frozen=True)
+class StatsSnapshot:
+    """Снимок всех счетчиков для экранов статистики администратора"""
+    collected_at: datetime
+
+    # Общая статистика
+    total_users: int = 0
+    # Активные пользователи за сутки и за 30 дней (DAU/MAU)
+    daily_active_users: int = 0
+    monthly_active_users: int = 0
+    active_mentors: int = 0
+    active_events: int = 0
+    future_events: int = 0
+    past_events: int = 0
+    total_lectures: int = 0
+    active_vacancies: int = 0
+    active_projects: int = 0
+    lectures_by_category: dict[str, int] = field(default_factory=dict)
+    projects_by_status: dict[str, int] = field(default_factory=dict)
+
+    # Последние 30 дней
+    recent_users: int = 0
+    recent_events: int = 0
+    recent_lectures: int = 0
+    recent_vacancies: int = 0
+    recent_projects: int = 0
+
+    # По дням
+    today_users: int = 0
+    today_events: int = 0
+    today_lectures: int = 0
+    today_vacancies: int = 0
+    today_projects: int = 0
+    yesterday_users: int = 0
+    week_users: int = 0
+    week_events: int = 0
+
+
+def _count_if(condition):
+    return func.count().filter(condition)
+
+
+async def collect_stats(session: AsyncSession, now: datetime | None = None) -> StatsSnapshot:
+    """Собирает все счетчики за два запроса к базе"""
+    now = now or datetime.utcnow()
+    today = now.replace(hour=0, minute=0, second=0, microsecond=0)
+    tomorrow = today + timedelta(days=1)
+    yesterday = today - timedelta(days=1)
+    week_ago = today - timedelta(days=7)
+    thirty_days_ago = now - timedelta(days=30)
+
+    # Каждая таблица агрегируется в одну строку, строки объединяются в одном SELECT
+    users = select(
+        func.count().label("total_users"),
+        _count_if(User.created_at >= thirty_days_ago).label("recent_users"),
+        _count_if(and_(User.created_at >= today, User.created_at < tomorrow)).label("today_users"),
+        _count_if(and_(User.created_at >= yesterday, User.created_at < today)).label("yesterday_users"),
+        _count_if(User.created_at >= week_ago).label("week_users"),
+        _count_if(User.last_seen_at >= now - timedelta(days=1)).label("daily_active_users"),
+        _count_if(User.last_seen_at >= thirty_days_ago).label("monthly_active_users"),
+    ).select_from(User).subquery()
+
+    mentors = select(
+        _count_if(Mentor.is_active == True).label("active_mentors"),
+    ).select_from(Mentor).subquery()
+
+    events = select(
+        func.count().label("active_events"),
+        _count_if(Event.date_time > now).label("future_events"),
+        _count_if(Event.date_time <= now).label("past_events"),
+        _count_if(Event.date_time >= thirty_days_ago).label("recent_events"),
+        _count_if(and_(Event.date_time >= today, Event.date_time < tomorrow)).label("today_events"),
+        _count_if(Event.date_time >= week_ago).label("week_events"),
+    ).select_from(Event).where(Event.is_active == True).subquery()
+
+    lectures = select(
+        func.count().label("total_lectures"),
+        _count_if(Lecture.uploaded_at >= thirty_days_ago).label("recent_lectures"),
+        _count_if(and_(Lecture.uploaded_at >= today, Lecture.uploaded_at < tomorrow)).label("today_lectures"),
+    ).select_from(Lecture).subquery()
+
+    vacancies = select(
+        _count_if(Vacancy.is_active == True).label("active_vacancies"),
+        _count_if(Vacancy.posted_at >= thirty_days_ago).label("recent_vacancies"),
+        _count_if(and_(Vacancy.posted_at >= today, Vacancy.posted_at < tomorrow)).label("today_vacancies"),
+    ).select_from(Vacancy).subquery()
+
+    projects = select(
+        _count_if(Project.is_active == True).label("active_projects"),
+        _count_if(Project.created_at >= thirty_days_ago).label("recent_projects"),
+        _count_if(and_(Project.created_at >= today, Project.created_at < tomorrow)).label("today_projects"),
+    ).select_from(Project).subquery()
+
+    # Все подзапросы однострочные, соединяем их явно без условия
+    totals_query = select(users, mentors, events, lectures, vacancies, projects).select_from(
+        users.join(mentors, true()).join(events, true()).join(lectures, true())
+        .join(vacancies, true()).join(projects, true())
+    )
+    totals = (await session.execute(totals_query)).mappings().one()
+
+    # Разбивка по категориям лекций и статусам проектов одним UNION ALL
+    breakdown_query = union_all(
+        select(literal("lecture").label("kind"), Lecture.category.label("key"), func.count().label("cnt"))
+        .where(Lecture.category.in_(LECTURE_CATEGORIES))
+        .group_by(Lecture.category),
+        select(literal("project").label("kind"), Project.status.label("key"), func.count().label("cnt"))
+        .where(Project.is_active == True)
+        .group_by(Project.status),
+    )
+    lectures_by_category = {}
+    projects_by_status = {}
+    for kind, key, cnt in (await session.execute(breakdown_query)).all():
+        if kind == "lecture":
+            lectures_by_category[key] = cnt
+        else:
+            projects_by_status[key] = cnt
+
+    return StatsSnapshot(
+        collected_at=now,
+        lectures_by_category=lectures_by_category,
+        projects_by_status=projects_by_status,
+        **{name: value or 0 for name, value in totals.items()},
+    )
+
+
+async def top_mentors(session: AsyncSession, days: int | None = None, limit: int = 5,
+                      now: datetime | None = None) -> list[tuple[str, int]]:
+    """Рейтинг менторов по числу активных мероприятий за последние days дней одним запросом"""
+    events_count = func.count(Event.id).label("events_count")
+    query = (
+        select(Mentor.name, events_count)
+        .join(Event, Event.mentor_id == Mentor.id)
+        .where(Event.is_active == True)
+        .group_by(Event.mentor_id, Mentor.name)
+        .order_by(events_count.desc(), Mentor.name)
+        .limit(limit)
+    )
+    if days is not None:
+        since = (now or datetime.utcnow()) - timedelta(days=days)
+        query = query.where(Event.date_time >= since)
+    result = await session.execute(query)
+    return [(name, count) for name, count in result.all()]
+
+
+@dataclass(frozen=True)
+class Histogram:
+    """Количество новых записей по интервалам времени"""
+    unit: str
+    buckets: list[datetime]
+    series: dict[str, list[int]]
+
+
+def truncate_datetime(value: datetime, unit: str) -> datetime:
+    """Python-аналог date_trunc для построения списка интервалов"""
+    day = value.replace(hour=0, minute=0, second=0, microsecond=0)
+    if unit == "day":
+        return day
+    if unit == "week":
+        return day - timedelta(days=day.weekday())
+    return day.replace(day=1)
+
+
+def _next_bucket(value: datetime, unit: str) -> datetime:
+    if unit == "day":
+        return value + timedelta(days=1)
+    if unit == "week":
+        return value + timedelta(weeks=1)
+    if value.month == 12:
+        return value.replace(year=value.year + 1, month=1)
+    return value.replace(month=value.month + 1)
+
+
+def _bucket_expr(column, unit: str, dialect: str):
+    if dialect == "postgresql":
+        return func.date_trunc(unit, column)
+    # SQLite (локальные прогоны) не знает date_trunc
+    if unit == "day":
+        return func.date(column)
+    if unit == "week":
+        return func.date(column, "-6 days", "weekday 1")
+    return func.strftime("%Y-%m-01", column)
+
+
+def _as_datetime(value) -> datetime:
+    if isinstance(value, str):
+        return datetime.fromisoformat(value)
+    if not isinstance(value, datetime):
+        return datetime(value.year, value.month, value.day)
+    return value.replace(tzinfo=None)
+
+
+async def activity_histogram(session: AsyncSession, start: datetime, end: datetime,
+                             unit: str = "day") -> Histogram:
+    """Считает новые записи по интервалам [start, end) - по одному GROUP BY на таблицу"""
+    if unit not in HISTOGRAM_UNITS:
+        raise ValueError(f"Неизвестный интервал: {unit}")
+
+    buckets = []
+    bucket = truncate_datetime(start, unit)
+    while bucket < end:
+        buckets.append(bucket)
+        bucket = _next_bucket(bucket, unit)
+    positions = {bucket: i for i, bucket in enumerate(buckets)}
+
+    dialect = session.bind.dialect.name
+    series = {}
+    for name, (column, condition) in HISTOGRAM_SERIES.items():
+        bucket_col = _bucket_expr(column, unit, dialect).label("bucket")
+        query = (
+            select(bucket_col, func.count().label("cnt"))
+            .where(and_(column >= start, column < end))
+            .group_by(bucket_col)
+        )
+        if condition is not None:
+            query = query.where(condition)
+        counts = [0] * len(buckets)
+        for bucket_value, cnt in (await session.execute(query)).all():
+            position = positions.get(_as_datetime(bucket_value))
+            if position is not None:
+                counts[position] = cnt
+        series[name] = counts
+
+    return Histogram(unit=unit, buckets=buckets, series=series)
+
+
+def sparkline(values: list[int]) -> str:
+    """Компактный текстовый график: одна ячейка на интервал"""
+    if not values:
+        return ""
+    top = max(values)
+    if top == 0:
+        return SPARK_CHARS[0] * len(values)
+    last = len(SPARK_CHARS) - 1
+    # Ненулевые значения всегда видны над нулевой линией
+    return "".join(
+        SPARK_CHARS[max(1, round(value / top * last)) if value else 0] for value in values
+    )
+
+
+def snapshot_to_json(snapshot: StatsSnapshot) -> str:
+    data = asdict(snapshot)
+    data["collected_at"] = snapshot.collected_at.isoformat()
+    return json.dumps(data)
+
+
+def snapshot_from_json(raw: str) -> StatsSnapshot:
+    data = json.loads(raw)
+    data["collected_at"] = datetime.fromisoformat(data["collected_at"])
+    return StatsSnapshot(**data)
+
+
+async def refresh_stats() -> StatsSnapshot:
+    """Пересобирает снимок статистики и кладет его в общий кэш"""
+    # Агрегаты считаются на реплике
+    async with ReplicaSessionLocal() as session:
+        snapshot = await collect_stats(session)
+    await cache_backend.set("stats", "snapshot", snapshot_to_json(snapshot))
+    return snapshot
+
+
+async def get_stats_snapshot() -> StatsSnapshot:
+    """Возвращает готовый снимок, собирая его только если фоновая задача еще не успела"""
+    raw = await cache_backend.get("stats", "snapshot")
+    if raw is None:
+        return await refresh_stats()
+    return snapshot_from_json(raw)
+
+
+async def run_stats_refresher(interval: int):
+    """Фоновая задача: обновляет снимок статистики каждые interval секунд"""
+    while True:
+        try:
+            await refresh_stats()
+        except Exception:
+            logger.exception("Не удалось обновить статистику")
+        await asyncio.sleep(interval)
+
+
+def format_snapshot_age(snapshot: StatsSnapshot) -> str:
+    age = int((datetime.utcnow() - snapshot.collected_at).total_seconds())
+    if age < 60:
+        return f"🕐 Данные обновлены {age} сек назад"
+    return f"🕐 Данные обновлены {age // 60} мин назад"
@@ -0,0 +1,125 @@
+import asyncio
+import hmac
+import logging
+import signal
+from aiohttp import web
+from aiogram import Bot, Dispatcher
+from aiogram.methods import TelegramMethod
+from config import config
+
+logger = logging.getLogger(__name__)
+
+SECRET_HEADER = "X-Telegram-Bot-Api-Secret-Token"
+
+
+class WebhookServer:
+    """Прием обновлений от Telegram через aiohttp.
+
+    Принимаются только запросы с секретом из set_webhook: без него любой
+    мог бы прислать обновление от имени администратора. Обновление
+    подтверждается сразу, обработка идет в фоне не более чем
+    в max_concurrency задачах одновременно. При остановке новые запросы
+    получают 503 (Telegram повторит их), а начатые дорабатываются.
+    """
+
+    def __init__(self, dp: Dispatcher, bot: Bot, secret_token: str,
+                 max_concurrency: int = 100, drain_timeout: float = 30):
+        if not secret_token:
+            raise ValueError("Для вебхука нужен secret_token")
+        self.dp = dp
+        self.bot = bot
+        self.secret_token = secret_token
+        self.drain_timeout = drain_timeout
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self._tasks: set[asyncio.Task] = set()
+        self._closing = False
+
+    def make_app(self, path: str = "/webhook") -> web.Application:
+        app = web.Application()
+        app.router.add_post(path, self.handle)
+        app.on_shutdown.append(self._on_shutdown)
+        return app
+
+    async def handle(self, request: web.Request) -> web.Response:
+        if not hmac.compare_digest(
+            request.headers.get(SECRET_HEADER, ""), self.secret_token
+        ):
+            return web.Response(status=401)
+        if self._closing:
+            return web.Response(status=503)
+
+        try:
+            update = await request.json()
+        except ValueError:
+            return web.Response(status=400)
+
+        task = asyncio.create_task(self._process(update))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return web.json_response({})
+
+    async def _process(self, update: dict):
+        async with self._semaphore:
+            try:
+                result = await self.dp.feed_raw_update(self.bot, update)
+                # Ответ хендлера в виде метода API отправляем отдельным запросом
+                if isinstance(result, TelegramMethod):
+                    await self.dp.silent_call_request(self.bot, result)
+            except Exception:
+                logger.exception("Ошибка обработки обновления %s", update.get("update_id"))
+
+    @property
+    def pending(self) -> int:
+        return len(self._tasks)
+
+    async def drain(self):
+        """Перестает принимать обновления и ждет завершения начатых"""
+        self._closing = True
+        if not self._tasks:
+            return
+        logger.info("Дожидаемся обработки %s обновлений", len(self._tasks))
+        done, pending = await asyncio.wait(set(self._tasks), timeout=self.drain_timeout)
+        for task in pending:
+            task.cancel()
+        if pending:
+            logger.warning("Не дождались %s обновлений, отменены", len(pending))
+
+    async def _on_shutdown(self, app: web.Application):
+        await self.drain()
+
+
+async def run_webhook(dp: Dispatcher, bot: Bot):
+    """Запуск бота в режиме вебхука вместо long polling"""
+    if not config.WEBHOOK_SECRET:
+        raise RuntimeError("WEBHOOK_URL задан без WEBHOOK_SECRET: вебхук принимал бы поддельные обновления")
+    server = WebhookServer(
+        dp, bot,
+        secret_token=config.WEBHOOK_SECRET,
+        max_concurrency=config.WEBHOOK_MAX_CONCURRENCY,
+        drain_timeout=config.WEBHOOK_DRAIN_TIMEOUT
+    )
+    runner = web.AppRunner(server.make_app(config.WEBHOOK_PATH))
+    await runner.setup()
+    site = web.TCPSite(runner, config.WEBHOOK_HOST, config.WEBHOOK_PORT)
+    await site.start()
+
+    await bot.set_webhook(
+        config.WEBHOOK_URL.rstrip("/") + config.WEBHOOK_PATH,
+        secret_token=config.WEBHOOK_SECRET,
+        allowed_updates=dp.resolve_used_update_types()
+    )
+    await dp.emit_startup(bot=bot)
+    logger.info("Вебхук слушает %s:%s%s", config.WEBHOOK_HOST, config.WEBHOOK_PORT, config.WEBHOOK_PATH)
+
+    # Останавливаемся по SIGTERM/SIGINT, дождавшись начатых обновлений
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGTERM, signal.SIGINT):
+        loop.add_signal_handler(sig, stop.set)
+
+    try:
+        await stop.wait()
+    finally:
+        await runner.cleanup()
+        await dp.emit_shutdown(bot=bot)
+        await bot.session.close()
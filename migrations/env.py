@@ -1,17 +1,21 @@
+import asyncio
 import os
 from logging.config import fileConfig
-from sqlalchemy import engine_from_config, pool
+from sqlalchemy import pool
+from sqlalchemy.ext.asyncio import async_engine_from_config
 from alembic import context
 
-# импорт базы моделей
-from app.models.base import Base
+# импорт базы моделей (каталог app добавлен в sys.path через prepend_sys_path)
+from database.models import Base
 
 target_metadata = Base.metadata
 
 config = context.config
 # берем URL из окружения, если задан
-sql_url = os.getenv('SQLALCHEMY_URL')
+sql_url = os.getenv('SQLALCHEMY_URL') or os.getenv('DATABASE_URL')
 if sql_url:
+    if sql_url.startswith('postgresql://'):
+        sql_url = sql_url.replace('postgresql://', 'postgresql+asyncpg://', 1)
     config.set_main_option('sqlalchemy.url', sql_url)
 
 fileConfig(config.config_file_name)
@@ -23,18 +27,23 @@ def run_migrations_offline():
         context.run_migrations()
 
 
-def run_migrations_online():
-    connectable = engine_from_config(
+def do_run_migrations(connection):
+    context.configure(connection=connection, target_metadata=target_metadata)
+    with context.begin_transaction():
+        context.run_migrations()
+
+
+async def run_migrations_online():
+    connectable = async_engine_from_config(
         config.get_section(config.config_ini_section),
         prefix='sqlalchemy.',
         poolclass=pool.NullPool
     )
-    with connectable.connect() as connection:
-        context.configure(connection=connection, target_metadata=target_metadata)
-        with context.begin_transaction():
-            context.run_migrations()
+    async with connectable.connect() as connection:
+        await connection.run_sync(do_run_migrations)
+    await connectable.dispose()
 
 if context.is_offline_mode():
     run_migrations_offline()
 else:
-    run_migrations_online()
\ No newline at end of file
+    asyncio.run(run_migrations_online())
@@ -0,0 +1,115 @@
+"""initial schema
+
+Исходная схема проекта в точности, как ее создавал create_all по моделям
+до перехода на миграции. Работающая база, созданная create_all, уже
+содержит эти таблицы: они пропускаются, и `alembic upgrade head` переводит
+ее на миграции без ручного `alembic stamp`.
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-17 10:00:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0001'
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def create_missing_table(existing, name, *columns):
+    if name not in existing:
+        op.create_table(name, *columns)
+
+
+def upgrade():
+    existing = set(sa.inspect(op.get_bind()).get_table_names())
+    create_missing_table(
+        existing, 'users',
+        sa.Column('id', sa.Integer(), primary_key=True),
+        sa.Column('telegram_id', sa.Integer(), nullable=False, unique=True),
+        sa.Column('username', sa.String(50)),
+        sa.Column('full_name', sa.String(100)),
+        sa.Column('is_admin', sa.Boolean()),
+        sa.Column('is_mentor', sa.Boolean()),
+        sa.Column('created_at', sa.DateTime()),
+    )
+    create_missing_table(
+        existing, 'mentors',
+        sa.Column('id', sa.Integer(), primary_key=True),
+        sa.Column('user_id', sa.Integer(), sa.ForeignKey('users.id')),
+        sa.Column('name', sa.String(100), nullable=False),
+        sa.Column('bio', sa.Text()),
+        sa.Column('specialization', sa.String(100)),
+        sa.Column('contact_info', sa.String(200)),
+        sa.Column('is_active', sa.Boolean()),
+    )
+    create_missing_table(
+        existing, 'events',
+        sa.Column('id', sa.Integer(), primary_key=True),
+        sa.Column('title', sa.String(200), nullable=False),
+        sa.Column('description', sa.Text()),
+        sa.Column('event_type', sa.String(50)),
+        sa.Column('mentor_id', sa.Integer(), sa.ForeignKey('mentors.id')),
+        sa.Column('date_time', sa.DateTime(), nullable=False),
+        sa.Column('location', sa.String(200)),
+        sa.Column('is_active', sa.Boolean()),
+        sa.Column('created_by', sa.Integer(), sa.ForeignKey('users.id')),
+    )
+    create_missing_table(
+        existing, 'lectures',
+        sa.Column('id', sa.Integer(), primary_key=True),
+        sa.Column('title', sa.String(200), nullable=False),
+        sa.Column('description', sa.Text()),
+        sa.Column('category', sa.String(100)),
+        sa.Column('mentor_id', sa.Integer(), sa.ForeignKey('mentors.id')),
+        sa.Column('file_path', sa.String(500)),
+        sa.Column('video_url', sa.String(500)),
+        sa.Column('duration', sa.Integer()),
+        sa.Column('uploaded_at', sa.DateTime()),
+        sa.Column('uploaded_by', sa.Integer(), sa.ForeignKey('users.id')),
+    )
+    create_missing_table(
+        existing, 'vacancies',
+        sa.Column('id', sa.Integer(), primary_key=True),
+        sa.Column('title', sa.String(200), nullable=False),
+        sa.Column('company', sa.String(100)),
+        sa.Column('description', sa.Text()),
+        sa.Column('requirements', sa.Text()),
+        sa.Column('salary_range', sa.String(100)),
+        sa.Column('location', sa.String(100)),
+        sa.Column('contact_info', sa.String(200)),
+        sa.Column('is_active', sa.Boolean()),
+        sa.Column('posted_at', sa.DateTime()),
+        sa.Column('posted_by', sa.Integer(), sa.ForeignKey('users.id')),
+    )
+    create_missing_table(
+        existing, 'projects',
+        sa.Column('id', sa.Integer(), primary_key=True),
+        sa.Column('title', sa.String(200), nullable=False),
+        sa.Column('description', sa.Text()),
+        sa.Column('status', sa.String(50)),
+        sa.Column('required_skills', sa.Text()),
+        sa.Column('contact_person', sa.Integer(), sa.ForeignKey('users.id')),
+        sa.Column('created_at', sa.DateTime()),
+        sa.Column('is_active', sa.Boolean()),
+    )
+    create_missing_table(
+        existing, 'project_skills',
+        sa.Column('project_id', sa.Integer(), sa.ForeignKey('projects.id')),
+        sa.Column('skill', sa.String(50)),
+    )
+
+
+def downgrade():
+    op.drop_table('project_skills')
+    op.drop_table('projects')
+    op.drop_table('vacancies')
+    op.drop_table('lectures')
+    op.drop_table('events')
+    op.drop_table('mentors')
+    op.drop_table('users')
@@ -0,0 +1,55 @@
+"""hot path indexes
+
+Индексы под фильтры и сортировки публичных разделов, пагинации и статистики.
+Частичные индексы (WHERE is_active) покрывают только активные записи.
+В PostgreSQL индексы строятся CONCURRENTLY, чтобы не блокировать запись.
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-17 10:30:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0002'
+down_revision = '0001'
+branch_labels = None
+depends_on = None
+
+ACTIVE_PG = sa.text('is_active')
+ACTIVE_SQLITE = sa.text('is_active = 1')
+
+# (имя, таблица, колонки, только активные)
+INDEXES = [
+    ('ix_users_created_at', 'users', ['created_at'], False),
+    ('ix_mentors_active', 'mentors', ['id'], True),
+    ('ix_events_active_date_time', 'events', ['date_time', 'id'], True),
+    ('ix_events_active_mentor_id', 'events', ['mentor_id'], True),
+    ('ix_lectures_category_uploaded_at', 'lectures', ['category', 'uploaded_at', 'id'], False),
+    ('ix_lectures_uploaded_at', 'lectures', ['uploaded_at', 'id'], False),
+    ('ix_vacancies_active_posted_at', 'vacancies', ['posted_at', 'id'], True),
+    ('ix_projects_active_created_at', 'projects', ['created_at', 'id'], True),
+    ('ix_projects_active_status', 'projects', ['status'], True),
+]
+
+
+def upgrade():
+    # CREATE INDEX CONCURRENTLY нельзя выполнять внутри транзакции
+    with op.get_context().autocommit_block():
+        for name, table, columns, active_only in INDEXES:
+            where = {'postgresql_where': ACTIVE_PG, 'sqlite_where': ACTIVE_SQLITE} if active_only else {}
+            op.create_index(
+                name, table, columns,
+                postgresql_concurrently=True,
+                if_not_exists=True,
+                **where
+            )
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        for name, table, _, _ in reversed(INDEXES):
+            op.drop_index(name, table_name=table, postgresql_concurrently=True, if_exists=True)
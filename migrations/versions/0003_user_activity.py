@@ -0,0 +1,30 @@
+"""user activity
+
+Время последней активности и число обращений пользователя для DAU/MAU.
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-17 11:00:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0003'
+down_revision = '0002'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column('users', sa.Column('last_seen_at', sa.DateTime()))
+    op.add_column('users', sa.Column('interactions_count', sa.Integer(), server_default='0', nullable=False))
+    op.create_index('ix_users_last_seen_at', 'users', ['last_seen_at'])
+
+
+def downgrade():
+    op.drop_index('ix_users_last_seen_at', table_name='users')
+    op.drop_column('users', 'interactions_count')
+    op.drop_column('users', 'last_seen_at')
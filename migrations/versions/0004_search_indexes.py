@@ -0,0 +1,54 @@
+"""search indexes
+
+GIN-индексы полнотекстового поиска (/search). Выражения совпадают с
+database.models.search_document. В SQLite поиск идет по индексу в памяти,
+поэтому там миграция ничего не делает.
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-17 11:30:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0004'
+down_revision = '0003'
+branch_labels = None
+depends_on = None
+
+# (имя, таблица, колонки документа)
+INDEXES = [
+    ('ix_lectures_search', 'lectures', ['title', 'description']),
+    ('ix_vacancies_search', 'vacancies', ['title', 'description', 'requirements']),
+    ('ix_projects_search', 'projects', ['title', 'description']),
+    ('ix_mentors_search', 'mentors', ['name', 'bio', 'specialization']),
+]
+
+
+def document(columns):
+    joined = " || ' ' || ".join(f"coalesce({column}, '')" for column in columns)
+    return sa.text(f"to_tsvector('russian'::regconfig, {joined})")
+
+
+def upgrade():
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+    with op.get_context().autocommit_block():
+        for name, table, columns in INDEXES:
+            op.create_index(
+                name, table, [document(columns)],
+                postgresql_using='gin',
+                postgresql_concurrently=True,
+                if_not_exists=True
+            )
+
+
+def downgrade():
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+    with op.get_context().autocommit_block():
+        for name, table, _ in reversed(INDEXES):
+            op.drop_index(name, table_name=table, postgresql_concurrently=True, if_exists=True)
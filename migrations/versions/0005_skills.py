@@ -0,0 +1,113 @@
+"""skills
+
+Навыки проектов переезжают из JSON-строки projects.required_skills в
+таблицу skills и связующую project_skills (project_id, skill_id).
+Неиспользуемая старая project_skills (project_id, skill) заменяется,
+ее строки, если есть, тоже переносятся.
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-17 12:00:00
+
+"""
+import json
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0005'
+down_revision = '0004'
+branch_labels = None
+depends_on = None
+
+
+def parse_skills(raw):
+    """JSON-список или строка через запятую (копия services.skills.parse_skills)"""
+    if not raw:
+        return []
+    try:
+        values = json.loads(raw)
+    except ValueError:
+        values = raw.split(',')
+    if isinstance(values, str):
+        values = [values]
+    if not isinstance(values, list):
+        return []
+    return [' '.join(str(value).split())[:50] for value in values if str(value).strip()]
+
+
+def upgrade():
+    bind = op.get_bind()
+
+    # Читаем старые данные до изменения схемы
+    projects = bind.execute(sa.text(
+        "SELECT id, required_skills FROM projects WHERE required_skills IS NOT NULL"
+    )).all()
+    legacy = bind.execute(sa.text(
+        "SELECT project_id, skill FROM project_skills WHERE project_id IS NOT NULL AND skill IS NOT NULL"
+    )).all()
+
+    skills = op.create_table(
+        'skills',
+        sa.Column('id', sa.Integer(), primary_key=True),
+        sa.Column('name', sa.String(50), nullable=False, unique=True),
+        sa.Column('title', sa.String(50), nullable=False),
+    )
+    op.drop_table('project_skills')
+    links = op.create_table(
+        'project_skills',
+        sa.Column('project_id', sa.Integer(), sa.ForeignKey('projects.id', ondelete='CASCADE'), primary_key=True),
+        sa.Column('skill_id', sa.Integer(), sa.ForeignKey('skills.id', ondelete='CASCADE'), primary_key=True),
+    )
+    op.create_index('ix_project_skills_skill_id', 'project_skills', ['skill_id', 'project_id'])
+
+    # Все навыки и связи собираются в памяти и вставляются двумя пачками
+    skill_ids = {}
+    skill_rows, link_rows = [], set()
+    pairs = [(project_id, title) for project_id, raw in projects for title in parse_skills(raw)]
+    pairs += [(project_id, ' '.join(skill.split())[:50]) for project_id, skill in legacy if skill.strip()]
+    for project_id, title in pairs:
+        name = title.lower()
+        if name not in skill_ids:
+            skill_ids[name] = len(skill_rows) + 1
+            skill_rows.append({'id': skill_ids[name], 'name': name, 'title': title})
+        link_rows.add((project_id, skill_ids[name]))
+
+    if skill_rows:
+        op.bulk_insert(skills, skill_rows)
+        op.bulk_insert(links, [{'project_id': p, 'skill_id': s} for p, s in sorted(link_rows)])
+        if bind.dialect.name == 'postgresql':
+            # id вставлены явно - сдвигаем последовательность
+            op.execute("SELECT setval('skills_id_seq', (SELECT max(id) FROM skills))")
+
+    with op.batch_alter_table('projects') as batch:
+        batch.drop_column('required_skills')
+
+
+def downgrade():
+    bind = op.get_bind()
+    rows = bind.execute(sa.text(
+        "SELECT project_skills.project_id, skills.title FROM project_skills "
+        "JOIN skills ON skills.id = project_skills.skill_id ORDER BY skills.name"
+    )).all()
+    required = {}
+    for project_id, title in rows:
+        required.setdefault(project_id, []).append(title)
+
+    with op.batch_alter_table('projects') as batch:
+        batch.add_column(sa.Column('required_skills', sa.Text()))
+    for project_id, titles in required.items():
+        bind.execute(
+            sa.text("UPDATE projects SET required_skills = :skills WHERE id = :id"),
+            {'skills': json.dumps(titles, ensure_ascii=False), 'id': project_id}
+        )
+
+    op.drop_index('ix_project_skills_skill_id', table_name='project_skills')
+    op.drop_table('project_skills')
+    op.drop_table('skills')
+    op.create_table(
+        'project_skills',
+        sa.Column('project_id', sa.Integer(), sa.ForeignKey('projects.id')),
+        sa.Column('skill', sa.String(50)),
+    )
@@ -0,0 +1,30 @@
+"""user skills
+
+Навыки, которые пользователь указывает о себе командой /skills.
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-17 12:30:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0006'
+down_revision = '0005'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        'user_skills',
+        sa.Column('user_id', sa.Integer(), sa.ForeignKey('users.id', ondelete='CASCADE'), primary_key=True),
+        sa.Column('skill_id', sa.Integer(), sa.ForeignKey('skills.id', ondelete='CASCADE'), primary_key=True),
+    )
+
+
+def downgrade():
+    op.drop_table('user_skills')
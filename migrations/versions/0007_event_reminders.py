@@ -0,0 +1,42 @@
+"""event reminders
+
+Подписки на мероприятия и очередь отложенных задач планировщика.
+
+Revision ID: 0007
+Revises: 0006
+Create Date: 2026-10-17 13:00:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0007'
+down_revision = '0006'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        'event_subscriptions',
+        sa.Column('event_id', sa.Integer(), sa.ForeignKey('events.id', ondelete='CASCADE'), primary_key=True),
+        sa.Column('user_id', sa.Integer(), sa.ForeignKey('users.id', ondelete='CASCADE'), primary_key=True),
+        sa.Column('reminded_at', sa.DateTime()),
+    )
+    op.create_table(
+        'scheduled_jobs',
+        sa.Column('id', sa.Integer(), primary_key=True),
+        sa.Column('key', sa.String(100), nullable=False, unique=True),
+        sa.Column('kind', sa.String(50), nullable=False),
+        sa.Column('run_at', sa.DateTime(), nullable=False),
+        sa.Column('payload', sa.Text()),
+    )
+    op.create_index('ix_scheduled_jobs_run_at', 'scheduled_jobs', ['run_at'])
+
+
+def downgrade():
+    op.drop_index('ix_scheduled_jobs_run_at', table_name='scheduled_jobs')
+    op.drop_table('scheduled_jobs')
+    op.drop_table('event_subscriptions')
@@ -0,0 +1,37 @@
+"""fsm states
+
+Таблица хранилища FSM (FSM_STORAGE=postgres). Раньше ее создавал init_db()
+через create_all, поэтому в такой базе она уже есть и повторно не создается.
+
+Revision ID: 0009
+Revises: 0008
+Create Date: 2026-10-18 10:00:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0009'
+down_revision = '0008'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    if sa.inspect(op.get_bind()).has_table('fsm_states'):
+        return
+    op.create_table(
+        'fsm_states',
+        sa.Column('key', sa.String(128), primary_key=True),
+        sa.Column('state', sa.String(100)),
+        sa.Column('data', sa.Text()),
+        sa.Column('updated_at', sa.DateTime()),
+    )
+    op.create_index('ix_fsm_states_updated_at', 'fsm_states', ['updated_at'])
+
+
+def downgrade():
+    op.drop_index('ix_fsm_states_updated_at', table_name='fsm_states')
+    op.drop_table('fsm_states')
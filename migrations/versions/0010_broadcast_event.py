@@ -0,0 +1,36 @@
+"""broadcast event
+
+Связь рассылки с анонсируемым мероприятием. Частичный уникальный индекс
+не дает запустить второй анонс того же мероприятия, пока идет первый.
+
+Revision ID: 0010
+Revises: 0009
+Create Date: 2026-10-18 10:30:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0010'
+down_revision = '0009'
+branch_labels = None
+depends_on = None
+
+RUNNING = sa.text("status = 'running'")
+
+
+def upgrade():
+    with op.batch_alter_table('broadcasts') as batch:
+        batch.add_column(sa.Column('event_id', sa.Integer()))
+        batch.create_foreign_key('fk_broadcasts_event_id', 'events', ['event_id'], ['id'], ondelete='SET NULL')
+    op.create_index('ix_broadcasts_running_event_id', 'broadcasts', ['event_id'], unique=True,
+                    postgresql_where=RUNNING, sqlite_where=RUNNING)
+
+
+def downgrade():
+    op.drop_index('ix_broadcasts_running_event_id', table_name='broadcasts')
+    with op.batch_alter_table('broadcasts') as batch:
+        batch.drop_constraint('fk_broadcasts_event_id', type_='foreignkey')
+        batch.drop_column('event_id')
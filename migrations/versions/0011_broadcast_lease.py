@@ -0,0 +1,30 @@
+"""broadcast lease
+
+Аренда рассылки репликой: незавершенную рассылку продолжает только та
+реплика, которая атомарно взяла ее в аренду.
+
+Revision ID: 0011
+Revises: 0010
+Create Date: 2026-10-18 11:00:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0011'
+down_revision = '0010'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column('broadcasts', sa.Column('owner', sa.String(64)))
+    op.add_column('broadcasts', sa.Column('lease_until', sa.DateTime()))
+
+
+def downgrade():
+    with op.batch_alter_table('broadcasts') as batch:
+        batch.drop_column('lease_until')
+        batch.drop_column('owner')
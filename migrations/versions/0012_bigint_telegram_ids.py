@@ -0,0 +1,34 @@
+"""bigint telegram ids
+
+Идентификаторы пользователей Telegram не помещаются в 32 бита (бывают
+больше 2**31), поэтому users.telegram_id и broadcasts.admin_telegram_id
+переходят на BIGINT.
+
+Revision ID: 0012
+Revises: 0011
+Create Date: 2026-10-18 12:00:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0012'
+down_revision = '0011'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('users') as batch:
+        batch.alter_column('telegram_id', type_=sa.BigInteger(), existing_type=sa.Integer(), existing_nullable=False)
+    with op.batch_alter_table('broadcasts') as batch:
+        batch.alter_column('admin_telegram_id', type_=sa.BigInteger(), existing_type=sa.Integer())
+
+
+def downgrade():
+    with op.batch_alter_table('broadcasts') as batch:
+        batch.alter_column('admin_telegram_id', type_=sa.Integer(), existing_type=sa.BigInteger())
+    with op.batch_alter_table('users') as batch:
+        batch.alter_column('telegram_id', type_=sa.Integer(), existing_type=sa.BigInteger(), existing_nullable=False)
@@ -0,0 +1,7 @@
+import os
+import sys
+
+# Модули бота импортируются так же, как при запуске из app/
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "app"))
+os.environ.setdefault("DATABASE_URL", "sqlite+aiosqlite:///:memory:")
+os.environ.setdefault("ADMIN_IDS", "1")
@@ -0,0 +1,35 @@
+import asyncio
+from datetime import datetime
+import pytest
+from sqlalchemy.exc import IntegrityError
+from database.database import engine, init_db
+from database.models import Event
+from handlers.admin_handlers import event_announcement
+from services.broadcast import broadcast_engine
+
+
+def test_announcement_escapes_markup_and_fits_message():
+    event = Event(title="Разбор snake_case и *args", description="[ссылка " + "x" * 6000,
+                  location="Офис_2", date_time=datetime(2026, 11, 1, 18, 0))
+    text = event_announcement(event)
+    assert "snake\\_case и \\*args" in text
+    assert "\\[ссылка" in text and "Офис\\_2" in text
+    assert len(text) < 4096
+
+
+def test_only_running_announcement_conflict_is_swallowed(monkeypatch):
+    # Отправку не запускаем: проверяется только запись рассылки
+    monkeypatch.setattr(broadcast_engine, "_start", lambda broadcast_id: None)
+
+    async def run():
+        await init_db()
+        try:
+            assert await broadcast_engine.create("Анонс", event_id=1) is not None
+            assert await broadcast_engine.create("Анонс", event_id=1) is None
+            assert await broadcast_engine.create("Анонс", event_id=2) is not None
+            with pytest.raises(IntegrityError):
+                await broadcast_engine.create(None, event_id=3)
+        finally:
+            await engine.dispose()
+
+    asyncio.run(run())
@@ -0,0 +1,34 @@
+import asyncio
+from datetime import datetime, timedelta
+from aiogram.fsm.storage.base import StorageKey
+from sqlalchemy import update
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
+from database.fsm_storage import SQLAlchemyStorage
+from database.models import FSMState
+
+KEY = StorageKey(bot_id=1, chat_id=2, user_id=3)
+
+
+def test_expired_wizard_data_is_not_revived(tmp_path):
+    async def run():
+        engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'fsm.db'}")
+        async with engine.begin() as conn:
+            await conn.run_sync(FSMState.__table__.create)
+        session_maker = async_sessionmaker(engine, expire_on_commit=False)
+        storage = SQLAlchemyStorage(session_maker=session_maker, state_ttl=60)
+
+        await storage.set_state(KEY, "AdminStates:event_title")
+        await storage.set_data(KEY, {"title": "Старый мастер"})
+        # Мастер брошен дольше state_ttl
+        async with session_maker() as session:
+            await session.execute(update(FSMState).values(updated_at=datetime.utcnow() - timedelta(hours=1)))
+            await session.commit()
+
+        await storage.set_state(KEY, "AdminStates:mentor_name")
+        assert await storage.get_data(KEY) == {}
+        await storage.set_data(KEY, {"name": "Новый"})
+        assert await storage.get_state(KEY) == "AdminStates:mentor_name"
+        assert await storage.get_data(KEY) == {"name": "Новый"}
+        await engine.dispose()
+
+    asyncio.run(run())
@@ -0,0 +1,56 @@
+import asyncio
+from datetime import datetime, timedelta
+from database.database import engine, init_db, AsyncSessionLocal
+from database.models import Event, Lecture, Vacancy
+from services import inline_index as inline_index_module
+from services.inline_index import INLINE_SECTIONS, InlineIndex, lecture_card, load_section, vacancy_card
+
+
+def test_cards_without_date_go_last():
+    dated = lecture_card(Lecture(id=1, title="Python", uploaded_at=datetime(2024, 5, 1)))[0]
+    undated = lecture_card(Lecture(id=2, title="Go", uploaded_at=None))[0]
+    assert undated.order == 0.0
+    assert dated.order < undated.order
+
+
+def test_vacancy_without_posted_at():
+    card, text = vacancy_card(Vacancy(id=1, title="Backend", company="IT Jama'at", posted_at=None))
+    assert card.order == 0.0
+    assert "Backend" in text
+
+
+def test_admin_change_reloads_only_touched_cards(monkeypatch):
+    loads = []
+
+    async def recording_load(section, ids=None):
+        loads.append((section, ids))
+        return await load_section(section, ids)
+
+    monkeypatch.setattr(inline_index_module, "load_section", recording_load)
+
+    async def run():
+        await init_db()
+        async with AsyncSessionLocal() as session:
+            events = [Event(title=f"Митап {i}", is_active=True, date_time=datetime.utcnow() + timedelta(days=i + 1))
+                      for i in range(3)]
+            session.add_all(events)
+            await session.commit()
+            index = InlineIndex(ttl=3600)
+            await index.refresh()
+            assert len(loads) == len(INLINE_SECTIONS)
+
+            events[0].title = "Хакатон"
+            events[1].is_active = False
+            await session.commit()
+        index.invalidate("events", ids=(events[0].id, events[1].id))
+        index.invalidate("mentors", ids=(1,))
+        await index.refresh()
+        await engine.dispose()
+
+        assert loads[len(INLINE_SECTIONS):] == [("events", {events[0].id, events[1].id})]
+        assert {key[1] for key in index.cards if key[0] == "events"} == {events[0].id, events[2].id}
+        results, _ = index.search("хакатон")
+        assert [result.id for result in results] == [f"events:{events[0].id}"]
+        assert index.search("митап")[0][0].id == f"events:{events[2].id}"
+
+    asyncio.run(run())
@@ -0,0 +1,11 @@
+import asyncio
+from load_test import run_load_test
+
+
+def test_load_test_smoke():
+    """Короткий прогон всех сценариев на SQLite: хендлеры отвечают без ошибок"""
+    result = asyncio.run(run_load_test(rps=200, duration=1.5, users=5, admins=1, seed_size=30))
+    assert result["updates"] > 0
+    assert result["total"]["errors"] == 0, result["steps"]
+    assert {"/start", "events", "admin_add_event"} <= set(result["steps"])
+    assert result["bot_api"]["sent"] > 0
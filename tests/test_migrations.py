@@ -0,0 +1,30 @@
+import os
+import sqlite3
+from alembic import command
+from alembic.config import Config as AlembicConfig
+from alembic.script import ScriptDirectory
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def alembic_config() -> AlembicConfig:
+    return AlembicConfig(os.path.join(ROOT, "alembic.ini"))
+
+
+def test_upgrade_database_created_without_migrations(tmp_path, monkeypatch):
+    path = tmp_path / "bot.db"
+    monkeypatch.setenv("DATABASE_URL", f"sqlite+aiosqlite:///{path}")
+    monkeypatch.chdir(ROOT)
+    config = alembic_config()
+
+    # Так выглядит рабочая база, созданная create_all: схема 0001 без alembic_version
+    command.upgrade(config, "0001")
+    with sqlite3.connect(path) as db:
+        db.execute("DROP TABLE alembic_version")
+        db.execute("INSERT INTO users (telegram_id, full_name) VALUES (42, 'Тест')")
+
+    command.upgrade(config, "head")
+    with sqlite3.connect(path) as db:
+        assert db.execute("SELECT version_num FROM alembic_version").fetchone()[0] == \
+            ScriptDirectory.from_config(config).get_current_head()
+        assert db.execute("SELECT telegram_id FROM users").fetchall() == [(42,)]
@@ -0,0 +1,121 @@
+"""Планы запросов публичных разделов: каждый идет по индексу.
+
+Запросы не копируются, а перехватываются при рендере разделов теми же
+функциями, что вызывают хендлеры (render_section -> fetch_page, selectinload).
+По умолчанию база - SQLite в памяти; с DATABASE_URL на пустую базу PostgreSQL
+с примененными миграциями проверяются ее планы.
+"""
+import asyncio
+import re
+from datetime import datetime, timedelta
+from sqlalchemy import event
+from database.database import engine, init_db, AsyncSessionLocal
+from database.models import User, Mentor, Event, Lecture, Vacancy, Project, Skill, project_skills
+from handlers.user_handlers import render_section
+from services.cache import listing_cache
+
+# Раздел -> индексы, хотя бы один из которых должен быть в плане каждой страницы
+SECTIONS = {
+    "events": {"ix_events_active_date_time"},
+    "mentors": {"ix_mentors_active", "mentors_pkey"},
+    "lectures_programming": {"ix_lectures_category_uploaded_at"},
+    "lectures_all": {"ix_lectures_uploaded_at"},
+    "vacancies": {"ix_vacancies_active_posted_at"},
+    "projects": {"ix_projects_active_created_at"},
+    "projects_1": {"ix_project_skills_skill_id"},
+}
+
+# Полный просмотр таблицы: в SQLite - SCAN без USING, в PostgreSQL - Seq Scan
+FULL_SCAN = re.compile(r"^\s*SCAN \w+\s*$|Seq Scan", re.MULTILINE)
+
+
+async def seed():
+    """По 12 записей в разделе - больше страницы, чтобы были курсоры n/p/c"""
+    now = datetime.utcnow()
+    async with AsyncSessionLocal() as session:
+        user = User(telegram_id=1, full_name="Тест")
+        skill = Skill(name="python", title="Python")
+        session.add_all([user, skill])
+        await session.flush()
+        for i in range(12):
+            mentor = Mentor(name=f"Ментор {i}", is_active=True)
+            session.add(mentor)
+            await session.flush()
+            project = Project(title=f"Проект {i}", is_active=True, status="development",
+                              created_at=now - timedelta(days=i), contact_person=user.id)
+            session.add_all([
+                Event(title=f"Мероприятие {i}", is_active=True, date_time=now + timedelta(days=i + 1),
+                      mentor_id=mentor.id),
+                Lecture(title=f"Лекция {i}", category="Программирование", uploaded_at=now - timedelta(days=i),
+                        mentor_id=mentor.id),
+                Vacancy(title=f"Вакансия {i}", is_active=True, posted_at=now - timedelta(days=i)),
+                project,
+            ])
+            await session.flush()
+            await session.execute(project_skills.insert().values(project_id=project.id, skill_id=skill.id))
+        await session.commit()
+
+
+async def explain(statement: str, parameters) -> str:
+    prefix = "EXPLAIN QUERY PLAN " if engine.dialect.name == "sqlite" else "EXPLAIN "
+    async with engine.connect() as conn:
+        if engine.dialect.name == "postgresql":
+            # На маленьких таблицах планировщик предпочтет seq scan - запрещаем его
+            await conn.exec_driver_sql("SET enable_seqscan = off")
+        rows = (await conn.exec_driver_sql(prefix + statement, parameters)).all()
+    return "\n".join(str(row[-1]) for row in rows)
+
+
+def page_cursors(section: str, keyboard) -> list[str]:
+    prefix = f"page:{section}:"
+    return [
+        button.callback_data[len(prefix):]
+        for row in keyboard.inline_keyboard
+        for button in row
+        if button.callback_data and button.callback_data.startswith(prefix)
+    ]
+
+
+def test_listing_queries_use_indexes():
+    async def run():
+        await init_db()
+        await seed()
+        await listing_cache.invalidate(*{section.split("_")[0] for section in SECTIONS})
+
+        captured = []
+
+        def capture(conn, cursor, statement, parameters, context, executemany):
+            if statement.lstrip().upper().startswith("SELECT"):
+                captured.append((statement, parameters))
+
+        event.listen(engine.sync_engine, "before_cursor_execute", capture)
+        failures = []
+        try:
+            for section, indexes in SECTIONS.items():
+                # Первая страница, следующая, затем с нее - предыдущая и обновление
+                pending, seen = [None], set()
+                while pending:
+                    cursor = pending.pop(0)
+                    if cursor in seen:
+                        continue
+                    seen.add(cursor)
+                    captured.clear()
+                    _, keyboard = await render_section(section, cursor)
+                    assert captured, f"{section}: запросов не было"
+                    plans = [await explain(statement, parameters) for statement, parameters in captured]
+                    name = f"{section} [{cursor or 'первая'}]"
+                    if not any(index in plan for plan in plans for index in indexes):
+                        failures.append(f"{name}: ожидался индекс {', '.join(sorted(indexes))}\n" + "\n".join(plans))
+                    failures.extend(
+                        f"{name}: полный просмотр таблицы\n{statement}\n{plan}"
+                        for (statement, _), plan in zip(captured, plans) if FULL_SCAN.search(plan)
+                    )
+                    if len(seen) < 4:
+                        pending.extend(page_cursors(section, keyboard))
+                assert len(seen) >= 3, f"{section}: не дошли до соседних страниц"
+        finally:
+            event.remove(engine.sync_engine, "before_cursor_execute", capture)
+            await engine.dispose()
+        assert not failures, "\n\n".join(failures)
+
+    asyncio.run(run())
@@ -0,0 +1,34 @@
+import asyncio
+import pytest
+from services.cache import RedisBackend, SharedRecords
+
+fakeredis = pytest.importorskip("fakeredis")
+
+
+def test_edit_by_another_replica_is_visible():
+    async def run():
+        server = fakeredis.FakeServer()
+        replicas = [
+            SharedRecords(RedisBackend(fakeredis.aioredis.FakeRedis(server=server, decode_responses=True), 16),
+                          "messages", maxsize=16, ttl=3600)
+            for _ in range(2)
+        ]
+        first, second = replicas
+        # Реплика A показала список мероприятий и уже прочитала свою запись
+        await first.set((5, 10), "events")
+        assert await first.get((5, 10)) == "events"
+        # Реплика B вернула то же сообщение в главное меню
+        await second.set((5, 10), "main")
+        assert await first.get((5, 10)) == "main"
+
+    asyncio.run(run())
+
+
+def test_single_process_records():
+    async def run():
+        records = SharedRecords(None, "messages", maxsize=2, ttl=3600)
+        await records.set((5, 10), "events")
+        assert await records.get((5, 10)) == "events"
+        assert await records.get((5, 11)) is None
+
+    asyncio.run(run())
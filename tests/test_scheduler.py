@@ -0,0 +1,33 @@
+import asyncio
+from datetime import datetime, timedelta
+from database.database import engine, init_db
+from services.scheduler import Scheduler
+
+
+def test_job_of_dead_replica_runs_on_survivor():
+    async def run():
+        await init_db()
+        done = []
+
+        async def remind(bot, payload):
+            done.append((bot, payload))
+
+        survivor, dead = Scheduler(poll_interval=0.2), Scheduler(poll_interval=0.2)
+        for replica in (survivor, dead):
+            replica.register("remind", remind)
+        # Выжившая реплика уже работает, ее куча пуста
+        task = asyncio.create_task(survivor.run("bot"))
+        await asyncio.sleep(0.05)
+        # Задачу ставит реплика, которая падает, не дождавшись срока
+        await dead.schedule("remind:1", "remind", datetime.utcnow() + timedelta(seconds=0.3), {"event_id": 1})
+        try:
+            for _ in range(40):
+                if done:
+                    break
+                await asyncio.sleep(0.05)
+        finally:
+            task.cancel()
+            await engine.dispose()
+        assert done == [("bot", {"event_id": 1})]
+
+    asyncio.run(run())
@@ -0,0 +1,24 @@
+import asyncio
+from datetime import datetime
+from database.database import engine, init_db, AsyncSessionLocal
+from database.models import Lecture
+from handlers.user_handlers import render_search
+from services.search import fallback_search
+
+
+def test_search_results_escape_markdown():
+    async def run():
+        await init_db()
+        async with AsyncSessionLocal() as session:
+            session.add(Lecture(title="snake_case и *args в Python", uploaded_at=datetime.utcnow()))
+            await session.commit()
+        fallback_search.invalidate()
+        try:
+            found, _ = await render_search("python")
+            missing, _ = await render_search("нет_такого*")
+        finally:
+            await engine.dispose()
+        assert "snake\\_case и \\*args в Python" in found
+        assert "«нет\\_такого\\*»" in missing
+
+    asyncio.run(run())
@@ -0,0 +1,62 @@
+import asyncio
+import pytest
+from aiogram.types import Update
+from middlewares.throttling import ThrottlingMiddleware
+from services.cache import RedisBackend
+
+
+async def feed(middleware: ThrottlingMiddleware, presses: list[str]) -> list[str]:
+    """Прогоняет нажатия кнопок одного сообщения, возвращает дошедшие до хендлера"""
+    handled = []
+
+    async def handler(event, data):
+        handled.append(event.callback_query.data)
+
+    async def answer(*args, **kwargs):
+        pass
+
+    for data in presses:
+        update = Update.model_validate({"update_id": 1, "callback_query": {
+            "id": "1", "chat_instance": "1", "data": data,
+            "from": {"id": 5, "is_bot": False, "first_name": "Test"},
+            "message": {"message_id": 10, "date": 0, "chat": {"id": 5, "type": "private"}, "text": ""},
+        }})
+        object.__setattr__(update.callback_query, "answer", answer)
+        await middleware(handler, update, {"event_from_user": update.callback_query.from_user})
+    return handled
+
+
+def press(middleware: ThrottlingMiddleware, presses: list[str]) -> list[str]:
+    return asyncio.run(feed(middleware, presses))
+
+
+def test_navigation_is_not_cooled_down():
+    middleware = ThrottlingMiddleware(rate=100, burst=100, cooldown=3)
+    presses = ["lectures", "lectures_programming", "lectures", "events", "back_to_main", "events"]
+    assert press(middleware, presses) == presses
+    assert middleware.cooled == 0
+
+
+def test_repeated_press_of_current_view_is_cooled_down():
+    middleware = ThrottlingMiddleware(rate=100, burst=100, cooldown=3)
+    assert press(middleware, ["events", "events", "events"]) == ["events"]
+    assert middleware.cooled == 2
+
+
+def test_navigation_on_another_replica_is_visible():
+    fakeredis = pytest.importorskip("fakeredis")
+
+    async def run():
+        server = fakeredis.FakeServer()
+        first, second = (
+            ThrottlingMiddleware(rate=100, burst=100, cooldown=3, backend=RedisBackend(
+                fakeredis.aioredis.FakeRedis(server=server, decode_responses=True), maxsize=16))
+            for _ in range(2)
+        )
+        assert await feed(first, ["events"]) == ["events"]
+        # «Назад» обработала другая реплика - возврат к мероприятиям не должен пропасть
+        assert await feed(second, ["back_to_main"]) == ["back_to_main"]
+        assert await feed(first, ["events"]) == ["events"]
+        assert await feed(second, ["events"]) == []
+
+    asyncio.run(run())